@@ -1,8 +1,31 @@
 import streamlit as st
-import google.generativeai as genai
 from dotenv import load_dotenv
+import hashlib
+import html
+import json
 import os
 import uuid
+from concurrent.futures import wait
+
+from archive_ingest import is_archive
+from content_stats import text_stats, total_stats
+from content_store import get_content_stores
+from context_packer import DEFAULT_TOKEN_BUDGET, pack_files
+from dedup import deduplicate_files
+from file_browser import file_preview, filter_files, paginate
+from gemini_client import configure, get_client
+from generator import (build_retrieval_index, extract_facts_block, generate, generate_map_reduce, generate_section_parallel, generate_stream,
+                       regenerate_readme_section)
+from map_reduce import DEFAULT_MAX_WORKERS
+from page_assets import EMPTY_STATE_HTML, FOOTER_HTML, HEADER_HTML, style_tags, web_fonts_enabled
+from parallel_ingest import choose_processes, choose_workers, decode_upload, map_ordered
+from refine import RefinementChat
+from response_cache import ResponseCache, make_cache_key
+from sampled_read import allocate_byte_budgets
+from scheduler import get_scheduler
+from sections import TOC_HEADING, split_sections
+from skeleton import skeletonize_files
+from tracing import Trace
 
 load_dotenv()
 
@@ -19,90 +42,252 @@ def init_session_state():
         st.session_state.raw_prompt = ""
     if "reset_counter" not in st.session_state:
         st.session_state.reset_counter = 0
+    if "stream_partial" not in st.session_state:
+        st.session_state.stream_partial = ""
+    if "stream_in_progress" not in st.session_state:
+        st.session_state.stream_in_progress = False
+    if "perf_trace" not in st.session_state:
+        st.session_state.perf_trace = Trace()
+    if "ingested_uploads" not in st.session_state:
+        st.session_state.ingested_uploads = {}
+    if "upload_digests" not in st.session_state:
+        st.session_state.upload_digests = {}
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    if "refine_chat" not in st.session_state:
+        st.session_state.refine_chat = RefinementChat()
+    if "file_stats" not in st.session_state:
+        st.session_state.file_stats = {}
+    if "file_signatures" not in st.session_state:
+        st.session_state.file_signatures = {}
+    if "readme_metadata" not in st.session_state:
+        st.session_state.readme_metadata = (None, None)
+
+def bind_content_store():
+    """Point file_contents at this session's compressed store; uploads are read again if it was evicted while idle"""
+    store = get_content_stores().store_for(st.session_state.session_id)
+    if st.session_state.file_contents is not store:
+        st.session_state.ingested_uploads = {}
+        st.session_state.file_stats = {}
+        st.session_state.file_signatures = {}
+        st.session_state.file_contents = store
 
 def configure_gemini():
     """Configure Gemini API"""
     api_key = os.getenv("GOOGLE_API_KEY")
     if api_key:
-        genai.configure(api_key=api_key)
+        configure(api_key)
         return True
     else:
         st.error("🚨 Google API Key not found. Please set the GOOGLE_API_KEY environment variable.")
         return False
 
-def get_system_prompt():
-    return """You are an advanced README generator AI. You must output ONLY clean, properly formatted Markdown content without any code block markers or additional formatting.
+@st.cache_resource
+def get_response_cache():
+    """Process-wide on-disk cache of generated READMEs"""
+    return ResponseCache.from_env()
+
+# Indexes hold decoded chunk text, so they expire like idle session content stores
+@st.cache_resource(max_entries=16, ttl=get_content_stores().max_idle_seconds)
+def get_retrieval_index(upload_set, _file_contents, project_facts, dedup):
+    """Retrieval index per upload set (tuple of upload fingerprints), so reruns do not rebuild it"""
+    return build_retrieval_index(_file_contents, project_facts, dedup)
+
+@st.cache_resource(max_entries=16)
+def get_reduction_reports(upload_set, _file_contents, _signatures, project_facts, dedup, skeleton, token_budget):
+    """Facts, dedup, skeleton and packing reports per upload set and switches, so reruns do not decode every file
 
-When composing the README, follow these guidelines:
+    Only the reports are kept; the reduced files are rebuilt when a README is generated.
+    """
+    reports = {"facts_block": "", "manifests": 0, "dedup": None, "skeleton": None, "packing": None}
+    prompt_files = _file_contents
+    if project_facts and prompt_files:
+        reports["facts_block"], prompt_files = extract_facts_block(prompt_files)
+        reports["manifests"] = len(_file_contents) - len(prompt_files)
+    if dedup and prompt_files:
+        prompt_files, reports["dedup"] = deduplicate_files(prompt_files, signatures=_signatures)
+    if skeleton and prompt_files:
+        prompt_files, reports["skeleton"] = skeletonize_files(prompt_files)
+    if prompt_files:
+        reports["packing"] = pack_files(prompt_files, token_budget)
+        del reports["packing"]["files"]
+    return reports
+
+def current_retrieval_index(reductions):
+    """Retrieval index for this session's uploads and reduction switches"""
+    return get_retrieval_index(tuple(st.session_state.ingested_uploads), st.session_state.file_contents,
+                               reductions.get("project_facts", True), reductions.get("dedup", True))
 
-1. **Project Title and Badge Section**  
-   - Extract or infer a concise project title.  
-   - Optionally include status/version/build badges if present in the files or mentioned in the prompt.
+def upload_fingerprints(uploaded_files):
+    """Identify uploads by name, size and content hash"""
+    # Streamlit gives every upload a stable file_id, so each file is hashed only once
+    digests = st.session_state.upload_digests
+    unhashed = [f for f in uploaded_files if getattr(f, "file_id", None) not in digests]
+    workers = choose_workers(sum(f.size for f in unhashed))
+    new_digests = map_ordered(lambda f: hashlib.blake2b(f.getvalue(), digest_size=16).hexdigest(), unhashed, workers)
+    
+    fingerprints = []
+    fresh = dict(zip(map(id, unhashed), new_digests))
+    for uploaded_file in uploaded_files:
+        file_id = getattr(uploaded_file, "file_id", None)
+        digest = fresh.get(id(uploaded_file)) or digests[file_id]
+        if file_id:
+            digests[file_id] = digest
+        fingerprints.append((uploaded_file.name, uploaded_file.size, digest))
+    return fingerprints
 
-2. **Project Description**  
-   - Summarize the project's purpose, features, and high-level architecture.  
-   - Explain what problem it solves and who the intended users are.
+def readme_metadata():
+    """Stats, sections, bytes and digest of the current README, recomputed only when the README text object changes"""
+    readme = st.session_state.readme_generated
+    cached_readme, metadata = st.session_state.readme_metadata
+    if metadata is None or cached_readme is not readme:
+        readme_bytes = readme.encode("utf-8", "surrogatepass")
+        metadata = {"stats": text_stats(readme, "README.md"), "sections": split_sections(readme),
+                    "readme_bytes": readme_bytes, "digest": hashlib.sha256(readme_bytes).hexdigest()}
+        st.session_state.readme_metadata = (readme, metadata)
+    return metadata
 
-3. **Table of Contents**  
-   - Automatically generate links to the main sections of the README.
+def request_key(mode, raw_prompt, file_contents, **options):
+    """Identity of a generation request, used to share identical in-flight requests across sessions"""
+    return make_cache_key(mode, repr(sorted(options.items())), raw_prompt, file_contents)
 
-4. **Installation**  
-   - Detail any prerequisites (languages, frameworks, tools).  
-   - Provide step-by-step setup or installation commands derived from environment/config files.
+def show_queue_status(ticket, status):
+    """Queue position and ETA of a scheduled generation"""
+    scheduler = get_scheduler()
+    position = scheduler.position(ticket)
+    eta = scheduler.eta_seconds(ticket)
+    shared = " (sharing an identical request already in progress)" if ticket.shared else ""
+    if position is None:
+        status.info(f"🤖 AI is crafting your professional README... ~{eta:.0f}s left{shared}")
+    else:
+        status.info(f"⏳ Waiting for a free generation slot: {position} request(s) ahead, ETA ~{eta:.0f}s{shared}")
 
-5. **Usage**  
-   - Show common usage patterns or code snippets.  
-   - Explain command-line flags, configuration options, or API endpoints based on the project files.
+def run_scheduled(key, func, status, on_poll=None):
+    """Run func on the shared scheduler and return its result, showing progress in status
+
+    func runs on a worker thread without a Streamlit script context, so it
+    must not touch st.* or st.session_state.
+    """
+    ticket = get_scheduler().submit(st.session_state.session_id, key, func)
+    while not ticket.done():
+        show_queue_status(ticket, status)
+        if on_poll is not None:
+            on_poll()
+        wait([ticket.future], timeout=0.5)
+    status.empty()
+    return ticket.result()
+
+def generate_readme(raw_prompt, file_contents, status, token_budget=DEFAULT_TOKEN_BUDGET, **reductions):
+    """Generate README using Gemini; reductions are the skeleton/project_facts/dedup switches"""
+    cache, trace = get_response_cache(), st.session_state.perf_trace
+    key = request_key("single", raw_prompt, file_contents, token_budget=token_budget, **reductions)
+    try:
+        return run_scheduled(key, lambda: generate(raw_prompt, file_contents, cache=cache, token_budget=token_budget,
+                                                   trace=trace, **reductions), status)
+    except Exception as e:
+        st.error(f"Error generating README: {str(e)}")
+        return None
 
-6. **Configuration**  
-   - Describe configuration files (e.g., `.env`, `config.yaml`) and their options/values.
+def generate_readme_map_reduce(raw_prompt, file_contents, status, max_workers=DEFAULT_MAX_WORKERS, on_progress=None,
+                               **reductions):
+    """Generate README for large projects by summarizing file chunks first
 
-7. **Features / Functionality**  
-   - List and briefly explain the main features or modules, pulling from code comments or directory structure.
+    on_progress(done, total) is called from the script thread while waiting.
+    """
+    cache, trace = get_response_cache(), st.session_state.perf_trace
+    key = request_key("map-reduce", raw_prompt, file_contents, **reductions)
+    progress = {"done": 0, "total": 1}
 
-8. **Examples**  
-   - Provide sample input/output or screenshots if available.
+    def on_chunk_done(done, total):
+        progress.update(done=done, total=total)
 
-9. **API Reference** (for libraries or services)  
-   - Document exposed functions, classes, or endpoints with parameters and return values.
+    def report_progress():
+        if on_progress is not None:
+            on_progress(progress["done"], progress["total"])
 
-10. **Contributing**  
-    - Offer guidelines for how developers can contribute, referencing any `CONTRIBUTING.md` or coding standards.
+    try:
+        return run_scheduled(key, lambda: generate_map_reduce(raw_prompt, file_contents, cache=cache,
+                                                              max_workers=max_workers, on_chunk_done=on_chunk_done,
+                                                              trace=trace, **reductions),
+                             status, on_poll=report_progress)
+    except Exception as e:
+        st.error(f"Error generating README: {str(e)}")
+        return None
 
-11. **Testing**  
-    - Explain how to run tests, including commands and testing frameworks picked up from the files.
+def generate_readme_sections(raw_prompt, file_contents, status, max_workers=DEFAULT_MAX_WORKERS, on_progress=None,
+                             retrieval=False, **reductions):
+    """Generate README sections concurrently; returns (readme, sections) or (None, [])
 
-12. **License**  
-    - Detect and state the project's license based on LICENSE file or user prompt.
+    on_progress(done, total) is called from the script thread while waiting.
+    """
+    cache, trace = get_response_cache(), st.session_state.perf_trace
+    index = current_retrieval_index(reductions) if retrieval else None
+    key = request_key("sections", raw_prompt, file_contents, retrieval=retrieval, **reductions)
+    progress = {"done": 0, "total": 1}
 
-13. **Acknowledgements / Credits**  
-    - Mention authors, third-party libraries, or inspirations.
+    def on_section_done(done, total):
+        progress.update(done=done, total=total)
 
-14. **Contact / Support**  
-    - Describe how to reach maintainers or link to issue tracker/discussion forums.
+    def report_progress():
+        if on_progress is not None:
+            on_progress(progress["done"], progress["total"])
 
-**Critical Formatting Rules:**  
-- Output ONLY the markdown content, do not wrap it in code blocks (```markdown or ```)
-- Start directly with the project title using # heading
-- Use proper Markdown syntax: headings (#, ##, ###), bullet lists (-), numbered lists (1.)
-- Include fenced code blocks with language specification for code examples
-- Use **bold** and *italic* text appropriately
-- Create proper links and references
-- Ensure all sections flow naturally without extra formatting markers
+    try:
+        return run_scheduled(key, lambda: generate_section_parallel(raw_prompt, file_contents, cache=cache,
+                                                                    max_workers=max_workers,
+                                                                    on_section_done=on_section_done,
+                                                                    trace=trace, index=index, **reductions),
+                             status, on_poll=report_progress)
+    except Exception as e:
+        st.error(f"Error generating README: {str(e)}")
+        return None, []
 
-Always tailor the README to the specific project context. Generate clean, ready-to-use Markdown content."""
+def regenerate_readme_section_in_place(index, instructions, raw_prompt, file_contents, status, retrieval=False,
+                                       **reductions):
+    """Rewrite one section of the current README; returns the spliced README or None"""
+    markdown, trace = st.session_state.readme_generated, st.session_state.perf_trace
+    retrieval_index = current_retrieval_index(reductions) if retrieval else None
+    key = request_key(f"section-{index}", raw_prompt, file_contents, markdown=markdown, instructions=instructions,
+                      retrieval=retrieval, **reductions)
+    try:
+        return run_scheduled(key, lambda: regenerate_readme_section(markdown, index, raw_prompt, file_contents,
+                                                                    instructions, trace=trace,
+                                                                    retrieval_index=retrieval_index, **reductions),
+                             status)
+    except Exception as e:
+        st.error(f"Error regenerating section: {str(e)}")
+        return None
 
-def create_copy_button(text_to_copy, button_text="📋 Copy to Clipboard"):
-    """Create a copy button component with dark theme compatible styling"""
-    unique_id = str(uuid.uuid4()).replace('-', '')
-    
-    # Escape the text for JavaScript
-    escaped_text = text_to_copy.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+def refine_readme(instruction, status):
+    """Apply a chat instruction to the current README; returns (readme, reply, changed) or None"""
+    chat, readme = st.session_state.refine_chat, st.session_state.readme_generated
+    client = get_client()
+    try:
+        return run_scheduled(None, lambda: chat.send(client, instruction, readme), status)
+    except Exception as e:
+        st.error(f"Error refining README: {str(e)}")
+        return None
+
+COPY_MAX_CHARS = 1_000_000
+SCRIPT_ESCAPES = {ord("<"): "\\u003c", ord(">"): "\\u003e", ord("&"): "\\u0026", 0x2028: "\\u2028", 0x2029: "\\u2029"}
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def create_copy_button(digest, _text_to_copy, button_text="📋 Copy to Clipboard"):
+    """Copy button component for one README version, built once per content digest
+
+    The markup is identical on every rerun for the same README, so Streamlit's
+    message cache can serve it by reference instead of shipping it again. The
+    text travels as JSON in a non-executable script tag, escaped so content
+    such as </textarea> or </script> cannot break out of it.
+    """
+    payload = json.dumps(_text_to_copy, ensure_ascii=False).translate(SCRIPT_ESCAPES)
+    icon, _, label = button_text.partition(" ")
+    button_html = f'<span style="font-size: 16px;">{html.escape(icon)}</span><span>{html.escape(label)}</span>'
     
     copy_component = f"""
-    <div id="copy-container-{unique_id}" style="margin: 10px 0;">
-        <button id="copy-btn-{unique_id}" 
-                onclick="copyToClipboard{unique_id}()" 
+    <div id="copy-container" style="margin: 10px 0;">
+        <button id="copy-btn" 
+                onclick="copyToClipboard()" 
                 style="
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                     color: white;
@@ -124,536 +309,108 @@ def create_copy_button(text_to_copy, button_text="📋 Copy to Clipboard"):
                 "
                 onmouseover="this.style.transform='translateY(-2px)'; this.style.boxShadow='0 12px 24px rgba(102, 126, 234, 0.4)'"
                 onmouseout="this.style.transform='translateY(0px)'; this.style.boxShadow='0 8px 16px rgba(102, 126, 234, 0.3)'"
-                >
-            <span style="font-size: 16px;">📋</span>
-            <span>Copy to Clipboard</span>
-        </button>
-        
-        <textarea id="copy-text-{unique_id}" 
-                  style="position: absolute; left: -9999px; opacity: 0;"
-                  readonly>{escaped_text}</textarea>
+                >{button_html}</button>
     </div>
-
+    
+    <!-- README {digest} -->
+    <script type="application/json" id="copy-data">{payload}</script>
+    
     <script>
-        function copyToClipboard{unique_id}() {{
-            const button = document.getElementById('copy-btn-{unique_id}');
-            const textArea = document.getElementById('copy-text-{unique_id}');
-            
+        const idleLabel = {json.dumps(button_html).translate(SCRIPT_ESCAPES)};
+        
+        function copyText() {{
+            return JSON.parse(document.getElementById('copy-data').textContent);
+        }}
+        
+        function showState(label, background, duration) {{
+            const button = document.getElementById('copy-btn');
+            button.innerHTML = label;
+            button.style.background = background;
+            setTimeout(() => {{
+                button.innerHTML = idleLabel;
+                button.style.background = 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)';
+                button.style.transform = 'scale(1)';
+            }}, duration);
+        }}
+        
+        function copyToClipboard() {{
             try {{
                 // Method 1: Modern clipboard API
                 if (navigator.clipboard && window.isSecureContext) {{
-                    navigator.clipboard.writeText(textArea.value).then(() => {{
-                        button.innerHTML = '<span style="font-size: 16px;">✅</span><span>Copied!</span>';
-                        button.style.background = 'linear-gradient(135deg, #11998e 0%, #38ef7d 100%)';
-                        button.style.transform = 'scale(0.95)';
-                        setTimeout(() => {{
-                            button.innerHTML = '<span style="font-size: 16px;">📋</span><span>Copy to Clipboard</span>';
-                            button.style.background = 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)';
-                            button.style.transform = 'scale(1)';
-                        }}, 2000);
+                    navigator.clipboard.writeText(copyText()).then(() => {{
+                        document.getElementById('copy-btn').style.transform = 'scale(0.95)';
+                        showState('<span style="font-size: 16px;">✅</span><span>Copied!</span>',
+                                  'linear-gradient(135deg, #11998e 0%, #38ef7d 100%)', 2000);
                     }}).catch(() => {{
-                        fallbackCopy{unique_id}();
+                        fallbackCopy();
                     }});
                 }} else {{
-                    fallbackCopy{unique_id}();
+                    fallbackCopy();
                 }}
             }} catch (err) {{
-                fallbackCopy{unique_id}();
+                fallbackCopy();
             }}
         }}
         
-        function fallbackCopy{unique_id}() {{
-            const button = document.getElementById('copy-btn-{unique_id}');
-            const textArea = document.getElementById('copy-text-{unique_id}');
+        function fallbackCopy() {{
+            // The textarea only exists while copying, filled through .value so nothing is parsed as HTML
+            const textArea = document.createElement('textarea');
+            textArea.value = copyText();
+            textArea.setAttribute('readonly', '');
+            textArea.style.position = 'fixed';
+            textArea.style.opacity = '0';
+            document.body.appendChild(textArea);
             
             try {{
-                textArea.style.position = 'static';
-                textArea.style.opacity = '1';
                 textArea.select();
-                textArea.setSelectionRange(0, 99999);
+                textArea.setSelectionRange(0, textArea.value.length);
                 
-                const successful = document.execCommand('copy');
-                
-                textArea.style.position = 'absolute';
-                textArea.style.opacity = '0';
-                
-                if (successful) {{
-                    button.innerHTML = '<span style="font-size: 16px;">✅</span><span>Copied!</span>';
-                    button.style.background = 'linear-gradient(135deg, #11998e 0%, #38ef7d 100%)';
-                    setTimeout(() => {{
-                        button.innerHTML = '<span style="font-size: 16px;">📋</span><span>Copy to Clipboard</span>';
-                        button.style.background = 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)';
-                    }}, 2000);
+                if (document.execCommand('copy')) {{
+                    showState('<span style="font-size: 16px;">✅</span><span>Copied!</span>',
+                              'linear-gradient(135deg, #11998e 0%, #38ef7d 100%)', 2000);
                 }} else {{
                     throw new Error('Copy command failed');
                 }}
             }} catch (err) {{
-                button.innerHTML = '<span style="font-size: 16px;">⚠️</span><span>Manual Copy Needed</span>';
-                button.style.background = 'linear-gradient(135deg, #f093fb 0%, #f5576c 100%)';
-                setTimeout(() => {{
-                    button.innerHTML = '<span style="font-size: 16px;">📋</span><span>Copy to Clipboard</span>';
-                    button.style.background = 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)';
-                }}, 3000);
+                showState('<span style="font-size: 16px;">⚠️</span><span>Manual Copy Needed</span>',
+                          'linear-gradient(135deg, #f093fb 0%, #f5576c 100%)', 3000);
+            }} finally {{
+                document.body.removeChild(textArea);
             }}
         }}
     </script>
     """
     return copy_component
 
-def read_file_content(uploaded_file):
-    """Read content from uploaded file based on file type"""
-    try:
-        file_extension = uploaded_file.name.split('.')[-1].lower()
-        
-        # Text-based files that can be read as UTF-8
-        text_extensions = {
-            'py', 'txt', 'md', 'json', 'yaml', 'yml', 'html', 'css', 'js', 
-            'xml', 'csv', 'toml', 'ini', 'sh', 'bat', 'ps1', 'sql', 'log',
-            'gitignore', 'dockerfile', 'makefile', 'rakefile', 'gemfile',
-            'rc', 'htaccess', 'htpasswd', 'prettierrc', 'eslintrc', 'babelrc',
-            'editorconfig', 'conf', 'cfg'
-        }
-        
-        # Special handling for files without extensions but known names
-        special_files = {
-            'dockerfile', 'makefile', 'rakefile', 'gemfile', 'jenkinsfile'
-        }
-        
-        filename_lower = uploaded_file.name.lower()
-        
-        if file_extension in text_extensions or filename_lower in special_files or 'config' in filename_lower:
-            # Read as text
-            content = uploaded_file.read().decode('utf-8')
-            return content
-        else:
-            # For binary files, just return file info
-            return f"[Binary file: {uploaded_file.name} - Size: {uploaded_file.size} bytes]"
-            
-    except UnicodeDecodeError:
-        return f"[Binary file: {uploaded_file.name} - Could not read as text]"
-    except Exception as e:
-        return f"[Error reading file {uploaded_file.name}: {str(e)}]"
+def stream_readme_to_placeholder(raw_prompt, file_contents, placeholder, token_budget=DEFAULT_TOKEN_BUDGET, **reductions):
+    """Render a streamed README into placeholder and return the final text
 
-def generate_readme(raw_prompt, file_contents):
-    """Generate README using Gemini"""
+    Streamlit stops the script when the user presses Stop or touches another
+    widget; the partial text is kept in session state so the next run can
+    recover it.
+    """
+    st.session_state.stream_partial = ""
+    st.session_state.stream_in_progress = True
     try:
-        # Create the model
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # Prepare file contents for the prompt
-        files_section = ""
-        if file_contents:
-            files_section = "\n\n**Project Files:**\n"
-            for filename, content in file_contents.items():
-                files_section += f"\n--- {filename} ---\n{content}\n"
-        
-        # Combine system prompt with user's raw prompt and file contents
-        full_prompt = f"{get_system_prompt()}\n\n**User Project Description:**\n{raw_prompt}{files_section}\n\nGenerate a comprehensive README.md based on the above information."
-        
-        # Generate response
-        response = model.generate_content(full_prompt)
-        
-        return response.text
+        # A stream renders from this thread, so it holds a scheduler slot instead of running on a worker
+        with get_scheduler().slot(st.session_state.session_id, on_wait=lambda ticket: show_queue_status(ticket, placeholder)):
+            for text in generate_stream(raw_prompt, file_contents, cache=get_response_cache(), token_budget=token_budget,
+                                        trace=st.session_state.perf_trace, **reductions):
+                st.session_state.stream_partial += text
+                placeholder.markdown(st.session_state.stream_partial + " ▌")
     except Exception as e:
+        st.session_state.stream_in_progress = False
         st.error(f"Error generating README: {str(e)}")
         return None
-
-def add_custom_css():
-    """Add custom CSS for dark theme compatibility"""
-    st.markdown("""
-    <style>
-    /* Import Google Fonts */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    /* Global Styles */
-    .main .block-container {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        max-width: 1400px;
-    }
     
-    /* Custom Typography */
-    .stApp {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-    }
-    
-    /* Updated header styling to separate emoji from text */
-    .main-header {
-        font-weight: 700;
-        font-size: 3rem;
-        text-align: center;
-        margin-bottom: 0.5rem;
-        line-height: 1.2;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        gap: 0.5rem;
-    }
+    st.session_state.stream_in_progress = False
+    placeholder.empty()
+    return st.session_state.stream_partial
 
-    .header-emoji {
-        font-size: 3rem;
-        /* Keep emoji natural - no background clip */
-    }
-
-    .header-text {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-
-    /* Update the mobile responsiveness section */
-    @media (max-width: 768px) {
-        .main-header {
-            font-size: 2rem !important;
-            flex-direction: column !important;
-            gap: 0.25rem !important;
-        }
-        
-        .header-emoji {
-            font-size: 2rem !important;
-        }
-    }
-    
-    .main-subtitle {
-        text-align: center;
-        color: var(--text-color-secondary, #8b949e);
-        font-size: 1.2rem;
-        font-weight: 400;
-        margin-bottom: 2rem;
-        opacity: 0.8;
-    }
-    
-    /* Dark theme compatible cards */
-    .custom-card {
-        background: var(--background-color, rgba(255, 255, 255, 0.05));
-        padding: 2rem;
-        border-radius: 20px;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        border: 1px solid var(--border-color, rgba(255, 255, 255, 0.1));
-        margin-bottom: 2rem;
-        transition: all 0.3s ease;
-        backdrop-filter: blur(10px);
-    }
-    
-    .custom-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 15px 40px rgba(0,0,0,0.4);
-        border-color: rgba(102, 126, 234, 0.3);
-    }
-    
-    /* Section Headers - Dark theme compatible */
-    .section-header {
-        font-size: 1.5rem;
-        font-weight: 600;
-        color: var(--text-color, #e6edf3);
-        margin-bottom: 1rem;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-    }
-    
-    .section-icon {
-        font-size: 1.2rem;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-    
-    /* Input Styling - Dark theme compatible */
-    .stTextArea textarea {
-        border-radius: 12px !important;
-        border: 2px solid var(--border-color, rgba(255, 255, 255, 0.2)) !important;
-        background-color: var(--background-color, rgba(0, 0, 0, 0.2)) !important;
-        color: var(--text-color, #e6edf3) !important;
-        font-family: 'Inter', sans-serif !important;
-        font-size: 14px !important;
-        line-height: 1.6 !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    .stTextArea textarea:focus {
-        border-color: #667eea !important;
-        box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.2) !important;
-    }
-    
-    .stTextArea textarea::placeholder {
-        color: var(--text-color-secondary, #8b949e) !important;
-        opacity: 0.7 !important;
-    }
-    
-    /* File Uploader Styling - Dark theme compatible */
-    .stFileUploader {
-        margin: 1rem 0;
-    }
-    
-    .stFileUploader > div {
-        border-radius: 12px !important;
-        border: 2px dashed var(--border-color, rgba(255, 255, 255, 0.3)) !important;
-        background: var(--background-color, rgba(0, 0, 0, 0.1)) !important;
-        padding: 2rem !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    .stFileUploader > div:hover {
-        border-color: #667eea !important;
-        background: rgba(102, 126, 234, 0.1) !important;
-    }
-    
-    .stFileUploader label {
-        color: var(--text-color, #e6edf3) !important;
-    }
-    
-    /* Button Styling */
-    .stButton > button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 12px !important;
-        padding: 0.75rem 2rem !important;
-        font-weight: 600 !important;
-        font-size: 14px !important;
-        transition: all 0.3s ease !important;
-        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.3) !important;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px) !important;
-        box-shadow: 0 8px 20px rgba(102, 126, 234, 0.4) !important;
-    }
-    
-    .stButton > button:active {
-        transform: translateY(0px) !important;
-    }
-    
-    /* Secondary Button - Dark theme compatible */
-    .stButton > button[kind="secondary"] {
-        background: var(--background-color, rgba(255, 255, 255, 0.1)) !important;
-        color: var(--text-color, #e6edf3) !important;
-        border: 1px solid var(--border-color, rgba(255, 255, 255, 0.2)) !important;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.2) !important;
-    }
-    
-    .stButton > button[kind="secondary"]:hover {
-        background: rgba(255, 255, 255, 0.15) !important;
-        border-color: rgba(102, 126, 234, 0.5) !important;
-    }
-    
-    /* Download Button Special Styling */
-    .stDownloadButton > button {
-        background: linear-gradient(135deg, #10b981 0%, #059669 100%) !important;
-        box-shadow: 0 4px 12px rgba(16, 185, 129, 0.3) !important;
-    }
-    
-    /* Success/Error Messages - Dark theme compatible */
-    .stSuccess {
-        background: rgba(16, 185, 129, 0.15) !important;
-        border: 1px solid rgba(16, 185, 129, 0.3) !important;
-        border-radius: 12px !important;
-        padding: 1rem !important;
-        color: #10b981 !important;
-    }
-    
-    .stError {
-        background: rgba(248, 113, 113, 0.15) !important;
-        border: 1px solid rgba(248, 113, 113, 0.3) !important;
-        border-radius: 12px !important;
-        padding: 1rem !important;
-        color: #f87171 !important;
-    }
-    
-    .stWarning {
-        background: rgba(251, 191, 36, 0.15) !important;
-        border: 1px solid rgba(251, 191, 36, 0.3) !important;
-        border-radius: 12px !important;
-        padding: 1rem !important;
-        color: #fbbf24 !important;
-    }
-    
-    .stInfo {
-        background: rgba(59, 130, 246, 0.15) !important;
-        border: 1px solid rgba(59, 130, 246, 0.3) !important;
-        border-radius: 12px !important;
-        padding: 1rem !important;
-        color: #3b82f6 !important;
-    }
-    
-    /* Expander Styling - Dark theme compatible */
-    .streamlit-expanderHeader {
-        background: var(--background-color, rgba(255, 255, 255, 0.05)) !important;
-        border-radius: 8px !important;
-        border: 1px solid var(--border-color, rgba(255, 255, 255, 0.1)) !important;
-        font-weight: 500 !important;
-        color: var(--text-color, #e6edf3) !important;
-    }
-    
-    .streamlit-expanderContent {
-        background: var(--background-color, rgba(0, 0, 0, 0.1)) !important;
-        border: 1px solid var(--border-color, rgba(255, 255, 255, 0.1)) !important;
-        border-top: none !important;
-    }
-    
-    /* Radio Button Styling - Dark theme compatible */
-    .stRadio > div {
-        flex-direction: row !important;
-        gap: 1rem !important;
-    }
-    
-    .stRadio label {
-        background: var(--background-color, rgba(255, 255, 255, 0.05)) !important;
-        padding: 0.5rem 1rem !important;
-        border-radius: 8px !important;
-        border: 1px solid var(--border-color, rgba(255, 255, 255, 0.1)) !important;
-        transition: all 0.3s ease !important;
-        color: var(--text-color, #e6edf3) !important;
-    }
-    
-    .stRadio label:hover {
-        background: rgba(102, 126, 234, 0.1) !important;
-        border-color: rgba(102, 126, 234, 0.3) !important;
-    }
-    
-    /* Divider Styling */
-    .stDivider {
-        margin: 2rem 0 !important;
-    }
-    
-    /* Code Block Styling - Dark theme compatible */
-    .stCode {
-        border-radius: 12px !important;
-        border: 1px solid var(--border-color, rgba(255, 255, 255, 0.1)) !important;
-        background: var(--background-color, rgba(0, 0, 0, 0.3)) !important;
-    }
-    
-    /* Markdown Content Styling - Dark theme compatible */
-    .stMarkdown {
-        line-height: 1.7 !important;
-        color: var(--text-color, #e6edf3) !important;
-    }
-    
-    .stMarkdown h1, .stMarkdown h2, .stMarkdown h3 {
-        color: var(--text-color, #e6edf3) !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Progress Bar */
-    .stProgress {
-        margin: 1rem 0 !important;
-    }
-    
-    /* Columns Gap */
-    .row-widget {
-        gap: 2rem !important;
-    }
-    
-    /* Hide Streamlit Branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* File Preview Styling - Dark theme compatible */
-    .file-preview {
-        background: var(--background-color, rgba(0, 0, 0, 0.2));
-        border: 1px solid var(--border-color, rgba(255, 255, 255, 0.1));
-        border-radius: 8px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
-        font-size: 12px;
-        color: var(--text-color, #e6edf3);
-        max-height: 200px;
-        overflow-y: auto;
-    }
-    
-    /* Metric styling - Dark theme compatible */
-    .stMetric {
-        background: var(--background-color, rgba(255, 255, 255, 0.05)) !important;
-        padding: 1rem !important;
-        border-radius: 8px !important;
-        border: 1px solid var(--border-color, rgba(255, 255, 255, 0.1)) !important;
-    }
-    
-    .stMetric label {
-        color: var(--text-color-secondary, #8b949e) !important;
-    }
-    
-    .stMetric [data-testid="metric-value"] {
-        color: var(--text-color, #e6edf3) !important;
-    }
-    
-    /* Tabs styling - Dark theme compatible */
-    .stTabs [data-baseweb="tab-list"] {
-        background: var(--background-color, rgba(0, 0, 0, 0.1)) !important;
-        border-radius: 8px !important;
-        padding: 0.5rem !important;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: transparent !important;
-        color: var(--text-color-secondary, #8b949e) !important;
-        border-radius: 6px !important;
-        margin: 0 0.25rem !important;
-    }
-    
-    .stTabs [data-baseweb="tab"][aria-selected="true"] {
-        background: rgba(102, 126, 234, 0.2) !important;
-        color: var(--text-color, #e6edf3) !important;
-    }
-    
-    /* Caption styling - Dark theme compatible */
-    .stCaption {
-        color: var(--text-color-secondary, #8b949e) !important;
-    }
-    
-    /* Spinner styling - Dark theme compatible */
-    .stSpinner {
-        color: #667eea !important;
-    }
-    
-    /* Animation Classes */
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(20px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    .fade-in {
-        animation: fadeIn 0.6s ease-out;
-    }
-    
-    /* Mobile Responsiveness */
-    @media (max-width: 768px) {
-        .main-header {
-            font-size: 2rem !important;
-        }
-        
-        .custom-card {
-            padding: 1.5rem !important;
-            margin-bottom: 1rem !important;
-        }
-        
-        .row-widget {
-            flex-direction: column !important;
-        }
-    }
-    
-    /* CSS Variables for theme compatibility */
-    :root {
-        --text-color: #e6edf3;
-        --text-color-secondary: #8b949e;
-        --background-color: rgba(255, 255, 255, 0.05);
-        --border-color: rgba(255, 255, 255, 0.1);
-    }
-    
-    /* Light theme overrides (when body has light theme class) */
-    .stApp[data-theme="light"] {
-        --text-color: #1f2937;
-        --text-color-secondary: #6b7280;
-        --background-color: rgba(255, 255, 255, 0.8);
-        --border-color: rgba(229, 231, 235, 0.8);
-    }
-    </style>
-    """, unsafe_allow_html=True)
+def add_custom_css():
+    """Load the stylesheet: a fingerprinted static file when Streamlit serves static/, inline otherwise"""
+    static_serving = bool(st.get_option("server.enableStaticServing"))
+    st.markdown(style_tags(static_serving, web_fonts_enabled()), unsafe_allow_html=True)
 
 def create_stat_card(icon, title, value, color="blue"):
     """Create a statistics card with dark theme compatibility"""
@@ -709,20 +466,17 @@ def main():
     # Add custom CSS
     add_custom_css()
     
-
-
-    # With this:
-    st.markdown("""
-    <div class="fade-in">
-        <h1 class="main-header">
-            <span class="header-emoji">✨</span>
-            <span class="header-text">README Generator Pro</span>
-        </h1>
-        <p class="main-subtitle">Generate comprehensive, professional README files for your projects using AI</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
     
     init_session_state()
+    bind_content_store()
+    
+    # A stream that was still running on the previous run was cancelled
+    if st.session_state.stream_in_progress:
+        st.session_state.stream_in_progress = False
+        if st.session_state.stream_partial:
+            st.session_state.readme_generated = st.session_state.stream_partial
+            st.warning("⏹️ Generation stopped. The partial README has been kept.")
     
     # Check if Gemini API is configured
     if not configure_gemini():
@@ -730,25 +484,33 @@ def main():
     
     # Statistics Row
     if st.session_state.file_contents or st.session_state.readme_generated:
-        col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
+        col_stat1, col_stat2, col_stat3, col_stat4, col_stat5 = st.columns(5)
         
         with col_stat1:
             st.markdown(create_stat_card("📁", "Files Uploaded", len(st.session_state.file_contents), "blue"), unsafe_allow_html=True)
         
         with col_stat2:
-            total_chars = sum(len(content) for content in st.session_state.file_contents.values())
-            st.markdown(create_stat_card("📊", "Total Characters", f"{total_chars:,}", "green"), unsafe_allow_html=True)
+            # Per-upload totals were computed at ingestion; this sums one record per upload, not per file
+            upload_totals = total_stats(entry["totals"] for entry in st.session_state.ingested_uploads.values())
+            st.markdown(create_stat_card("📊", "Total Characters", f"{upload_totals['chars']:,}", "green"), unsafe_allow_html=True)
         
         with col_stat3:
-            readme_length = len(st.session_state.readme_generated) if st.session_state.readme_generated else 0
+            readme_length = readme_metadata()["stats"]["chars"] if st.session_state.readme_generated else 0
             st.markdown(create_stat_card("📝", "README Length", f"{readme_length:,}", "orange"), unsafe_allow_html=True)
         
         with col_stat4:
             status = "Generated ✅" if st.session_state.readme_generated else "Pending ⏳"
             st.markdown(create_stat_card("🎯", "Status", status, "purple"), unsafe_allow_html=True)
         
+        with col_stat5:
+            cache_stats = get_response_cache().stats()
+            st.markdown(create_stat_card("⚡", "Cache Hits / Misses", f"{cache_stats['hits']} / {cache_stats['misses']}", "blue"), unsafe_allow_html=True)
+        
         st.markdown("<br>", unsafe_allow_html=True)
     
+    # Performance panel is filled in at the end of the run, once every stage has been timed
+    performance_placeholder = st.empty()
+    
     # Create two columns for better layout
     col1, col2 = st.columns([1, 1], gap="large")
     
@@ -783,58 +545,223 @@ def main():
             "Drag and drop your files here or click to browse",
             type=["py", "txt", "md", "json", "yaml", "yml", "html", "css", "js", 
                 "xml", "csv", "toml", "ini", "sh", "bat", "ps1", "sql", "log",
-                "gitignore", "dockerfile", "makefile", "requirements"],
+                "gitignore", "dockerfile", "makefile", "requirements",
+                "zip", "tar", "gz", "tgz"],
             accept_multiple_files=True,
             key=f"file_uploader_{st.session_state.reset_counter}",
-            help="Supported formats: Python, Config files, Documentation, Scripts, and more"
+            help="Supported formats: Python, Config files, Documentation, Scripts, and more. Upload a .zip or .tar.gz to import a whole repository."
         )
         
         # Process uploaded files with enhanced UI
         if uploaded_files:
-            st.session_state.file_contents = {}
+            ingested = st.session_state.ingested_uploads
+            content_store = st.session_state.file_contents
+            fingerprints = upload_fingerprints(uploaded_files)
+            
+            # Evict uploads that were removed or replaced since the last run
+            for fingerprint in set(ingested) - set(fingerprints):
+                del ingested[fingerprint]
+                content_store.discard(fingerprint)
+            current_ids = {getattr(uploaded_file, "file_id", None) for uploaded_file in uploaded_files}
+            for file_id in set(st.session_state.upload_digests) - current_ids:
+                del st.session_state.upload_digests[file_id]
             
-            # Create progress bar
-            progress_bar = st.progress(0)
-            status_text = st.empty()
+            # Per-file byte caps keep the whole upload within the total budget; archives share what is left
+            budgets = allocate_byte_budgets([uploaded_file.size for uploaded_file in uploaded_files],
+                                            archives=[is_archive(uploaded_file.name) for uploaded_file in uploaded_files])
             
-            for i, uploaded_file in enumerate(uploaded_files):
-                # Update progress
-                progress = (i + 1) / len(uploaded_files)
-                progress_bar.progress(progress)
-                status_text.text(f"Processing {uploaded_file.name}... ({i+1}/{len(uploaded_files)})")
+            # Only new or changed uploads are decoded again
+            pending = [(uploaded_file, fingerprint, budget)
+                       for uploaded_file, fingerprint, budget in zip(uploaded_files, fingerprints, budgets)
+                       if fingerprint not in ingested]
+            if pending:
+                # Create progress bar
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                trace = st.session_state.perf_trace
+                trace.discard("read_file_content", "read_archive")
+                
+                def update_progress(done, total, item):
+                    # Completion callback, runs on the script thread
+                    progress_bar.progress(done / total)
+                    status_text.text(f"Processed {item[0]} ({done}/{total})")
+                
+                # Decoding is CPU-bound Python, so it runs on worker processes; results come back in upload order
+                uploads = [(uploaded_file.name, uploaded_file.getvalue(), budget) for uploaded_file, _, budget in pending]
+                workers = choose_processes(sum(uploaded_file.size for uploaded_file, _, _ in pending))
+                entries = map_ordered(decode_upload, uploads, workers, update_progress, processes=True)
+                for (_, fingerprint, _), entry in zip(pending, entries):
+                    timing = entry.pop("timing")
+                    trace.record(timing.pop("stage"), timing.pop("seconds"), **timing)
+                    # Only compressed bytes are kept; files are decoded again when read
+                    content_store.add(fingerprint, entry.pop("blobs"))
+                    ingested[fingerprint] = entry
                 
-                content = read_file_content(uploaded_file)
-                st.session_state.file_contents[uploaded_file.name] = content
+                # Clear progress indicators
+                progress_bar.empty()
+                status_text.empty()
             
-            # Clear progress indicators
-            progress_bar.empty()
-            status_text.empty()
+            # Merge in upload order; nothing is decoded here
+            content_store.arrange(fingerprints)
+            st.session_state.file_stats = {}
+            st.session_state.file_signatures = {}
+            for fingerprint in fingerprints:
+                st.session_state.file_stats.update(ingested[fingerprint]["stats"])
+                st.session_state.file_signatures.update(ingested[fingerprint]["signatures"])
             
-            # Enhanced file preview
-            with st.expander(f"📂 File Preview ({len(uploaded_files)} files processed)", expanded=False):
-                tabs = st.tabs([f"📄 {file.name}" for file in uploaded_files[:5]])  # Limit to 5 tabs
+            sampled_files = []
+            for (upload_name, _, _), entry in ingested.items():
+                report = entry["archive_report"]
+                if report is not None:
+                    st.caption(f"🗜️ {upload_name}: {report['read']} files read • {report['ignored']} ignored • "
+                               f"{report['binary']} binary • {report['sampled']} sampled • {report['skipped']} skipped "
+                               f"({report['dropped_bytes']:,} bytes dropped)")
+                if entry["sampling"] is not None:
+                    sampled_files.append({"file": upload_name, **entry["sampling"]})
+            
+            if sampled_files:
+                with st.expander(f"✂️ {len(sampled_files)} oversized files sampled (head, tail and middle lines kept)", expanded=False):
+                    st.dataframe(sampled_files, use_container_width=True, hide_index=True)
+            
+            # File browser: only the visible page is previewed, so reruns stay cheap with thousands of files
+            file_names = list(st.session_state.file_contents)
+            with st.expander(f"📂 File Preview ({len(file_names)} files processed)", expanded=False):
+                browser_query = st.text_input(
+                    "🔍 Filter files",
+                    placeholder="name or glob, e.g. src/*.py",
+                    key=f"browser_query_{st.session_state.reset_counter}"
+                )
+                matching = filter_files(file_names, browser_query)
+                page_count = paginate(matching, 1)[1]
+                browser_page = st.number_input(
+                    f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1,
+                    key=f"browser_page_{st.session_state.reset_counter}"
+                )
+                page_names, _ = paginate(matching, browser_page)
                 
-                for i, (tab, uploaded_file) in enumerate(zip(tabs, uploaded_files[:5])):
-                    with tab:
-                        content = st.session_state.file_contents[uploaded_file.name]
-                        if content.startswith("[Binary file:") or content.startswith("[Error reading"):
-                            st.info(content)
-                        else:
-                            # Determine file type for syntax highlighting
-                            file_ext = uploaded_file.name.split('.')[-1].lower()
-                            lang_map = {
-                                'py': 'python', 'js': 'javascript', 'html': 'html',
-                                'css': 'css', 'json': 'json', 'yaml': 'yaml',
-                                'yml': 'yaml', 'sh': 'bash', 'sql': 'sql'
-                            }
-                            
-                            preview = content[:1000] + "\n\n... (truncated)" if len(content) > 1000 else content
-                            st.code(preview, language=lang_map.get(file_ext, 'text'))
-                            
-                            # File stats
-                            st.caption(f"📊 {len(content)} characters • {len(content.splitlines())} lines")
+                if page_names:
+                    selected_file = st.selectbox(
+                        f"📄 {len(matching)} matching files",
+                        page_names,
+                        key=f"browser_file_{st.session_state.reset_counter}"
+                    )
+                    preview = file_preview(selected_file, st.session_state.file_contents[selected_file])
+                    if preview["placeholder"]:
+                        st.info(preview["preview"])
+                    else:
+                        st.code(preview["preview"], language=preview["language"])
+                        file_stats = st.session_state.file_stats[selected_file]
+                        st.caption(f"📊 {file_stats['chars']:,} characters • {file_stats['lines']:,} lines • "
+                                   f"{file_stats['words']:,} words • ~{file_stats['tokens']:,} tokens • {file_stats['language']}")
+                else:
+                    st.caption("No files match the filter.")
             
-            st.success(f"✅ Successfully processed {len(uploaded_files)} files!")
+            st.success(f"✅ Successfully processed {len(file_names)} files!")
+        elif st.session_state.ingested_uploads:
+            # Every upload was removed
+            st.session_state.ingested_uploads = {}
+            st.session_state.upload_digests = {}
+            st.session_state.file_contents.clear()
+            st.session_state.file_stats = {}
+            st.session_state.file_signatures = {}
+        
+        # Parsed manifests replace the raw files in the prompt
+        facts_mode = st.checkbox(
+            "🧾 Use parsed project facts",
+            value=True,
+            help="Parse requirements, pyproject.toml, setup.py/cfg, package.json, Dockerfile and LICENSE locally and send a compact facts table instead of the raw files"
+        )
+        
+        # Lockfiles, bundles and copies of the same file add tokens but no information
+        dedup_mode = st.checkbox(
+            "♻️ Collapse duplicates and boilerplate",
+            value=True,
+            help="Drop lockfiles, minified bundles and source maps, and send one representative for exact or near-identical files (generated migrations, fixtures, vendored copies)"
+        )
+        
+        # Skeleton mode sends signatures instead of full source files
+        skeleton_mode = st.checkbox(
+            "🦴 Skeleton mode for source files",
+            value=False,
+            help="Send only docstrings, class/function signatures, CLI definitions and __main__ blocks of Python, JS/TS and shell files"
+        )
+        # Reduction reports are filled in below, once the token budget is known
+        reduction_notes = st.container()
+        
+        reductions = {"skeleton": skeleton_mode, "project_facts": facts_mode, "dedup": dedup_mode}
+        
+        # Context budget for the uploaded files
+        token_budget = st.number_input(
+            "🎯 Context token budget",
+            min_value=1_000,
+            max_value=1_000_000,
+            value=DEFAULT_TOKEN_BUDGET,
+            step=10_000,
+            help="Maximum estimated tokens of file content sent to the model. Lower-value files are truncated or summarized first."
+        )
+        
+        reports = {"facts_block": "", "dedup": None, "skeleton": None, "packing": None}
+        if st.session_state.file_contents:
+            reports = get_reduction_reports(tuple(st.session_state.ingested_uploads), st.session_state.file_contents,
+                                            st.session_state.file_signatures, facts_mode, dedup_mode, skeleton_mode,
+                                            token_budget)
+        with reduction_notes:
+            if reports["facts_block"]:
+                with st.expander(f"🧾 Project Facts ({reports['manifests']} manifests parsed)", expanded=False):
+                    st.markdown(reports["facts_block"])
+            dedup_report = reports["dedup"]
+            if dedup_report and (dedup_report["boilerplate"] or dedup_report["duplicates"]):
+                collapsed = sum(len(group["duplicates"]) for group in dedup_report["duplicates"])
+                with st.expander(f"♻️ Deduplication saved {dedup_report['saved_bytes']:,} bytes "
+                                 f"(~{dedup_report['saved_tokens']:,} tokens)", expanded=False):
+                    st.caption(f"{len(dedup_report['boilerplate'])} boilerplate files dropped, "
+                               f"{collapsed} duplicates collapsed into {len(dedup_report['duplicates'])} representatives.")
+                    st.dataframe(
+                        dedup_report["boilerplate"] + [
+                            {"file": group["file"], "reason": f"represents {', '.join(group['duplicates'])}"}
+                            for group in dedup_report["duplicates"]
+                        ],
+                        use_container_width=True, hide_index=True
+                    )
+            skeleton_stats = reports["skeleton"]
+            if skeleton_stats:
+                before = sum(stat["tokens"] for stat in skeleton_stats)
+                after = sum(stat["skeleton_tokens"] for stat in skeleton_stats)
+                st.caption(f"🦴 {len(skeleton_stats)} source files reduced from ~{before:,} to ~{after:,} tokens "
+                           f"({100 - after * 100 // max(before, 1)}% smaller)")
+        
+        packing = reports["packing"]
+        if packing:
+            with st.expander(f"📦 Context Packing ({packing['used_tokens']:,} / {packing['token_budget']:,} tokens)", expanded=False):
+                st.caption(f"Uploaded files total ~{packing['total_tokens']:,} tokens. Manifests, entry points and config are packed before docs, tests, logs and data.")
+                st.dataframe(packing["decisions"], use_container_width=True, hide_index=True)
+        
+        # Map-reduce mode for projects that do not fit one context window
+        map_reduce_mode = st.checkbox(
+            "🧩 Large project mode (map-reduce)",
+            value=False,
+            help="Summarize file chunks in parallel first, then write the README from the summaries"
+        )
+        
+        # Section-parallel mode writes every README section concurrently
+        sections_mode = st.checkbox(
+            "📑 Write sections in parallel",
+            value=False,
+            disabled=map_reduce_mode,
+            help="Plan the section list locally, write each section concurrently from only the files relevant to it, then assemble the README with a table of contents"
+        ) and not map_reduce_mode
+        
+        # Retrieval keeps per-section prompts flat however large the project is
+        retrieval_mode = st.checkbox(
+            "🔎 Retrieve relevant chunks per section",
+            value=False,
+            help="Index the files by function/class and heading (BM25) and give each section, or a regenerated section, only its top matching chunks"
+        )
+        map_workers = DEFAULT_MAX_WORKERS
+        if map_reduce_mode:
+            map_workers = st.slider("Parallel summarizers", min_value=1, max_value=16, value=DEFAULT_MAX_WORKERS)
+        elif sections_mode:
+            map_workers = st.slider("Parallel section writers", min_value=1, max_value=16, value=DEFAULT_MAX_WORKERS)
         
         st.markdown("<br>", unsafe_allow_html=True)
         
@@ -849,6 +776,11 @@ def main():
                 use_container_width=True,
                 help="Click to generate your README based on the project description and uploaded files"
             )
+            stream_output = st.checkbox(
+                "⚡ Stream output live",
+                value=True,
+                help="Show the README as it is written instead of waiting for the full response"
+            )
         
         with generate_col2:
             if st.button("🔄 Reset", type="secondary", use_container_width=True):
@@ -857,8 +789,13 @@ def main():
                 
                 # Clear specific session state values but keep reset_counter
                 st.session_state.files_processed = False
-                st.session_state.file_contents = {}
+                st.session_state.file_contents.clear()
+                st.session_state.file_stats = {}
+                st.session_state.file_signatures = {}
+                st.session_state.ingested_uploads = {}
+                st.session_state.upload_digests = {}
                 st.session_state.chat_history = []
+                st.session_state.refine_chat = RefinementChat()
                 st.session_state.readme_generated = ""
                 st.session_state.raw_prompt = ""
                 
@@ -867,23 +804,56 @@ def main():
         
         # Generate README logic
         if generate_clicked:
-            if raw_prompt.strip():
-                with st.spinner("🤖 AI is crafting your professional README..."):
-                    # Enhanced progress indication
-                    progress_container = st.empty()
-                    
-                    with progress_container.container():
-                        st.info("🔍 Analyzing your project...")
-                        readme_content = generate_readme(raw_prompt, st.session_state.file_contents)
-                    
-                    progress_container.empty()
-                    
-                    if readme_content:
-                        st.session_state.readme_generated = readme_content
-                        st.success("🎉 README generated successfully!")
-                        st.balloons()
-                    else:
-                        st.error("❌ Failed to generate README. Please try again.")
+            st.session_state.perf_trace.discard("prompt_assembly", "model_call")
+            if raw_prompt.strip() and map_reduce_mode:
+                queue_status = st.empty()
+                map_progress = st.progress(0, text="🧩 Summarizing project files in parallel...")
+                readme_content = generate_readme_map_reduce(
+                    raw_prompt, st.session_state.file_contents, queue_status, map_workers,
+                    on_progress=lambda done, total: map_progress.progress(
+                        done / total, text=f"🧩 Summarized {done}/{total} chunks"),
+                    **reductions
+                )
+                map_progress.empty()
+                
+                if readme_content:
+                    st.session_state.readme_generated = readme_content
+                    st.success("🎉 README generated successfully!")
+                    st.balloons()
+                else:
+                    st.error("❌ Failed to generate README. Please try again.")
+            elif raw_prompt.strip() and sections_mode:
+                queue_status = st.empty()
+                section_progress = st.progress(0, text="📑 Writing README sections in parallel...")
+                readme_content, _ = generate_readme_sections(
+                    raw_prompt, st.session_state.file_contents, queue_status, map_workers,
+                    on_progress=lambda done, total: section_progress.progress(
+                        done / total, text=f"📑 Wrote {done}/{total} sections"),
+                    retrieval=retrieval_mode, **reductions
+                )
+                section_progress.empty()
+                
+                if readme_content:
+                    st.session_state.readme_generated = readme_content
+                    st.success("🎉 README generated successfully!")
+                    st.balloons()
+                else:
+                    st.error("❌ Failed to generate README. Please try again.")
+            elif raw_prompt.strip() and stream_output:
+                # Streaming renders into the output column below
+                pass
+            elif raw_prompt.strip():
+                # Queue position and ETA replace the spinner while waiting for a generation slot
+                queue_status = st.empty()
+                readme_content = generate_readme(raw_prompt, st.session_state.file_contents, queue_status, token_budget,
+                                                 **reductions)
+                
+                if readme_content:
+                    st.session_state.readme_generated = readme_content
+                    st.success("🎉 README generated successfully!")
+                    st.balloons()
+                else:
+                    st.error("❌ Failed to generate README. Please try again.")
             else:
                 st.warning("⚠️ Please enter a project description first")
     
@@ -898,6 +868,22 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
+        # Stream the README straight into the output column
+        if generate_clicked and raw_prompt.strip() and stream_output and not map_reduce_mode and not sections_mode:
+            st.button("⏹️ Stop Generating", type="secondary", use_container_width=True,
+                      help="Stop the generation and keep what has been written so far")
+            stream_placeholder = st.empty()
+            readme_content = stream_readme_to_placeholder(raw_prompt, st.session_state.file_contents, stream_placeholder,
+                                                          token_budget, **reductions)
+            
+            if readme_content:
+                st.session_state.readme_generated = readme_content
+                st.session_state.stream_partial = ""
+                st.success("🎉 README generated successfully!")
+                st.balloons()
+            elif readme_content is not None:
+                st.error("❌ Failed to generate README. Please try again.")
+        
         if st.session_state.readme_generated:
             # Enhanced display mode selector
             st.markdown("### 👀 Preview Options")
@@ -915,14 +901,19 @@ def main():
             col_copy, col_download, col_clear = st.columns(3)
             
             with col_copy:
-                # Add the modern copy button
-                copy_button_html = create_copy_button(st.session_state.readme_generated)
-                st.components.v1.html(copy_button_html, height=80)
+                # Built once per README version; oversized READMEs are offered as a download only
+                readme_text = st.session_state.readme_generated
+                if len(readme_text) <= COPY_MAX_CHARS:
+                    copy_button_html = create_copy_button(readme_metadata()["digest"], readme_text)
+                    st.components.v1.html(copy_button_html, height=80)
+                else:
+                    st.caption(f"📋 README is over {COPY_MAX_CHARS:,} characters; use the download button instead.")
             
             with col_download:
+                # Streamlit stores download data by content hash, so an unchanged README is not registered twice
                 st.download_button(
                     label="📥 Download README.md",
-                    data=st.session_state.readme_generated,
+                    data=readme_metadata()["readme_bytes"],
                     file_name="README.md",
                     mime="text/markdown",
                     use_container_width=True,
@@ -932,124 +923,150 @@ def main():
             with col_clear:
                 if st.button("🗑️ Clear All", type="secondary", use_container_width=True):
                     st.session_state.readme_generated = ""
-                    st.session_state.file_contents = {}
+                    st.session_state.file_contents.clear()
+                    st.session_state.file_stats = {}
+                    st.session_state.file_signatures = {}
+                    st.session_state.ingested_uploads = {}
+                    st.session_state.chat_history = []
+                    st.session_state.refine_chat = RefinementChat()
                     st.rerun()
             
+            # Rewrite one section from its own context instead of regenerating everything
+            readme_sections = readme_metadata()["sections"]
+            editable = [index for index, (heading, _) in enumerate(readme_sections) if heading != TOC_HEADING]
+            if editable:
+                with st.expander("🔁 Regenerate a section", expanded=False):
+                    section_index = st.selectbox(
+                        "Section",
+                        editable,
+                        format_func=lambda index: readme_sections[index][0],
+                        key=f"regenerate_section_{st.session_state.reset_counter}"
+                    )
+                    section_instructions = st.text_input(
+                        "What should change? (optional)",
+                        placeholder="e.g. add a Docker example, be more concise",
+                        key=f"regenerate_instructions_{st.session_state.reset_counter}"
+                    )
+                    if st.button("🔁 Regenerate this section", use_container_width=True,
+                                 disabled=not raw_prompt.strip()):
+                        section_status = st.empty()
+                        readme_content = regenerate_readme_section_in_place(
+                            section_index, section_instructions, raw_prompt,
+                            st.session_state.file_contents, section_status, retrieval=retrieval_mode, **reductions
+                        )
+                        if readme_content:
+                            st.session_state.readme_generated = readme_content
+                            st.rerun()
+            
+            # Follow-up chat: small edits without regenerating or resending the project files
+            with st.expander("💬 Refine with chat", expanded=bool(st.session_state.chat_history)):
+                for message in st.session_state.chat_history:
+                    with st.chat_message(message["role"]):
+                        st.markdown(message["content"])
+                with st.form(f"refine_form_{st.session_state.reset_counter}", clear_on_submit=True):
+                    refine_instruction = st.text_input(
+                        "Ask for a change",
+                        placeholder="e.g. shorten the Features section, add a Docker quick start"
+                    )
+                    refine_submitted = st.form_submit_button("💬 Send", use_container_width=True)
+                if refine_submitted and refine_instruction.strip():
+                    refine_status = st.empty()
+                    result = refine_readme(refine_instruction.strip(), refine_status)
+                    if result:
+                        readme_content, reply, changed = result
+                        st.session_state.chat_history.append({"role": "user", "content": refine_instruction.strip()})
+                        summary = f"Updated: {', '.join(changed)}" if changed else reply
+                        st.session_state.chat_history.append({"role": "assistant", "content": summary})
+                        st.session_state.readme_generated = readme_content
+                        st.rerun()
+                if st.session_state.chat_history:
+                    st.caption(f"Chat context ~{st.session_state.refine_chat.history_tokens():,} tokens; "
+                               "older turns are summarized automatically.")
+            
             
             # Display the generated README based on selected mode
-            if display_mode == "🎨 Rendered Preview":
-                # Clean up the markdown content first
-                cleaned_content = st.session_state.readme_generated.strip()
+            st.session_state.perf_trace.discard("render_preview")
+            readme_stats = readme_metadata()["stats"]
+            with st.session_state.perf_trace.span("render_preview", mode=display_mode,
+                                                  bytes=readme_stats["bytes"], tokens=readme_stats["tokens"]):
+                if display_mode == "🎨 Rendered Preview":
+                    # Clean up the markdown content first
+                    cleaned_content = st.session_state.readme_generated.strip()
                 
-                # Fix common markdown rendering issues in Streamlit
-                if cleaned_content.startswith("```markdown"):
-                    cleaned_content = cleaned_content[11:]
-                if cleaned_content.startswith("```"):
-                    first_newline = cleaned_content.find('\n')
-                    if first_newline != -1:
-                        cleaned_content = cleaned_content[first_newline + 1:]
-                if cleaned_content.endswith("```"):
-                    cleaned_content = cleaned_content[:-3]
+                    # Fix common markdown rendering issues in Streamlit
+                    if cleaned_content.startswith("```markdown"):
+                        cleaned_content = cleaned_content[11:]
+                    if cleaned_content.startswith("```"):
+                        first_newline = cleaned_content.find('\n')
+                        if first_newline != -1:
+                            cleaned_content = cleaned_content[first_newline + 1:]
+                    if cleaned_content.endswith("```"):
+                        cleaned_content = cleaned_content[:-3]
                 
-                # Enhanced container for rendered markdown
+                    # Enhanced container for rendered markdown
 
                 
-                # Display the cleaned markdown content
-                st.markdown(cleaned_content, unsafe_allow_html=True)
+                    # Display the cleaned markdown content
+                    st.markdown(cleaned_content, unsafe_allow_html=True)
                 
-            elif display_mode == "📝 Raw Markdown":
-                st.markdown("#### Raw Markdown Content")
-                st.text_area(
-                    "Copy this content to your README.md file:",
-                    value=st.session_state.readme_generated,
-                    height=600,
-                    key="raw_markdown_display",
-                    help="This is the raw markdown that you can copy and paste"
-                )
+                elif display_mode == "📝 Raw Markdown":
+                    st.markdown("#### Raw Markdown Content")
+                    st.text_area(
+                        "Copy this content to your README.md file:",
+                        value=st.session_state.readme_generated,
+                        height=600,
+                        key="raw_markdown_display",
+                        help="This is the raw markdown that you can copy and paste"
+                    )
                 
-            else:  # Code View
-                st.markdown("#### Code Block View")
-                st.code(st.session_state.readme_generated, language="markdown")
+                else:  # Code View
+                    st.markdown("#### Code Block View")
+                    st.code(st.session_state.readme_generated, language="markdown")
             
             # Additional stats for generated README
             st.markdown("<br>", unsafe_allow_html=True)
             readme_stats_col1, readme_stats_col2, readme_stats_col3 = st.columns(3)
             
             with readme_stats_col1:
-                lines = len(st.session_state.readme_generated.splitlines())
-                st.metric("📏 Lines", lines, help="Total number of lines in README")
+                st.metric("📏 Lines", readme_stats["lines"], help="Total number of lines in README")
             
             with readme_stats_col2:
-                words = len(st.session_state.readme_generated.split())
-                st.metric("📝 Words", words, help="Total word count")
+                st.metric("📝 Words", readme_stats["words"], help="Total word count")
             
             with readme_stats_col3:
-                chars = len(st.session_state.readme_generated)
-                st.metric("🔤 Characters", chars, help="Total character count")
+                st.metric("🔤 Characters", readme_stats["chars"], help="Total character count")
                 
         else:
             # Enhanced empty state
-            st.markdown("""
-            <div style="
-                text-align: center;
-                padding: 4rem 2rem;
-                background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-                border-radius: 20px;
-                border: 2px dashed #cbd5e0;
-                margin: 2rem 0;
-            ">
-                <div style="font-size: 4rem; margin-bottom: 1rem;">📝</div>
-                <h3 style="color: #4a5568; margin-bottom: 1rem;">Ready to Generate!</h3>
-                <p style="color: #718096; font-size: 1.1rem; line-height: 1.6;">
-                    👈 Enter your project description and optionally upload files,<br>
-                    then click <strong>'Generate Professional README'</strong> to create<br>
-                    a comprehensive documentation for your project.
-                </p>
-                <div style="margin-top: 2rem;">
-                    <div style="
-                        display: inline-flex;
-                        align-items: center;
-                        gap: 1rem;
-                        background: white;
-                        padding: 1rem 2rem;
-                        border-radius: 12px;
-                        box-shadow: 0 4px 12px rgba(0,0,0,0.08);
-                        border: 1px solid #e2e8f0;
-                    ">
-                        <span style="font-size: 1.5rem;">🚀</span>
-                        <span style="color: #4a5568; font-weight: 500;">AI-Powered • Professional • Comprehensive</span>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(EMPTY_STATE_HTML, unsafe_allow_html=True)
     
     # Enhanced Footer
     st.markdown("<br><br>", unsafe_allow_html=True)
-    st.markdown("""
-    <div style="
-        text-align: center;
-        padding: 2rem;
-        background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-        border-radius: 16px;
-        margin-top: 3rem;
-        border: 1px solid rgba(229, 231, 235, 0.8);
-    ">
-        <div style="
-            font-size: 1.5rem;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            font-weight: 600;
-            margin-bottom: 0.5rem;
-        ">
-            ✨ README Generator Pro
-        </div>
-        <p style="color: #6b7280; font-size: 0.9rem; margin: 0;">
-            Powered by AI • Built with ❤️ • Create professional documentation in seconds
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+    
+    # Performance panel next to the statistics row
+    performance_summary = st.session_state.perf_trace.summary()
+    if performance_summary:
+        with performance_placeholder.container():
+            with st.expander("⏱️ Performance", expanded=False):
+                st.dataframe(performance_summary, use_container_width=True, hide_index=True)
+                queue_stats = get_scheduler().stats()
+                st.caption(f"Generation queue (all sessions): {queue_stats['running']} running, {queue_stats['queued']} queued "
+                           f"from {queue_stats['sessions_waiting']} sessions, ~{queue_stats['average_job_seconds']}s per job")
+                client_stats = get_client().stats()
+                st.caption(f"Gemini client (all sessions): {client_stats['calls']} calls, {client_stats['retries']} retries, "
+                           f"{client_stats['failures']} failures, {client_stats['throttled_seconds']:.1f}s waiting on rate limits")
+                store_stats = get_content_stores().stats()
+                st.caption(f"Uploaded content (all sessions): {store_stats['sessions']} sessions, {store_stats['files']:,} files, "
+                           f"{store_stats['raw_bytes']:,} bytes stored as {store_stats['resident_bytes']:,} in memory + "
+                           f"{store_stats['spilled_bytes']:,} on disk, {store_stats['evicted']} idle sessions evicted")
+                st.download_button(
+                    label="📊 Export timings (JSON)",
+                    data=st.session_state.perf_trace.to_json(),
+                    file_name="readme_generator_timings.json",
+                    mime="application/json",
+                    help="Per-stage wall-clock time, bytes and token counts"
+                )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
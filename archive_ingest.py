@@ -0,0 +1,233 @@
+"""Read a zipped, tarred or on-disk repository into a {path: content} mapping
+
+Archives are read member by member without extracting to disk. Ignored
+paths (built-in defaults plus any .gitignore in the archive) and binary
+members are skipped; binaries are detected from their first bytes.
+"""
+import os
+import posixpath
+import re
+import tarfile
+import zipfile
+
+from sampled_read import DEFAULT_MAX_TOTAL_BYTES, MIN_FILE_BYTES, read_sampled
+from text_sniff import BINARY_EXTENSIONS, SNIFF_BYTES, decode_text, detect_encoding, looks_binary
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar.gz', '.tgz', '.tar')
+DEFAULT_MAX_MEMBER_BYTES = 512 * 1024
+
+DEFAULT_IGNORES = [
+    '.git/', '.hg/', '.svn/', 'node_modules/', '__pycache__/', '.venv/', 'venv/', 'env/',
+    '.tox/', '.nox/', '.mypy_cache/', '.pytest_cache/', '.ruff_cache/', '.idea/', '.vscode/',
+    'build/', 'dist/', 'target/', 'out/', '.next/', '.nuxt/', 'coverage/', '*.egg-info/',
+    '.DS_Store', 'Thumbs.db', '*.pyc', '*.pyo', '*.class', '*.o', '*.so', '*.dll', '*.exe',
+]
+
+def is_archive(filename):
+    """True if filename looks like a supported repository archive"""
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _glob_to_regex(pattern):
+    """Translate a gitignore glob into a regular expression"""
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            regex += '/.*'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif pattern[i] == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                regex += re.escape(pattern[i])
+                i += 1
+            else:
+                regex += '[' + pattern[i + 1:end].replace('!', '^', 1) + ']'
+                i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex + r'\Z')
+
+
+class IgnoreRules:
+    """Ordered gitignore rules; the last matching rule wins"""
+
+    def __init__(self, patterns=None):
+        self.rules = []
+        if patterns:
+            self.add(patterns)
+
+    def add(self, lines, base=''):
+        """Add gitignore lines that apply below directory base"""
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            line = line.rstrip(' ')
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line
+            self.rules.append((base, _glob_to_regex(line.lstrip('/')), negate, dir_only, anchored))
+
+    def _matches(self, path, is_dir):
+        ignored = False
+        for base, regex, negate, dir_only, anchored in self.rules:
+            if base:
+                if not path.startswith(base + '/'):
+                    continue
+                relative = path[len(base) + 1:]
+            else:
+                relative = path
+            if dir_only and not is_dir:
+                continue
+            target = relative if anchored else posixpath.basename(relative)
+            if regex.match(target):
+                ignored = not negate
+        return ignored
+
+    def is_ignored(self, path, is_dir=False):
+        """True if path or any of its parent directories is ignored"""
+        parts = path.split('/')
+        for depth in range(1, len(parts)):
+            if self._matches('/'.join(parts[:depth]), True):
+                return True
+        return self._matches(path, is_dir)
+
+
+def _common_root(paths):
+    """Single top-level directory shared by every path (e.g. repo-main/), or ''"""
+    roots = {path.split('/', 1)[0] for path in paths}
+    if len(roots) == 1 and all('/' in path for path in paths):
+        return roots.pop() + '/'
+    return ''
+
+
+def _iter_zip_members(fileobj):
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            with archive.open(info) as member:
+                yield info.filename, info.file_size, member
+
+
+def _iter_tar_members(fileobj):
+    # "r|*" reads the archive as a forward-only stream
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for info in archive:
+            if not info.isfile():
+                continue
+            member = archive.extractfile(info)
+            if member is not None:
+                yield info.name, info.size, member
+
+
+def _iter_directory_members(root, default_rules):
+    for directory, dirnames, filenames in os.walk(root):
+        relative_dir = os.path.relpath(directory, root).replace(os.sep, '/')
+        relative_dir = '' if relative_dir == '.' else relative_dir + '/'
+        # Prune ignored directories so os.walk never descends into them
+        dirnames[:] = sorted(d for d in dirnames if not default_rules.is_ignored(relative_dir + d, is_dir=True))
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as member:
+                yield relative_dir + filename, os.path.getsize(path), member
+
+
+def read_archive(fileobj, filename, max_member_bytes=DEFAULT_MAX_MEMBER_BYTES,
+                 max_total_bytes=DEFAULT_MAX_TOTAL_BYTES):
+    """Read text members of a .zip/.tar(.gz) archive into {path: content}
+
+    Returns (file_contents, report) where report counts the members that
+    were read, sampled down to max_member_bytes, or skipped because they
+    were ignored, binary, or left out once max_total_bytes of text had been
+    kept.
+    """
+    members = _iter_zip_members(fileobj) if filename.lower().endswith('.zip') else _iter_tar_members(fileobj)
+    return _read_members(members, max_member_bytes, max_total_bytes, strip_root=True)
+
+
+def read_directory(root, max_member_bytes=DEFAULT_MAX_MEMBER_BYTES, max_total_bytes=DEFAULT_MAX_TOTAL_BYTES):
+    """Read text files below a repository checkout, same rules as read_archive"""
+    members = _iter_directory_members(root, IgnoreRules(DEFAULT_IGNORES))
+    return _read_members(members, max_member_bytes, max_total_bytes, strip_root=False)
+
+
+def _read_members(members, max_member_bytes, max_total_bytes, strip_root):
+    default_rules = IgnoreRules(DEFAULT_IGNORES)
+    candidates = {}
+    gitignores = {}
+    report = {"read": 0, "ignored": 0, "binary": 0, "sampled": 0, "skipped": 0, "dropped_bytes": 0}
+    remaining = max_total_bytes
+
+    for name, size, member in members:
+        name = posixpath.normpath(name.replace('\\', '/')).lstrip('/')
+        if name.startswith('../') or default_rules.is_ignored(name):
+            report["ignored"] += 1
+            continue
+        if name.rsplit('.', 1)[-1].lower() in BINARY_EXTENSIONS:
+            report["binary"] += 1
+            continue
+        head = member.read(SNIFF_BYTES)
+        if looks_binary(head):
+            report["binary"] += 1
+            continue
+
+        encoding = detect_encoding(head)
+        is_gitignore = posixpath.basename(name) == '.gitignore'
+        # The floor counts against the total; once it is spent, members are skipped
+        budget = min(max_member_bytes, remaining)
+        skipped = budget < min(size, MIN_FILE_BYTES)
+        if skipped:
+            report["skipped"] += 1
+            report["dropped_bytes"] += size
+            if not is_gitignore:
+                continue
+        content, sampling = read_sampled(member, MIN_FILE_BYTES if skipped else budget, encoding,
+                                         decode=lambda data: decode_text(data, encoding), first_chunk=head)
+        if is_gitignore:
+            gitignores[posixpath.dirname(name)] = content.splitlines()
+        if skipped:
+            # A skipped .gitignore still filters the members kept so far
+            continue
+        if sampling is not None:
+            report["sampled"] += 1
+            report["dropped_bytes"] += sampling["dropped_bytes"]
+        remaining -= min(size, budget)
+        candidates[name] = content
+
+    # .gitignore files can appear anywhere in a stream, so apply them last
+    root = _common_root(list(candidates)) if strip_root else ''
+    rules = IgnoreRules()
+    for directory in sorted(gitignores, key=lambda d: d.count('/')):
+        base = (directory + '/')[len(root):].strip('/')
+        rules.add(gitignores[directory], base)
+
+    file_contents = {}
+    for name in sorted(candidates):
+        relative = name[len(root):]
+        if rules.is_ignored(relative):
+            report["ignored"] += 1
+            continue
+        file_contents[relative] = candidates[name]
+        report["read"] += 1
+
+    return file_contents, report
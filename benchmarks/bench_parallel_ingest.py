@@ -0,0 +1,54 @@
+"""Compare sequential, threaded and process-pool upload decoding
+
+Run from the project root:
+    python benchmarks/bench_parallel_ingest.py
+
+Scenarios: 1,000 small (8 KB) files and 20 multi-MB (4 MB) files.
+
+Decoding and sampling are pure Python and hold the GIL, so threads cannot
+speed them up; the process pool scales with the number of CPUs. On a
+single-CPU host the app never uses the pool (choose_processes returns 1).
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parallel_ingest import DEFAULT_MAX_WORKERS, PROCESS_WORKERS, decode_upload, get_process_pool, map_ordered
+from sampled_read import DEFAULT_MAX_FILE_BYTES
+
+
+def make_uploads(count, size):
+    line = b"value = compute(value)  # keep going\n"
+    return [(f"module_{i}.py", line * (size // len(line)), DEFAULT_MAX_FILE_BYTES) for i in range(count)]
+
+
+def best_of(runs, uploads, func):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(uploads)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    scenarios = [("1k small files", 1_000, 8 * 1024), ("20 multi-MB files", 20, 4 * 1024 * 1024)]
+    print(f"cpus={os.cpu_count()} threads={DEFAULT_MAX_WORKERS} processes={PROCESS_WORKERS}")
+    if PROCESS_WORKERS > 1:
+        # Start the workers outside the timings, as the app keeps its pool for the life of the process
+        map_ordered(decode_upload, make_uploads(PROCESS_WORKERS * 2, 1024), PROCESS_WORKERS, processes=True)
+    print(f"{'scenario':<20}{'sequential':>12}{'threads':>12}{'processes':>12}{'speedup':>10}")
+    for label, count, size in scenarios:
+        uploads = make_uploads(count, size)
+        sequential = best_of(3, uploads, lambda items: [decode_upload(item) for item in items])
+        threaded = best_of(3, uploads, lambda items: map_ordered(decode_upload, items, DEFAULT_MAX_WORKERS))
+        pooled = best_of(3, uploads, lambda items: map_ordered(decode_upload, items, PROCESS_WORKERS, processes=True))
+        print(f"{label:<20}{sequential:>11.3f}s{threaded:>11.3f}s{pooled:>11.3f}s{sequential / pooled:>9.2f}x")
+    if get_process_pool() is not None:
+        get_process_pool().shutdown()
+
+
+if __name__ == "__main__":
+    main()
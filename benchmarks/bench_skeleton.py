@@ -0,0 +1,37 @@
+"""Measure prompt reduction from skeleton mode
+
+Run from the project root, optionally against another checkout:
+    python benchmarks/bench_skeleton.py [path/to/project]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archive_ingest import read_directory
+from context_packer import estimate_tokens
+from skeleton import skeletonize_files
+
+
+def main():
+    root = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    file_contents, _ = read_directory(root)
+
+    started = time.perf_counter()
+    reduced, stats = skeletonize_files(file_contents)
+    elapsed = time.perf_counter() - started
+
+    print(f"{'file':<40}{'tokens':>10}{'skeleton':>10}{'saved':>8}")
+    for stat in sorted(stats, key=lambda s: s["tokens"], reverse=True):
+        saved = 100 - stat["skeleton_tokens"] * 100 // max(stat["tokens"], 1)
+        print(f"{stat['file'][:39]:<40}{stat['tokens']:>10,}{stat['skeleton_tokens']:>10,}{saved:>7}%")
+
+    before = sum(estimate_tokens(content) for content in file_contents.values())
+    after = sum(estimate_tokens(content) for content in reduced.values())
+    print(f"\nAll files: ~{before:,} -> ~{after:,} prompt tokens "
+          f"({100 - after * 100 // max(before, 1)}% smaller), skeletonized in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Headless README generation for one or many repositories
+
+Example:
+    python cli.py path/to/repo1 path/to/repo2 --jobs 4 --report run_report.json
+
+This module deliberately does not import Streamlit so it starts fast in CI.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from archive_ingest import read_directory
+from context_packer import DEFAULT_TOKEN_BUDGET
+from gemini_client import configure
+from generator import build_retrieval_index, generate, generate_map_reduce, generate_section_parallel
+from map_reduce import DEFAULT_MAX_WORKERS
+from response_cache import ResponseCache
+from tracing import Trace
+
+DEFAULT_DESCRIPTION = "Generate a README for the project '{name}' based on its files."
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate README.md files for one or more project directories.")
+    parser.add_argument("directories", nargs="+", help="Project directories to document")
+    parser.add_argument("-d", "--description", help="Project description used for every directory ({name} is replaced by the directory name)")
+    parser.add_argument("--description-file", help="Read the project description from this file")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="Number of repositories processed in parallel (default: 4)")
+    parser.add_argument("-o", "--output-name", default="README.md", help="File name written into each directory (default: README.md)")
+    parser.add_argument("--overwrite", action="store_true", help="Overwrite an existing output file")
+    parser.add_argument("--report", default="readme_run_report.json", help="Where to write the JSON run report")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="Context token budget for file contents")
+    parser.add_argument("--map-reduce", action="store_true", help="Summarize file chunks first (for large repositories)")
+    parser.add_argument("--map-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Parallel summarizers (map-reduce) or section writers (--sections) per repository")
+    parser.add_argument("--sections", action="store_true", help="Write README sections concurrently from focused context")
+    parser.add_argument("--retrieval", action="store_true", help="With --sections, give each section only its top BM25-retrieved chunks")
+    parser.add_argument("--skeleton", action="store_true", help="Send only signatures, docstrings and CLI definitions of source files")
+    parser.add_argument("--no-facts", action="store_true", help="Send raw manifests instead of the parsed project facts block")
+    parser.add_argument("--no-dedup", action="store_true", help="Keep lockfiles, minified bundles and near-duplicate files")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the response cache")
+    return parser.parse_args(argv)
+
+
+def process_directory(directory, description, args, cache):
+    """Ingest one directory, generate its README and return a report entry"""
+    entry = {"directory": directory, "status": "ok", "timings": {}}
+    trace = Trace()
+    output_path = os.path.join(directory, args.output_name)
+    entry["output"] = output_path
+    started = time.perf_counter()
+
+    try:
+        if os.path.exists(output_path) and not args.overwrite:
+            entry["status"] = "skipped"
+            entry["error"] = f"{args.output_name} already exists (use --overwrite)"
+            return entry
+
+        file_contents, ingest_report = read_directory(directory)
+        entry["timings"]["ingest_seconds"] = round(time.perf_counter() - started, 4)
+        entry["files"] = ingest_report
+        entry["input_chars"] = sum(len(content) for content in file_contents.values())
+
+        generate_started = time.perf_counter()
+        raw_prompt = description.replace("{name}", os.path.basename(os.path.abspath(directory)))
+        if args.sections and not args.map_reduce:
+            index = None
+            if args.retrieval:
+                index = build_retrieval_index(file_contents, not args.no_facts, not args.no_dedup, trace=trace)
+            readme = generate_section_parallel(raw_prompt, file_contents, cache=cache, max_workers=args.map_workers,
+                                               trace=trace, skeleton=args.skeleton, project_facts=not args.no_facts,
+                                               dedup=not args.no_dedup, index=index)[0]
+        elif args.map_reduce:
+            readme = generate_map_reduce(raw_prompt, file_contents, cache=cache, max_workers=args.map_workers, trace=trace,
+                                         skeleton=args.skeleton, project_facts=not args.no_facts,
+                                         dedup=not args.no_dedup)
+        else:
+            readme = generate(raw_prompt, file_contents, cache=cache, token_budget=args.token_budget, trace=trace,
+                              skeleton=args.skeleton, project_facts=not args.no_facts, dedup=not args.no_dedup)
+        entry["timings"]["generate_seconds"] = round(time.perf_counter() - generate_started, 4)
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(readme)
+        entry["output_chars"] = len(readme)
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = str(e)
+    finally:
+        entry["timings"]["total_seconds"] = round(time.perf_counter() - started, 4)
+        entry["stages"] = trace.summary()
+
+    return entry
+
+
+def main(argv=None):
+    load_dotenv()
+    args = parse_args(argv)
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        print("Google API Key not found. Please set the GOOGLE_API_KEY environment variable.", file=sys.stderr)
+        return 2
+    configure(api_key)
+
+    description = args.description or DEFAULT_DESCRIPTION
+    if args.description_file:
+        with open(args.description_file, encoding="utf-8") as f:
+            description = f.read()
+
+    cache = None if args.no_cache else ResponseCache.from_env()
+    directories = [d for d in args.directories if os.path.isdir(d)]
+    missing = [d for d in args.directories if not os.path.isdir(d)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        entries = list(executor.map(lambda d: process_directory(d, description, args, cache), directories))
+    entries += [{"directory": d, "status": "error", "error": "not a directory"} for d in missing]
+
+    for entry in entries:
+        detail = entry.get("error") or entry["output"]
+        print(f"[{entry['status']}] {entry['directory']}: {detail}")
+
+    report = {
+        "total_seconds": round(time.perf_counter() - started, 4),
+        "jobs": args.jobs,
+        "repositories": entries,
+    }
+    if cache is not None:
+        report["cache"] = cache.stats()
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    return 0 if all(entry["status"] != "error" for entry in entries) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
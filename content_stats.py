@@ -0,0 +1,33 @@
+"""Content statistics computed once per file or README and stored as metadata"""
+from context_packer import estimate_tokens
+from file_browser import language_for
+
+STAT_FIELDS = ("bytes", "chars", "lines", "words", "tokens")
+
+
+def text_stats(text, filename=""):
+    """Compact metadata record: bytes, chars, lines, words, estimated tokens and language"""
+    return {
+        "bytes": len(text.encode("utf-8", "surrogatepass")),
+        "chars": len(text),
+        "lines": text.count("\n") + (1 if text and not text.endswith("\n") else 0),
+        "words": len(text.split()),
+        "tokens": estimate_tokens(text),
+        "language": language_for(filename) if filename else "text",
+    }
+
+
+def files_stats(file_contents):
+    """{filename: text_stats} for a dict of decoded files"""
+    return {filename: text_stats(content, filename) for filename, content in file_contents.items()}
+
+
+def total_stats(records):
+    """Sum the numeric fields of several stats records (or earlier totals)"""
+    totals = dict.fromkeys(STAT_FIELDS, 0)
+    totals["files"] = 0
+    for record in records:
+        for field in STAT_FIELDS:
+            totals[field] += record[field]
+        totals["files"] += record.get("files", 1)
+    return totals
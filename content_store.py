@@ -0,0 +1,258 @@
+"""Compressed, bounded storage for uploaded file contents
+
+Each session gets a ContentStore that keeps files as compressed bytes
+(zstd when the zstandard package is installed, zlib otherwise) and decodes
+them only when read. Once a session's compressed data exceeds its memory
+budget, further files are appended to an anonymous temp file. Stores of
+sessions that have been idle too long are closed, so resident memory
+follows active work rather than every upload ever made.
+"""
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections.abc import Mapping
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_MEMORY_BYTES = 8 * 1024 * 1024
+DEFAULT_IDLE_SECONDS = 30 * 60
+MIN_COMPRESS_BYTES = 256
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_codec_state = threading.local()
+
+
+def _zstd(kind):
+    # zstandard (de)compressors are not thread-safe, so each thread keeps its own
+    codec = getattr(_codec_state, kind, None)
+    if codec is None:
+        codec = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if kind == "compressor" else zstandard.ZstdDecompressor()
+        setattr(_codec_state, kind, codec)
+    return codec
+
+
+def compress_text(text):
+    """(codec, payload) for one file; tiny files are kept as plain UTF-8"""
+    data = text.encode("utf-8", "surrogatepass")
+    if len(data) < MIN_COMPRESS_BYTES:
+        return "utf-8", data
+    if zstandard is not None:
+        return "zstd", _zstd("compressor").compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress_text(codec, payload):
+    """Inverse of compress_text"""
+    if codec == "zstd":
+        payload = _zstd("decompressor").decompress(payload)
+    elif codec == "zlib":
+        payload = zlib.decompress(payload)
+    return payload.decode("utf-8", "surrogatepass")
+
+
+def compress_files(file_contents):
+    """{filename: (codec, payload, raw bytes)}; safe to run on a worker thread"""
+    blobs = {}
+    for filename, content in file_contents.items():
+        codec, payload = compress_text(content)
+        blobs[filename] = (codec, payload, len(content.encode("utf-8", "surrogatepass")))
+    return blobs
+
+
+class ContentStore(Mapping):
+    """Read-only {filename: text} view over compressed uploads, kept per upload fingerprint
+
+    Uploads are added with add() and ordered with arrange(); when two
+    uploads contain the same file name, the later one wins, as with
+    dict.update(). Values are decoded on every access and never cached.
+    """
+
+    def __init__(self, memory_bytes=DEFAULT_MEMORY_BYTES):
+        self.memory_bytes = memory_bytes
+        self.last_access = time.monotonic()
+        self.closed = False
+        self._uploads = {}
+        self._index = {}
+        self._spill = None
+        self._spill_end = 0
+        self._dead_bytes = 0
+        self._resident = 0
+        self._lock = threading.Lock()
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+    def add(self, key, blobs):
+        """Store the compressed files of one upload under key (e.g. its fingerprint)"""
+        with self._lock:
+            self._discard(key)
+            entries = {}
+            for filename, (codec, payload, raw_bytes) in blobs.items():
+                if self._resident + len(payload) > self.memory_bytes:
+                    entries[filename] = (codec, self._write_spill(payload), len(payload), raw_bytes)
+                else:
+                    entries[filename] = (codec, payload, len(payload), raw_bytes)
+                    self._resident += len(payload)
+            self._uploads[key] = entries
+        self.touch()
+
+    def discard(self, key):
+        """Drop one upload; its spilled bytes are reclaimed on the next compaction"""
+        with self._lock:
+            self._discard(key)
+            self._index = {name: ref for name, ref in self._index.items() if ref[0] != key}
+
+    def _discard(self, key):
+        for _, location, size, _ in self._uploads.pop(key, {}).values():
+            if isinstance(location, int):
+                self._dead_bytes += size
+            else:
+                self._resident -= size
+        if self._spill is not None and self._dead_bytes * 2 > self._spill_end:
+            self._compact_spill()
+
+    def arrange(self, keys):
+        """Expose the uploads under keys, in order, as a single file mapping"""
+        with self._lock:
+            self._index = {}
+            for key in keys:
+                self._index.update((name, (key, name)) for name in self._uploads.get(key, ()))
+        self.touch()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def close(self):
+        """Free everything, including the spill file; later reads see an empty store"""
+        with self._lock:
+            self._reset()
+            self.closed = True
+
+    def _reset(self):
+        self._uploads = {}
+        self._index = {}
+        self._resident = 0
+        self._dead_bytes = 0
+        self._spill_end = 0
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def _write_spill(self, payload):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="readme-content-")
+        offset = self._spill_end
+        self._spill.seek(offset)
+        self._spill.write(payload)
+        self._spill_end += len(payload)
+        return offset
+
+    def _read_spill(self, offset, size):
+        self._spill.seek(offset)
+        return self._spill.read(size)
+
+    def _compact_spill(self):
+        """Rewrite the spill file with live entries only"""
+        live = [(entries, filename, entry) for entries in self._uploads.values()
+                for filename, entry in entries.items() if isinstance(entry[1], int)]
+        payloads = [self._read_spill(entry[1], entry[2]) for _, _, entry in live]
+        self._spill.close()
+        self._spill, self._spill_end, self._dead_bytes = None, 0, 0
+        for (entries, filename, (codec, _, size, raw_bytes)), payload in zip(live, payloads):
+            entries[filename] = (codec, self._write_spill(payload), size, raw_bytes)
+
+    def __getitem__(self, filename):
+        with self._lock:
+            key, name = self._index[filename]
+            codec, location, size, _ = self._uploads[key][name]
+            payload = self._read_spill(location, size) if isinstance(location, int) else location
+        self.touch()
+        return decompress_text(codec, payload)
+
+    def __contains__(self, filename):
+        return filename in self._index
+
+    def __iter__(self):
+        return iter(list(self._index))
+
+    def __len__(self):
+        return len(self._index)
+
+    def stats(self):
+        with self._lock:
+            entries = [entry for upload in self._uploads.values() for entry in upload.values()]
+            return {
+                "files": len(self._index),
+                "raw_bytes": sum(entry[3] for entry in entries),
+                "resident_bytes": self._resident,
+                "spilled_bytes": self._spill_end - self._dead_bytes,
+            }
+
+
+class ContentStoreRegistry:
+    """One ContentStore per session, closed after max_idle_seconds without access"""
+
+    def __init__(self, memory_bytes=DEFAULT_MEMORY_BYTES, max_idle_seconds=DEFAULT_IDLE_SECONDS):
+        self.memory_bytes = memory_bytes
+        self.max_idle_seconds = max_idle_seconds
+        self.evicted = 0
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            memory_bytes=int(os.getenv("CONTENT_STORE_MEMORY_BYTES", DEFAULT_MEMORY_BYTES)),
+            max_idle_seconds=float(os.getenv("CONTENT_STORE_IDLE_SECONDS", DEFAULT_IDLE_SECONDS)),
+        )
+
+    def store_for(self, session_id):
+        """The session's store, created on first use; idle stores of other sessions are evicted"""
+        self.evict_idle()
+        with self._lock:
+            store = self._stores.get(session_id)
+            if store is None:
+                store = self._stores[session_id] = ContentStore(self.memory_bytes)
+        store.touch()
+        return store
+
+    def evict_idle(self):
+        """Close stores idle for longer than max_idle_seconds; returns how many were closed"""
+        cutoff = time.monotonic() - self.max_idle_seconds
+        with self._lock:
+            idle = [session_id for session_id, store in self._stores.items() if store.last_access < cutoff]
+            stores = [self._stores.pop(session_id) for session_id in idle]
+            self.evicted += len(stores)
+        for store in stores:
+            store.close()
+        return len(stores)
+
+    def stats(self):
+        with self._lock:
+            stores = list(self._stores.values())
+        totals = {"sessions": len(stores), "evicted": self.evicted, "files": 0,
+                  "raw_bytes": 0, "resident_bytes": 0, "spilled_bytes": 0}
+        for store in stores:
+            for field, value in store.stats().items():
+                totals[field] += value
+        return totals
+
+
+_shared_registry = None
+_shared_lock = threading.Lock()
+
+
+def get_content_stores():
+    """Process-wide registry of session content stores, created on first use"""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = ContentStoreRegistry.from_env()
+        return _shared_registry
@@ -0,0 +1,138 @@
+"""Fit uploaded project files into a prompt token budget"""
+import os
+
+DEFAULT_TOKEN_BUDGET = 200_000
+CHARS_PER_TOKEN = 4
+MIN_TRUNCATED_TOKENS = 256
+
+MANIFEST_FILES = {
+    'readme', 'readme.md', 'readme.rst', 'readme.txt', 'requirements.txt', 'pyproject.toml',
+    'setup.py', 'setup.cfg', 'package.json', 'cargo.toml', 'go.mod', 'gemfile', 'pom.xml',
+    'build.gradle', 'composer.json', 'dockerfile', 'docker-compose.yml', 'docker-compose.yaml',
+    'makefile', 'license', 'license.md', 'license.txt', 'contributing.md'
+}
+ENTRY_POINT_FILES = {
+    'main.py', 'app.py', '__main__.py', 'cli.py', 'manage.py', 'wsgi.py', 'asgi.py',
+    'server.py', 'index.js', 'index.ts', 'main.js', 'main.ts', 'server.js', 'app.js',
+    'main.go', 'main.rs', 'lib.rs'
+}
+CONFIG_EXTENSIONS = {'toml', 'ini', 'cfg', 'conf', 'yaml', 'yml', 'env', 'properties', 'editorconfig'}
+DOC_EXTENSIONS = {'md', 'rst', 'txt', 'adoc'}
+DATA_EXTENSIONS = {'log', 'csv', 'tsv', 'sql', 'jsonl', 'ndjson', 'xml', 'lock'}
+
+# Lower value means more useful for documentation
+PRIORITY_MANIFEST = 0
+PRIORITY_ENTRY_POINT = 1
+PRIORITY_CONFIG = 2
+PRIORITY_SOURCE = 3
+PRIORITY_DOC = 4
+PRIORITY_TEST = 5
+PRIORITY_DATA = 6
+PRIORITY_PLACEHOLDER = 7
+
+
+def estimate_tokens(text):
+    """Cheap token estimate used for budgeting (about four characters per token)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def file_priority(filename, content=""):
+    """Rank a file by how much it tells the model about the project"""
+    basename = os.path.basename(filename).lower()
+    extension = basename.rsplit('.', 1)[-1] if '.' in basename else ''
+
+    if content.startswith("[Binary file:") or content.startswith("[Error reading"):
+        return PRIORITY_PLACEHOLDER
+    if basename in MANIFEST_FILES:
+        return PRIORITY_MANIFEST
+    if basename in ENTRY_POINT_FILES:
+        return PRIORITY_ENTRY_POINT
+    if extension in DATA_EXTENSIONS:
+        return PRIORITY_DATA
+    if basename.startswith('test_') or basename.endswith(('_test.py', '.test.js', '.spec.js', '.test.ts', '.spec.ts')) \
+            or '/tests/' in f"/{filename.lower()}":
+        return PRIORITY_TEST
+    if extension in CONFIG_EXTENSIONS or 'config' in basename:
+        return PRIORITY_CONFIG
+    if extension in DOC_EXTENSIONS:
+        return PRIORITY_DOC
+    return PRIORITY_SOURCE
+
+
+def truncate_to_tokens(content, max_tokens):
+    """Keep the head and tail of content so that it fits in max_tokens"""
+    marker = "\n\n... [{} lines truncated to fit the context budget] ...\n\n"
+    max_chars = max_tokens * CHARS_PER_TOKEN - len(marker.format(0)) - 8
+    if max_chars <= 0:
+        return ""
+    head_chars = max_chars * 3 // 4
+    tail_chars = max_chars - head_chars
+    head = content[:head_chars]
+    tail = content[-tail_chars:] if tail_chars > 0 else ""
+    dropped_lines = content[head_chars:len(content) - tail_chars].count('\n')
+    return head + marker.format(dropped_lines) + tail
+
+
+def summarize_file(filename, content):
+    """One-line stand-in for a file that does not fit the budget"""
+    lines = content.splitlines()
+    first_line = next((line.strip() for line in lines if line.strip()), "")[:120]
+    return f"[Omitted to fit context budget: {len(lines)} lines, ~{estimate_tokens(content)} tokens. First line: {first_line}]"
+
+
+def pack_files(file_contents, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Select, truncate or summarize files so the result fits token_budget
+
+    Returns a dict with the packed "files" mapping (most useful first), the
+    per-file "decisions" and the "used_tokens"/"total_tokens" totals.
+    Each decision records the action taken: full, truncated, summarized or
+    omitted.
+    """
+    ranked = sorted(
+        (
+            (file_priority(name, content), estimate_tokens(content), name, content)
+            for name, content in file_contents.items()
+        ),
+        key=lambda item: (item[0], item[1], item[2])
+    )
+
+    packed = {}
+    decisions = []
+    remaining = token_budget
+    total_tokens = 0
+
+    for priority, tokens, name, content in ranked:
+        # Account for the "--- filename ---" separator as well
+        overhead = estimate_tokens(name) + 4
+        total_tokens += tokens + overhead
+
+        if tokens + overhead <= remaining:
+            packed_content, action = content, "full"
+        elif remaining - overhead >= MIN_TRUNCATED_TOKENS and priority < PRIORITY_PLACEHOLDER:
+            packed_content, action = truncate_to_tokens(content, remaining - overhead), "truncated"
+        else:
+            packed_content, action = summarize_file(name, content), "summarized"
+            if estimate_tokens(packed_content) + overhead > remaining:
+                packed_content, action = None, "omitted"
+
+        packed_tokens = 0
+        if packed_content is not None:
+            packed_tokens = estimate_tokens(packed_content) + overhead
+            packed[name] = packed_content
+            remaining -= packed_tokens
+
+        decisions.append({
+            "file": name,
+            "priority": priority,
+            "tokens": tokens,
+            "packed_tokens": packed_tokens,
+            "action": action,
+        })
+
+    return {
+        "files": packed,
+        "decisions": decisions,
+        "used_tokens": token_budget - remaining,
+        "total_tokens": total_tokens,
+        "token_budget": token_budget,
+    }
@@ -0,0 +1,178 @@
+"""Drop boilerplate files and collapse exact or near-duplicate files
+
+Exact duplicates are found by hashing whitespace-normalized content; near
+duplicates by MinHash signatures over word shingles, bucketed with LSH
+banding so only candidate pairs are compared. Signatures use one-permutation
+hashing (each shingle is hashed once and lands in one bin), so computing
+one is a single pass over the file; callers that ingest uploads compute
+them once with file_signatures() and pass them back in.
+"""
+import hashlib
+import os
+import re
+import zlib
+from array import array
+
+from context_packer import estimate_tokens
+
+BOILERPLATE_FILES = {
+    'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml', 'bun.lockb', 'poetry.lock',
+    'pipfile.lock', 'pdm.lock', 'uv.lock', 'cargo.lock', 'composer.lock', 'gemfile.lock', 'go.sum',
+    'packages.lock.json', 'podfile.lock', 'mix.lock', 'pubspec.lock',
+}
+BOILERPLATE_PATTERN = re.compile(r"\.(?:min\.(?:js|css|mjs)|bundle\.js|chunk\.js|js\.map|css\.map|map)$", re.IGNORECASE)
+MINIFIED_EXTENSIONS = {'js', 'mjs', 'cjs', 'css'}
+MINIFIED_LINE_LENGTH = 500
+
+SHINGLE_WORDS = 5
+NUM_BINS = 64
+LSH_BANDS = 16
+MIN_SHINGLES = 20
+DEFAULT_SIMILARITY = 0.85
+
+# crc32 gives 32 bits: the top 6 pick one of the 64 bins, the rest are the value
+_BIN_SHIFT = 26
+_VALUE_MASK = (1 << _BIN_SHIFT) - 1
+WORD = re.compile(r"\w+")
+
+
+def boilerplate_reason(filename, content):
+    """Why a file is boilerplate (lockfile, minified bundle, source map), or None"""
+    basename = os.path.basename(filename).lower()
+    if basename in BOILERPLATE_FILES:
+        return "lockfile"
+    if BOILERPLATE_PATTERN.search(basename):
+        return "minified/bundled"
+    extension = basename.rsplit('.', 1)[-1] if '.' in basename else ''
+    if extension in MINIFIED_EXTENSIONS and content:
+        lines = content.count('\n') + 1
+        if len(content) / lines > MINIFIED_LINE_LENGTH:
+            return "minified/bundled"
+    return None
+
+
+def content_digest(content):
+    """Hash of content with whitespace runs collapsed, for exact-duplicate detection"""
+    return hashlib.blake2b(' '.join(content.split()).encode('utf-8'), digest_size=16).digest()
+
+
+def minhash_signature(content):
+    """One-permutation MinHash signature over word shingles, or None when the file is too short to compare"""
+    words = WORD.findall(content.lower())
+    shingles = {
+        zlib.crc32(' '.join(shingle).encode('utf-8'))
+        for shingle in zip(*(words[i:] for i in range(SHINGLE_WORDS)))
+    }
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    bins = [None] * NUM_BINS
+    for shingle in shingles:
+        slot, value = shingle >> _BIN_SHIFT, shingle & _VALUE_MASK
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    # Densify: an empty bin borrows the next filled bin's value, tagged with the distance
+    signature = array('I', [0]) * NUM_BINS
+    following = next(slot for slot in range(NUM_BINS) if bins[slot] is not None) + NUM_BINS
+    for slot in reversed(range(NUM_BINS)):
+        if bins[slot] is not None:
+            following = slot
+            signature[slot] = bins[slot]
+        else:
+            signature[slot] = bins[following % NUM_BINS] | ((following - slot) << _BIN_SHIFT)
+    return signature
+
+
+def file_signatures(file_contents):
+    """{filename: MinHash signature or None}, computed once per upload and passed to deduplicate_files"""
+    return {filename: minhash_signature(content) for filename, content in file_contents.items()}
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return sum(x == y for x, y in zip(signature_a, signature_b)) / len(signature_a)
+
+
+def _near_duplicate_groups(file_contents, names, threshold, signatures):
+    """Group names whose estimated similarity to the group's first member is at least threshold"""
+    rows = NUM_BINS // LSH_BANDS
+    signatures = {name: signatures[name] if name in signatures else minhash_signature(file_contents[name])
+                  for name in names}
+    buckets = {}
+    groups = {}
+    for name in names:
+        signature = signatures[name]
+        if signature is None:
+            continue
+        bands = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+        candidates = []
+        for band in bands:
+            for candidate in buckets.get(band, ()):
+                if candidate not in candidates:
+                    candidates.append(candidate)
+        match = next((candidate for candidate in candidates
+                      if estimate_similarity(signature, signatures[candidate]) >= threshold), None)
+        if match is not None:
+            groups[match].append(name)
+            continue
+        # Only representatives go into buckets so groups do not chain
+        groups[name] = []
+        for band in bands:
+            buckets.setdefault(band, []).append(name)
+    return {rep: members for rep, members in groups.items() if members}
+
+
+def deduplicate_files(file_contents, similarity=DEFAULT_SIMILARITY, drop_boilerplate=True, signatures=None):
+    """Drop boilerplate and collapse duplicates; returns (contents, report)
+
+    Files are visited shortest path first, so the representative of a group
+    is usually the canonical copy rather than a vendored or generated one.
+    The representative keeps its content, prefixed with a note listing the
+    files it stands for. signatures maps filenames to precomputed
+    file_signatures() entries; files missing from it are signed here.
+    """
+    report = {"boilerplate": [], "duplicates": [], "saved_bytes": 0, "saved_tokens": 0}
+    kept = []
+    for filename in sorted(file_contents, key=lambda name: (name.count('/'), len(name), name)):
+        reason = boilerplate_reason(filename, file_contents[filename]) if drop_boilerplate else None
+        if reason:
+            report["boilerplate"].append({"file": filename, "reason": reason})
+        else:
+            kept.append(filename)
+
+    # Exact duplicates first: cheap and certain
+    exact = {}
+    unique = []
+    for filename in kept:
+        digest = content_digest(file_contents[filename])
+        if digest in exact:
+            exact[digest][1].append(filename)
+        else:
+            exact[digest] = (filename, [])
+            unique.append(filename)
+    groups = {rep: members for rep, members in exact.values() if members}
+
+    # A near duplicate takes its own exact copies along into the new group
+    for rep, members in _near_duplicate_groups(file_contents, unique, similarity, signatures or {}).items():
+        group = groups.setdefault(rep, [])
+        for member in members:
+            group += [member] + groups.pop(member, [])
+
+    removed = {entry["file"] for entry in report["boilerplate"]}
+    for rep, members in groups.items():
+        removed.update(members)
+        report["duplicates"].append({"file": rep, "duplicates": members})
+
+    reduced = {}
+    for filename, content in file_contents.items():
+        if filename in removed:
+            report["saved_bytes"] += len(content.encode('utf-8'))
+            report["saved_tokens"] += estimate_tokens(content)
+            continue
+        if filename in groups:
+            note = f"# [also represents {len(groups[filename])} near-identical files: {', '.join(groups[filename])}]\n"
+            reduced[filename] = note + content
+            report["saved_bytes"] -= len(note)
+            report["saved_tokens"] -= estimate_tokens(note)
+        else:
+            reduced[filename] = content
+    return reduced, report
@@ -0,0 +1,72 @@
+"""Searchable, paginated file browser helpers
+
+Only the files on the visible page are looked at. Their previews and line
+counts are computed on first view and cached by content hash, so browsing
+cost does not grow with the number of uploaded files.
+"""
+import fnmatch
+import hashlib
+import threading
+from collections import OrderedDict
+
+PAGE_SIZE = 25
+PREVIEW_CHARS = 1000
+MAX_CACHED_PREVIEWS = 4096
+
+LANGUAGES = {
+    'py': 'python', 'js': 'javascript', 'mjs': 'javascript', 'cjs': 'javascript', 'jsx': 'jsx', 'ts': 'typescript',
+    'tsx': 'tsx', 'html': 'html', 'css': 'css', 'json': 'json', 'yaml': 'yaml', 'yml': 'yaml', 'toml': 'toml',
+    'ini': 'ini', 'cfg': 'ini', 'sh': 'bash', 'bash': 'bash', 'ps1': 'powershell', 'bat': 'batch', 'sql': 'sql',
+    'md': 'markdown', 'xml': 'xml', 'go': 'go', 'rs': 'rust', 'java': 'java', 'rb': 'ruby', 'c': 'c', 'h': 'c',
+    'cpp': 'cpp', 'dockerfile': 'docker',
+}
+
+_previews = OrderedDict()
+_lock = threading.Lock()
+
+
+def language_for(filename):
+    """Syntax-highlighting language for a file name"""
+    basename = filename.rsplit('/', 1)[-1].lower()
+    extension = basename.rsplit('.', 1)[-1] if '.' in basename else basename
+    return LANGUAGES.get(extension, 'text')
+
+
+def filter_files(names, query):
+    """Names matching query: a glob when it contains * or ?, otherwise a case-insensitive substring"""
+    query = query.strip().lower()
+    if not query:
+        return list(names)
+    if any(char in query for char in '*?['):
+        return [name for name in names if fnmatch.fnmatch(name.lower(), query)]
+    return [name for name in names if query in name.lower()]
+
+
+def paginate(items, page, page_size=PAGE_SIZE):
+    """(items on page, page count); page is 1-based and clamped to the valid range"""
+    pages = max(1, -(-len(items) // page_size))
+    page = min(max(1, page), pages)
+    return items[(page - 1) * page_size:page * page_size], pages
+
+
+def file_preview(filename, content, max_chars=PREVIEW_CHARS):
+    """Preview text, language, character and line counts of one file, cached by content hash"""
+    digest = hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    key = (digest, language_for(filename), max_chars)
+    with _lock:
+        if key in _previews:
+            _previews.move_to_end(key)
+            return _previews[key]
+    text = content[:max_chars] + "\n\n... (truncated)" if len(content) > max_chars else content
+    preview = {
+        "language": key[1],
+        "preview": text,
+        "chars": len(content),
+        "lines": content.count('\n') + (1 if content and not content.endswith('\n') else 0),
+        "placeholder": content.startswith(("[Binary file:", "[Error reading", "[Skipped:")),
+    }
+    with _lock:
+        _previews[key] = preview
+        while len(_previews) > MAX_CACHED_PREVIEWS:
+            _previews.popitem(last=False)
+    return preview
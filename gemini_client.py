@@ -0,0 +1,199 @@
+"""Shared Gemini client with model caching, rate limiting, retries and timeouts
+
+GeminiClient exposes the same generate_content(prompt, stream=False) call as
+genai.GenerativeModel, so it can be passed anywhere a model is expected, plus
+an asyncio variant. One process-wide client (get_client) keeps requests and
+tokens per minute under the configured quota for every caller.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+
+import google.generativeai as genai
+
+try:
+    from google.api_core import exceptions as api_exceptions
+except ImportError:  # google-api-core always ships with google-generativeai
+    api_exceptions = None
+
+MODEL_NAME = "gemini-2.0-flash"
+DEFAULT_REQUESTS_PER_MINUTE = 15
+DEFAULT_TOKENS_PER_MINUTE = 1_000_000
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_TIMEOUT = 300.0
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def configure(api_key):
+    """genai.configure, pointed at GEMINI_API_ENDPOINT (e.g. a local mock server) when set"""
+    endpoint = os.getenv("GEMINI_API_ENDPOINT")
+    if endpoint:
+        genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": endpoint})
+    else:
+        genai.configure(api_key=api_key)
+
+
+@lru_cache(maxsize=8)
+def get_model(model_name=MODEL_NAME):
+    """Cached GenerativeModel instance; building one per request is wasted work"""
+    return genai.GenerativeModel(model_name)
+
+
+def is_retryable(exc):
+    """True for quota (429), timeout and transient server errors"""
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if api_exceptions is not None and isinstance(exc, (
+            api_exceptions.ResourceExhausted, api_exceptions.TooManyRequests, api_exceptions.ServiceUnavailable,
+            api_exceptions.DeadlineExceeded, api_exceptions.InternalServerError, api_exceptions.BadGateway)):
+        return True
+    code = getattr(exc, "code", None)
+    return getattr(code, "value", code) in RETRYABLE_STATUS_CODES
+
+
+def prompt_chars(prompt):
+    """Characters of text in a prompt string or a multi-turn contents list"""
+    if isinstance(prompt, str):
+        return len(prompt)
+    if isinstance(prompt, dict):
+        return sum(prompt_chars(part) for part in prompt.get("parts", ()))
+    if isinstance(prompt, (list, tuple)):
+        return sum(prompt_chars(item) for item in prompt)
+    return 0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at capacity per minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Take amount now (possibly going negative) and return how long to wait before using it"""
+        # Requests larger than the bucket still go through, just after a full refill
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class GeminiClient:
+    """Rate-limited, retrying wrapper around a cached GenerativeModel"""
+
+    def __init__(self, model_name=MODEL_NAME, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, timeout=DEFAULT_TIMEOUT, model=None):
+        self.model_name = model_name
+        self.model = model
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._stats = {"calls": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build a client from GEMINI_* environment variables"""
+        return cls(
+            requests_per_minute=int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE)),
+            tokens_per_minute=int(os.getenv("GEMINI_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE)),
+            max_retries=int(os.getenv("GEMINI_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+            timeout=float(os.getenv("GEMINI_TIMEOUT", DEFAULT_TIMEOUT)),
+        )
+
+    def _model(self):
+        return self.model or get_model(self.model_name)
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _throttle_delay(self, prompt):
+        """Reserve one request and the prompt's estimated tokens; returns the wait in seconds"""
+        tokens = prompt_chars(prompt) // 4
+        delay = max(self.request_bucket.reserve(1), self.token_bucket.reserve(tokens))
+        if delay:
+            self._count("throttled_seconds", delay)
+        return delay
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def generate_content(self, prompt, stream=False):
+        """Same contract as GenerativeModel.generate_content, with throttling and retries
+
+        For streams only opening the stream is retried; a failure after the
+        first chunk is raised to the caller, which already consumed output.
+        """
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._throttle_delay(prompt))
+            self._count("calls")
+            try:
+                return self._model().generate_content(prompt, stream=stream,
+                                                      request_options={"timeout": self.timeout})
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff(attempt))
+
+    async def generate_content_async(self, prompt):
+        """Async generate_content; the timeout also bounds the await on our side"""
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._throttle_delay(prompt))
+            self._count("calls")
+            try:
+                return await asyncio.wait_for(
+                    self._model().generate_content_async(prompt, request_options={"timeout": self.timeout}),
+                    timeout=self.timeout,
+                )
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                await asyncio.sleep(self._backoff(attempt))
+
+    async def generate_many_async(self, prompts, concurrency=4):
+        """Run generate_content_async over prompts with bounded concurrency, in order"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(prompt):
+            async with semaphore:
+                return await self.generate_content_async(prompt)
+
+        return await asyncio.gather(*(run(prompt) for prompt in prompts))
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide client shared by every session and thread, so quota is enforced globally"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = GeminiClient.from_env()
+        return _shared_client
@@ -0,0 +1,281 @@
+"""README generation core shared by the Streamlit app and the CLI
+
+Nothing in here imports Streamlit; errors are raised to the caller.
+"""
+import json
+import time
+
+from context_packer import DEFAULT_TOKEN_BUDGET, estimate_tokens, pack_files
+from dedup import deduplicate_files
+from gemini_client import MODEL_NAME, get_client
+from map_reduce import DEFAULT_MAX_WORKERS, map_reduce_readme
+from project_facts import extract_project_facts, format_project_facts
+from response_cache import make_cache_key
+from retrieval import RetrievalIndex
+from sections import generate_sections, regenerate_section
+from sampled_read import DEFAULT_MAX_FILE_BYTES, read_file_sampled
+from skeleton import skeletonize_files
+from tracing import span
+
+
+def get_system_prompt():
+    return """You are an advanced README generator AI. You must output ONLY clean, properly formatted Markdown content without any code block markers or additional formatting.
+
+When composing the README, follow these guidelines:
+
+1. **Project Title and Badge Section**  
+   - Extract or infer a concise project title.  
+   - Optionally include status/version/build badges if present in the files or mentioned in the prompt.
+
+2. **Project Description**  
+   - Summarize the project's purpose, features, and high-level architecture.  
+   - Explain what problem it solves and who the intended users are.
+
+3. **Table of Contents**  
+   - Automatically generate links to the main sections of the README.
+
+4. **Installation**  
+   - Detail any prerequisites (languages, frameworks, tools).  
+   - Provide step-by-step setup or installation commands derived from environment/config files.
+
+5. **Usage**  
+   - Show common usage patterns or code snippets.  
+   - Explain command-line flags, configuration options, or API endpoints based on the project files.
+
+6. **Configuration**  
+   - Describe configuration files (e.g., `.env`, `config.yaml`) and their options/values.
+
+7. **Features / Functionality**  
+   - List and briefly explain the main features or modules, pulling from code comments or directory structure.
+
+8. **Examples**  
+   - Provide sample input/output or screenshots if available.
+
+9. **API Reference** (for libraries or services)  
+   - Document exposed functions, classes, or endpoints with parameters and return values.
+
+10. **Contributing**  
+    - Offer guidelines for how developers can contribute, referencing any `CONTRIBUTING.md` or coding standards.
+
+11. **Testing**  
+    - Explain how to run tests, including commands and testing frameworks picked up from the files.
+
+12. **License**  
+    - Detect and state the project's license based on LICENSE file or user prompt.
+
+13. **Acknowledgements / Credits**  
+    - Mention authors, third-party libraries, or inspirations.
+
+14. **Contact / Support**  
+    - Describe how to reach maintainers or link to issue tracker/discussion forums.
+
+**Critical Formatting Rules:**  
+- Output ONLY the markdown content, do not wrap it in code blocks (```markdown or ```)
+- Start directly with the project title using # heading
+- Use proper Markdown syntax: headings (#, ##, ###), bullet lists (-), numbered lists (1.)
+- Include fenced code blocks with language specification for code examples
+- Use **bold** and *italic* text appropriately
+- Create proper links and references
+- Ensure all sections flow naturally without extra formatting markers
+
+Always tailor the README to the specific project context. Generate clean, ready-to-use Markdown content."""
+
+
+def read_file_content(uploaded_file, max_bytes=DEFAULT_MAX_FILE_BYTES):
+    """Read content from uploaded file, sniffing text vs. binary from its first bytes"""
+    return read_file_sampled(uploaded_file, max_bytes)[0]
+
+
+def build_full_prompt(system_prompt, raw_prompt, file_contents, facts_block=""):
+    """Combine system prompt with user's raw prompt, project facts and file contents"""
+    facts_section = ""
+    if facts_block:
+        facts_section = f"\n\n**Project Facts (parsed from manifests, authoritative):**\n{facts_block}"
+    
+    files_section = ""
+    if file_contents:
+        files_section = "\n\n**Project Files:**\n"
+        for filename, content in file_contents.items():
+            files_section += f"\n--- {filename} ---\n{content}\n"
+
+    return f"{system_prompt}\n\n**User Project Description:**\n{raw_prompt}{facts_section}{files_section}\n\nGenerate a comprehensive README.md based on the above information."
+
+
+def extract_facts_block(file_contents):
+    """Replace parsed manifests with a compact facts block; returns (facts_block, remaining files)"""
+    facts, consumed = extract_project_facts(file_contents)
+    remaining = {name: content for name, content in file_contents.items() if name not in consumed}
+    return format_project_facts(facts), remaining
+
+
+def reduce_files(file_contents, skeleton=False, project_facts=True, dedup=True):
+    """Apply the optional local reductions; returns (facts_block, file_contents)"""
+    facts_block = ""
+    if project_facts:
+        facts_block, file_contents = extract_facts_block(file_contents)
+    if dedup:
+        file_contents = deduplicate_files(file_contents)[0]
+    if skeleton:
+        file_contents = skeletonize_files(file_contents)[0]
+    return facts_block, file_contents
+
+
+def _assemble_prompt(raw_prompt, file_contents, token_budget, trace, skeleton=False, project_facts=True, dedup=True):
+    """Build the full prompt and its cache key, traced as one stage"""
+    with span(trace, "prompt_assembly") as attrs:
+        facts_block, file_contents = reduce_files(file_contents, skeleton, project_facts, dedup)
+        file_contents = pack_files(file_contents, token_budget)["files"]
+        system_prompt = get_system_prompt()
+        full_prompt = build_full_prompt(system_prompt, raw_prompt, file_contents, facts_block)
+        attrs["bytes"] = len(full_prompt.encode("utf-8"))
+        attrs["tokens"] = estimate_tokens(full_prompt)
+    # The assembled prompt fully determines the answer, so it is the cache key
+    return full_prompt, make_cache_key(MODEL_NAME, system_prompt, full_prompt, {})
+
+
+def generate(raw_prompt, file_contents, cache=None, token_budget=DEFAULT_TOKEN_BUDGET, model=None, trace=None,
+             skeleton=False, project_facts=True, dedup=True):
+    """Generate a README, consulting cache (a ResponseCache) when given
+
+    trace is an optional tracing.Trace that receives per-stage timings.
+    skeleton reduces source files to signatures, docstrings and CLI
+    definitions before prompting. project_facts replaces parseable
+    manifests (requirements, pyproject, package.json, LICENSE, ...) with
+    a compact facts block. dedup drops lockfiles and minified bundles and
+    collapses exact and near-duplicate files into one representative.
+    """
+    full_prompt, cache_key = _assemble_prompt(raw_prompt, file_contents, token_budget, trace, skeleton, project_facts,
+                                              dedup)
+
+    # Return a cached README if this exact request was answered before
+    if cache is not None:
+        cached_readme = cache.get(cache_key)
+        if cached_readme is not None:
+            return cached_readme
+
+    with span(trace, "model_call") as attrs:
+        model = model or get_client()
+        text = model.generate_content(full_prompt).text
+        attrs["bytes"] = len(text.encode("utf-8"))
+        attrs["tokens"] = estimate_tokens(text)
+
+    if cache is not None:
+        cache.set(cache_key, text)
+    return text
+
+
+def generate_stream(raw_prompt, file_contents, cache=None, cancel_event=None,
+                    token_budget=DEFAULT_TOKEN_BUDGET, model=None, trace=None, skeleton=False, project_facts=True,
+                    dedup=True):
+    """Yield README text chunks as Gemini produces them
+
+    Joining every yielded chunk gives the same text generate returns.
+    Setting cancel_event (a threading.Event) stops the stream after the
+    current chunk; a cancelled stream is not written to the cache.
+    """
+    full_prompt, cache_key = _assemble_prompt(raw_prompt, file_contents, token_budget, trace, skeleton, project_facts,
+                                              dedup)
+    if cache is not None:
+        cached_readme = cache.get(cache_key)
+        if cached_readme is not None:
+            yield cached_readme
+            return
+
+    chunks = []
+    with span(trace, "model_call", streamed=True) as attrs:
+        model = model or get_client()
+        started = time.perf_counter()
+        for chunk in model.generate_content(full_prompt, stream=True):
+            if cancel_event is not None and cancel_event.is_set():
+                attrs["cancelled"] = True
+                return
+            text = chunk.text
+            if not chunks:
+                attrs["first_chunk_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            chunks.append(text)
+            attrs["bytes"] = attrs.get("bytes", 0) + len(text.encode("utf-8"))
+            attrs["tokens"] = attrs.get("tokens", 0) + estimate_tokens(text)
+            yield text
+
+    if cache is not None:
+        cache.set(cache_key, "".join(chunks))
+
+
+def generate_map_reduce(raw_prompt, file_contents, cache=None, max_workers=DEFAULT_MAX_WORKERS,
+                        on_chunk_done=None, model=None, trace=None, skeleton=False, project_facts=True, dedup=True):
+    """Generate a README for large projects by summarizing file chunks first"""
+    facts_block, file_contents = reduce_files(file_contents, skeleton, project_facts, dedup)
+    system_prompt = get_system_prompt()
+    cache_key = make_cache_key(f"{MODEL_NAME}:map-reduce", system_prompt, f"{raw_prompt}\n{facts_block}", file_contents)
+    if cache is not None:
+        cached_readme = cache.get(cache_key)
+        if cached_readme is not None:
+            return cached_readme
+
+    with span(trace, "model_call", map_reduce=True) as attrs:
+        model = model or get_client()
+        readme = map_reduce_readme(model, system_prompt, raw_prompt, file_contents,
+                                   max_workers=max_workers, on_chunk_done=on_chunk_done, facts_block=facts_block)
+        attrs["bytes"] = len(readme.encode("utf-8"))
+        attrs["tokens"] = estimate_tokens(readme)
+
+    if cache is not None:
+        cache.set(cache_key, readme)
+    return readme
+
+
+def build_retrieval_index(file_contents, project_facts=True, dedup=True, trace=None):
+    """BM25 index over the reduced files; skeletons are skipped since retrieval already selects code"""
+    with span(trace, "retrieval_index") as attrs:
+        file_contents = reduce_files(file_contents, skeleton=False, project_facts=project_facts, dedup=dedup)[1]
+        index = RetrievalIndex(file_contents)
+        attrs["chunks"] = len(index.chunks)
+    return index
+
+
+def generate_section_parallel(raw_prompt, file_contents, cache=None, max_workers=DEFAULT_MAX_WORKERS,
+                              on_section_done=None, model=None, trace=None, skeleton=False, project_facts=True,
+                              dedup=True, index=None):
+    """Generate a README by writing its planned sections concurrently from focused context
+
+    Returns (readme, sections) with sections as [(title, markdown)] in
+    document order. With index (see build_retrieval_index) each section gets
+    its top retrieved chunks instead of whole files.
+    """
+    facts_block, file_contents = reduce_files(file_contents, skeleton, project_facts, dedup)
+    mode = "sections:retrieval" if index is not None else "sections"
+    cache_key = make_cache_key(f"{MODEL_NAME}:{mode}", get_system_prompt(), f"{raw_prompt}\n{facts_block}", file_contents)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            readme, sections = json.loads(cached)
+            return readme, [tuple(section) for section in sections]
+
+    with span(trace, "model_call", sections=True) as attrs:
+        model = model or get_client()
+        readme, sections = generate_sections(model, raw_prompt, file_contents, facts_block,
+                                             max_workers=max_workers, on_section_done=on_section_done, index=index)
+        attrs["bytes"] = len(readme.encode("utf-8"))
+        attrs["tokens"] = estimate_tokens(readme)
+        attrs["sections"] = len(sections)
+
+    if cache is not None:
+        cache.set(cache_key, json.dumps([readme, sections]))
+    return readme, sections
+
+
+def regenerate_readme_section(markdown, index, raw_prompt, file_contents, instructions="", model=None, trace=None,
+                              skeleton=False, project_facts=True, dedup=True, retrieval_index=None):
+    """Rewrite one ## section of markdown (index into sections.split_sections) and splice it back
+
+    Only that section's files and an outline of the other sections are
+    sent. Not cached: asking again is how users get a different take.
+    """
+    facts_block, file_contents = reduce_files(file_contents, skeleton, project_facts, dedup)
+    with span(trace, "model_call", regenerate_section=index) as attrs:
+        model = model or get_client()
+        readme = regenerate_section(model, markdown, index, raw_prompt, file_contents, facts_block, instructions,
+                                    retrieval_index=retrieval_index)
+        attrs["bytes"] = len(readme.encode("utf-8"))
+        attrs["tokens"] = estimate_tokens(readme)
+    return readme
@@ -0,0 +1,108 @@
+"""Map-reduce README generation for projects larger than one context window
+
+The map step summarizes chunks of files concurrently and the reduce step
+writes the README from those summaries. Any object with a
+generate_content(prompt) method returning something with a .text
+attribute can be used as the model, which keeps the pipeline easy to run
+against a local fake.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from context_packer import estimate_tokens, file_priority
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_CHUNK_TOKENS = 30_000
+
+MAP_PROMPT = """You are helping write a README for a software project. Summarize the following project files for a technical writer.
+
+Cover, where present: the purpose of each file, public classes/functions and their signatures, command-line usage and flags, configuration options, dependencies, entry points, and how to run or test the code. Be factual and concise, use Markdown bullet lists, and do not invent details.
+
+"""
+
+
+def chunk_files(file_contents, max_chunk_tokens=DEFAULT_CHUNK_TOKENS):
+    """Group files by directory into chunks of at most max_chunk_tokens
+
+    Files larger than a chunk are split into consecutive parts. The result is
+    a list of (label, {filename: content}) pairs in a deterministic order.
+    """
+    by_directory = {}
+    for name in sorted(file_contents):
+        by_directory.setdefault(os.path.dirname(name) or ".", []).append(name)
+
+    chunks = []
+    for directory in sorted(by_directory, key=lambda d: (min(file_priority(n) for n in by_directory[d]), d)):
+        current, current_tokens = {}, 0
+        for name in by_directory[directory]:
+            content = file_contents[name]
+            tokens = estimate_tokens(content)
+
+            if tokens > max_chunk_tokens:
+                max_chars = max_chunk_tokens * 4
+                parts = [content[i:i + max_chars] for i in range(0, len(content), max_chars)]
+                for index, part in enumerate(parts, start=1):
+                    chunks.append((f"{name} (part {index}/{len(parts)})", {name: part}))
+                continue
+
+            if current and current_tokens + tokens > max_chunk_tokens:
+                chunks.append((f"{directory}/ ({len(chunks) + 1})", current))
+                current, current_tokens = {}, 0
+            current[name] = content
+            current_tokens += tokens
+
+        if current:
+            chunks.append((f"{directory}/ ({len(chunks) + 1})", current))
+
+    return chunks
+
+
+def summarize_chunk(model, files):
+    """Map step: summarize one chunk of files"""
+    prompt = MAP_PROMPT
+    for filename, content in files.items():
+        prompt += f"\n--- {filename} ---\n{content}\n"
+    return model.generate_content(prompt).text
+
+
+def map_files(model, chunks, max_workers=DEFAULT_MAX_WORKERS, on_chunk_done=None):
+    """Summarize every chunk on a bounded worker pool
+
+    Returns {label: summary} in chunk order regardless of completion order.
+    on_chunk_done(done, total) is called as chunks finish.
+    """
+    summaries = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(summarize_chunk, model, files): index
+            for index, (_, files) in enumerate(chunks)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            summaries[futures[future]] = future.result()
+            if on_chunk_done is not None:
+                on_chunk_done(done, len(chunks))
+    return {label: summary for (label, _), summary in zip(chunks, summaries)}
+
+
+def build_reduce_prompt(system_prompt, raw_prompt, summaries, facts_block=""):
+    """Reduce step prompt: README synthesis from the per-chunk summaries"""
+    facts_section = ""
+    if facts_block:
+        facts_section = f"\n\n**Project Facts (parsed from manifests, authoritative):**\n{facts_block}"
+
+    summaries_section = ""
+    if summaries:
+        summaries_section = "\n\n**Project File Summaries:**\n"
+        for label, summary in summaries.items():
+            summaries_section += f"\n--- {label} ---\n{summary}\n"
+
+    return f"{system_prompt}\n\n**User Project Description:**\n{raw_prompt}{facts_section}{summaries_section}\n\nGenerate a comprehensive README.md based on the above information."
+
+
+def map_reduce_readme(model, system_prompt, raw_prompt, file_contents,
+                      max_workers=DEFAULT_MAX_WORKERS, max_chunk_tokens=DEFAULT_CHUNK_TOKENS,
+                      on_chunk_done=None, facts_block=""):
+    """Summarize files concurrently, then generate the README from the summaries"""
+    chunks = chunk_files(file_contents, max_chunk_tokens)
+    summaries = map_files(model, chunks, max_workers, on_chunk_done)
+    return model.generate_content(build_reduce_prompt(system_prompt, raw_prompt, summaries, facts_block)).text
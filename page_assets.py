@@ -0,0 +1,82 @@
+"""Static page chrome, built once per process
+
+The stylesheet lives in static/app.css. When Streamlit serves the static
+folder (see .streamlit/config.toml) it is linked under a content-fingerprinted
+URL, so browsers cache it and each rerun only sends a <link> tag; otherwise
+it is inlined. The Inter web font is loaded from Google Fonts unless
+README_WEB_FONTS is off; the font stack falls back to system fonts, so the
+app also works offline.
+"""
+import hashlib
+import html
+import os
+from functools import lru_cache
+from pathlib import Path
+
+STATIC_DIR = Path(__file__).parent / "static"
+STYLESHEET = "app.css"
+WEB_FONTS_URL = "https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap"
+
+HEADER_HTML = """
+<div class="fade-in">
+    <h1 class="main-header">
+        <span class="header-emoji">✨</span>
+        <span class="header-text">README Generator Pro</span>
+    </h1>
+    <p class="main-subtitle">Generate comprehensive, professional README files for your projects using AI</p>
+</div>
+"""
+
+EMPTY_STATE_HTML = """
+<div class="empty-state">
+    <div class="empty-state-icon">📝</div>
+    <h3>Ready to Generate!</h3>
+    <p>
+        👈 Enter your project description and optionally upload files,<br>
+        then click <strong>'Generate Professional README'</strong> to create<br>
+        a comprehensive documentation for your project.
+    </p>
+    <div class="empty-state-badge">
+        <span>🚀</span>
+        <span>AI-Powered • Professional • Comprehensive</span>
+    </div>
+</div>
+"""
+
+FOOTER_HTML = """
+<div class="app-footer">
+    <div class="app-footer-title">✨ README Generator Pro</div>
+    <p>Powered by AI • Built with ❤️ • Create professional documentation in seconds</p>
+</div>
+"""
+
+
+def web_fonts_enabled():
+    """Whether to load the Inter web font (README_WEB_FONTS, on by default)"""
+    return os.getenv("README_WEB_FONTS", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+@lru_cache(maxsize=None)
+def stylesheet():
+    return (STATIC_DIR / STYLESHEET).read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=None)
+def stylesheet_url():
+    """Static URL of the stylesheet with a content fingerprint, so a changed file is never served stale"""
+    version = hashlib.sha256(stylesheet().encode("utf-8")).hexdigest()[:12]
+    return f"app/static/{STYLESHEET}?v={version}"
+
+
+@lru_cache(maxsize=None)
+def style_tags(static_serving, web_fonts):
+    """HTML that loads the web fonts (optional) and the stylesheet, linked or inline"""
+    tags = []
+    if web_fonts:
+        tags.append('<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>')
+        tags.append(f'<link rel="stylesheet" href="{html.escape(WEB_FONTS_URL)}">')
+    if static_serving:
+        tags.append(f'<link rel="stylesheet" href="{html.escape(stylesheet_url())}">')
+    else:
+        tags.append(f"<style>\n{stylesheet()}\n</style>")
+    return "\n".join(tags)
@@ -0,0 +1,129 @@
+"""Bounded worker pools for ingesting uploads with deterministic output order
+
+Hashing runs on threads (hashlib releases the GIL on large buffers).
+Decoding, sampling and compressing are pure Python and hold the GIL, so
+they run on a shared process pool when there is more than one CPU and
+enough data to amortize it, and sequentially otherwise.
+"""
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from archive_ingest import is_archive, read_archive
+from content_stats import files_stats, total_stats
+from content_store import compress_files
+from dedup import file_signatures
+from sampled_read import read_file_sampled
+
+DEFAULT_MAX_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+PROCESS_WORKERS = min(8, os.cpu_count() or 1)
+
+# Below this many bytes the pool costs more than it saves
+PARALLEL_MIN_BYTES = 1024 * 1024
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def choose_workers(total_bytes, max_workers=DEFAULT_MAX_WORKERS):
+    """Use the pool only when there is enough data to amortize it"""
+    return max_workers if total_bytes >= PARALLEL_MIN_BYTES else 1
+
+
+def choose_processes(total_bytes, max_workers=PROCESS_WORKERS):
+    """Process count for CPU-bound decoding; 1 (sequential) on single-CPU hosts or small batches"""
+    return max_workers if max_workers > 1 and total_bytes >= PARALLEL_MIN_BYTES else 1
+
+
+def get_process_pool():
+    """Process-wide decoding pool, created on first use; None when processes are unavailable"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            try:
+                # spawn: forking the multi-threaded server process is unsafe
+                _process_pool = ProcessPoolExecutor(PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            except (OSError, NotImplementedError):
+                return None
+        return _process_pool
+
+
+def map_ordered(func, items, max_workers=DEFAULT_MAX_WORKERS, on_done=None, processes=False):
+    """Apply func to every item on a bounded pool and return results in input order
+
+    on_done(done, total, item) is called from the calling thread as each item
+    completes, so it may safely update UI elements. With processes=True,
+    func and items must be picklable and the shared process pool is used.
+    """
+    items = list(items)
+    if max_workers > 1 and len(items) > 1:
+        if not processes:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+                return _collect(executor, func, items, on_done)
+        executor = get_process_pool()
+        if executor is not None:
+            return _collect(executor, func, items, on_done)
+
+    results = []
+    for item in items:
+        results.append(func(item))
+        if on_done is not None:
+            on_done(len(results), len(items), item)
+    return results
+
+
+def _collect(executor, func, items, on_done):
+    results = [None] * len(items)
+    futures = {executor.submit(func, item): index for index, item in enumerate(items)}
+    for done, future in enumerate(as_completed(futures), start=1):
+        index = futures[future]
+        results[index] = future.result()
+        if on_done is not None:
+            on_done(done, len(items), items[index])
+    return results
+
+
+class UploadBuffer(io.BytesIO):
+    """In-memory upload with the name/size attributes of Streamlit's UploadedFile"""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def decode_upload(upload):
+    """Decode, sample and compress one upload given as (name, bytes, byte cap)
+
+    Runs in a worker process, so it returns plain data only: compressed
+    blobs, stats, near-duplicate signatures, reports and a timing record
+    for the caller's trace.
+    """
+    name, data, max_bytes = upload
+    started = time.perf_counter()
+    buffer = UploadBuffer(name, data)
+    if is_archive(name) and max_bytes <= 0:
+        # The total byte budget is spent: the archive is not opened at all
+        contents, stage, sampling = {}, "read_archive", None
+        archive_report = {"read": 0, "ignored": 0, "binary": 0, "sampled": 0, "skipped": 0, "dropped_bytes": len(data)}
+    elif is_archive(name):
+        # Whole repository: stream the archive member by member, within the upload's share of the total
+        contents, archive_report = read_archive(buffer, name, max_total_bytes=max_bytes)
+        stage, sampling = "read_archive", None
+    else:
+        content, sampling = read_file_sampled(buffer, max_bytes)
+        contents, archive_report, stage = {name: content}, None, "read_file_content"
+    stats = files_stats(contents)
+    return {
+        "blobs": compress_files(contents),
+        "archive_report": archive_report,
+        "sampling": sampling,
+        "stats": stats,
+        "signatures": file_signatures(contents),
+        "totals": total_stats(stats.values()),
+        "timing": {"stage": stage, "seconds": time.perf_counter() - started, "file": name, "bytes": len(data),
+                   "tokens": sum(record["tokens"] for record in stats.values())},
+    }
@@ -0,0 +1,296 @@
+"""Deterministic extraction of project facts from manifests and config files
+
+Parses requirements files, pyproject.toml, setup.py/setup.cfg, package.json,
+Dockerfile, version pins and LICENSE into a compact facts block, so the model
+does not have to read (and pay tokens for) the raw manifests.
+"""
+import ast
+import configparser
+import json
+import os
+import re
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Titles are matched against the first lines only: license bodies name other
+# licenses (GPL-3.0 section 13 names the Affero GPL, MPL-2.0 names the GPL)
+LICENSE_TITLES = (
+    ('AGPL-3.0', r'GNU AFFERO GENERAL PUBLIC LICENSE\s+Version 3\b'),
+    ('LGPL-3.0', r'GNU LESSER GENERAL PUBLIC LICENSE\s+Version 3\b'),
+    ('LGPL-2.1', r'GNU LESSER GENERAL PUBLIC LICENSE\s+Version 2\.1\b'),
+    ('LGPL-2.0', r'GNU LIBRARY GENERAL PUBLIC LICENSE\s+Version 2\b'),
+    ('GPL-3.0', r'GNU GENERAL PUBLIC LICENSE\s+Version 3\b'),
+    ('GPL-2.0', r'GNU GENERAL PUBLIC LICENSE\s+Version 2\b'),
+    ('GPL-1.0', r'GNU GENERAL PUBLIC LICENSE\s+Version 1\b'),
+    ('Apache-2.0', r'Apache License\s+Version 2\.0\b'),
+    ('MPL-2.0', r'Mozilla Public License,?\s+Version 2\.0\b'),
+    ('MPL-1.1', r'Mozilla Public License,?\s+Version 1\.1\b'),
+    ('BSL-1.0', r'Boost Software License\s*-?\s*Version 1\.0\b'),
+    ('CC0-1.0', r'CC0 1\.0 Universal'),
+    ('MIT', r'^\s*(?:The\s+)?MIT License\b'),
+    ('Unlicense', r'^\s*(?:The\s+)?Unlicense\b'),
+)
+# Short permissive licenses often have no title; their grant wording is distinctive
+LICENSE_SIGNATURES = (
+    ('BSD-3-Clause', ('Redistribution and use in source and binary forms', 'Neither the name')),
+    ('BSD-2-Clause', ('Redistribution and use in source and binary forms',)),
+    ('MIT', ('Permission is hereby granted, free of charge',)),
+    ('ISC', ('Permission to use, copy, modify, and/or distribute this software',)),
+    ('Unlicense', ('This is free and unencumbered software released into the public domain',)),
+)
+LICENSE_HEADER_LINES = 12
+SPDX_HEADER = re.compile(r"SPDX-License-Identifier:\s*([\w.+-]+)")
+LICENSE_FILES = {'license', 'license.md', 'license.txt', 'copying', 'licence', 'licence.md'}
+VERSION_FILES = {'.python-version': 'python', 'runtime.txt': 'python', '.nvmrc': 'node', '.node-version': 'node'}
+REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)(\[[^\]]*\])?\s*(.*)$")
+
+
+def detect_license(text):
+    """SPDX identifier for a license text, from its SPDX header, title or grant wording; or None"""
+    header = '\n'.join([line for line in text.splitlines() if line.strip()][:LICENSE_HEADER_LINES])
+    match = SPDX_HEADER.search(header)
+    if match:
+        return match.group(1)
+    for spdx, title in LICENSE_TITLES:
+        if re.search(title, header, re.IGNORECASE | re.MULTILINE):
+            return spdx
+    # Long copyleft texts without a recognised title are left for the model to read
+    if len(text) > 4000:
+        return None
+    body = ' '.join(text.split()).lower()
+    for spdx, markers in LICENSE_SIGNATURES:
+        if all(marker.lower() in body for marker in markers):
+            return spdx
+    return None
+
+
+def parse_requirements(text):
+    """Requirement strings from a requirements.txt"""
+    deps = []
+    for line in text.splitlines():
+        line = line.split(' #', 1)[0].strip()
+        if not line or line.startswith(('#', '-')):
+            continue
+        match = REQUIREMENT_NAME.match(line)
+        if match:
+            deps.append(''.join(part for part in match.groups() if part).replace(' ', ''))
+    return deps
+
+
+def parse_pyproject(text):
+    if tomllib is None:
+        return None
+    data = tomllib.loads(text)
+    facts = {}
+    project = data.get('project', {})
+    poetry = data.get('tool', {}).get('poetry', {})
+
+    facts['name'] = project.get('name') or poetry.get('name')
+    facts['version'] = project.get('version') or poetry.get('version')
+    facts['description'] = project.get('description') or poetry.get('description')
+    facts['python'] = project.get('requires-python') or poetry.get('dependencies', {}).get('python')
+    facts['python_deps'] = list(project.get('dependencies', [])) or [
+        f"{name}{spec if isinstance(spec, str) and spec[:1] in '<>=!~^' else ''}"
+        for name, spec in poetry.get('dependencies', {}).items() if name != 'python'
+    ]
+    facts['extras'] = sorted(project.get('optional-dependencies', {})) or sorted(poetry.get('extras', {}))
+    facts['entry_points'] = {**project.get('scripts', {}), **poetry.get('scripts', {})}
+    license_info = project.get('license') or poetry.get('license')
+    if isinstance(license_info, dict):
+        license_info = license_info.get('text') or license_info.get('file')
+    facts['license'] = license_info
+    build = data.get('build-system', {}).get('build-backend')
+    facts['build_backend'] = build
+    if 'pytest' in data.get('tool', {}):
+        facts['test_command'] = 'pytest'
+    return facts
+
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def parse_setup_py(text):
+    """Literal keyword arguments of the setup() call"""
+    tree = ast.parse(text)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and getattr(node.func, 'id', getattr(node.func, 'attr', None)) == 'setup':
+            kwargs = {kw.arg: _literal(kw.value) for kw in node.keywords if kw.arg}
+            entry_points = kwargs.get('entry_points') or {}
+            scripts = entry_points.get('console_scripts', []) if isinstance(entry_points, dict) else []
+            return {
+                'name': kwargs.get('name'),
+                'version': kwargs.get('version'),
+                'description': kwargs.get('description'),
+                'python': kwargs.get('python_requires'),
+                'python_deps': kwargs.get('install_requires') or [],
+                'extras': sorted(kwargs.get('extras_require') or {}),
+                'entry_points': dict(s.replace(' ', '').split('=', 1) for s in scripts if '=' in s),
+                'license': kwargs.get('license'),
+            }
+    return None
+
+
+def parse_setup_cfg(text):
+    parser = configparser.ConfigParser()
+    parser.read_string(text)
+    metadata = parser['metadata'] if parser.has_section('metadata') else {}
+    options = parser['options'] if parser.has_section('options') else {}
+    scripts = ''
+    if parser.has_section('options.entry_points'):
+        scripts = parser['options.entry_points'].get('console_scripts', '')
+    return {
+        'name': metadata.get('name'),
+        'version': metadata.get('version'),
+        'description': metadata.get('description'),
+        'python': options.get('python_requires'),
+        'python_deps': [d.strip() for d in options.get('install_requires', '').splitlines() if d.strip()],
+        'entry_points': dict(s.replace(' ', '').split('=', 1) for s in scripts.splitlines() if '=' in s),
+        'license': metadata.get('license'),
+    }
+
+
+def parse_package_json(text):
+    data = json.loads(text)
+    bin_field = data.get('bin', {})
+    if isinstance(bin_field, str):
+        bin_field = {data.get('name', 'bin'): bin_field}
+    scripts = data.get('scripts', {})
+    return {
+        'name': data.get('name'),
+        'version': data.get('version'),
+        'description': data.get('description'),
+        'node': data.get('engines', {}).get('node'),
+        'node_deps': [f"{name}@{version}" for name, version in data.get('dependencies', {}).items()],
+        'node_dev_deps': [f"{name}@{version}" for name, version in data.get('devDependencies', {}).items()],
+        'scripts': scripts,
+        'entry_points': {**bin_field, **({'main': data['main']} if 'main' in data else {})},
+        'license': data.get('license'),
+        'test_command': 'npm test' if 'test' in scripts else None,
+    }
+
+
+def parse_dockerfile(text):
+    facts = {'base_images': [], 'exposed_ports': [], 'env': [], 'command': None}
+    for line in text.splitlines():
+        parts = line.strip().split(None, 1)
+        if len(parts) < 2:
+            continue
+        instruction, argument = parts[0].upper(), parts[1].strip()
+        if instruction == 'FROM':
+            facts['base_images'].append(argument.split(' AS ')[0].split(' as ')[0])
+        elif instruction == 'EXPOSE':
+            facts['exposed_ports'] += argument.split()
+        elif instruction == 'ENV':
+            facts['env'].append(re.split(r'[=\s]', argument, 1)[0])
+        elif instruction in ('CMD', 'ENTRYPOINT'):
+            facts['command'] = argument
+    return facts
+
+
+MANIFEST_PARSERS = {
+    'pyproject.toml': parse_pyproject,
+    'setup.py': parse_setup_py,
+    'setup.cfg': parse_setup_cfg,
+    'package.json': parse_package_json,
+}
+
+
+def _merge(facts, new):
+    for key, value in (new or {}).items():
+        if value in (None, '', [], {}):
+            continue
+        if isinstance(value, list):
+            facts.setdefault(key, [])
+            facts[key] += [item for item in value if item not in facts[key]]
+        elif isinstance(value, dict):
+            facts.setdefault(key, {}).update(value)
+        else:
+            facts.setdefault(key, value)
+
+
+def extract_project_facts(file_contents):
+    """Parse known manifests; returns (facts, names of files fully captured by the facts)
+
+    Files that fail to parse are left out of the consumed set so they are
+    still sent to the model verbatim.
+    """
+    facts = {}
+    consumed = []
+    for filename in sorted(file_contents, key=lambda name: (name.count('/'), name)):
+        content = file_contents[filename]
+        basename = os.path.basename(filename).lower()
+        # Only top-level manifests describe the project as a whole
+        top_level = '/' not in filename.strip('/')
+        try:
+            if basename in MANIFEST_PARSERS and top_level:
+                parsed = MANIFEST_PARSERS[basename](content)
+                if parsed is None:
+                    continue
+                _merge(facts, parsed)
+            elif re.fullmatch(r'requirements([-_.]\w+)?\.txt', basename) and top_level:
+                key = 'python_deps' if basename == 'requirements.txt' else 'python_dev_deps'
+                _merge(facts, {key: parse_requirements(content)})
+            elif basename == 'dockerfile' and top_level:
+                _merge(facts, {'docker': parse_dockerfile(content)})
+            elif basename in VERSION_FILES and top_level:
+                version = content.strip().splitlines()[0] if content.strip() else ''
+                _merge(facts, {VERSION_FILES[basename]: version.replace('python-', '')})
+            elif basename in LICENSE_FILES and top_level:
+                spdx = detect_license(content)
+                if spdx is None:
+                    continue
+                facts['license'] = spdx
+                copyright_line = next((l.strip() for l in content.splitlines() if l.strip().lower().startswith('copyright')), None)
+                if copyright_line:
+                    facts['copyright'] = copyright_line
+            else:
+                continue
+        except (ValueError, SyntaxError, KeyError, TypeError, AttributeError, configparser.Error):
+            continue
+        consumed.append(filename)
+
+    if 'test_command' not in facts:
+        if any(os.path.basename(name).startswith('test_') or '/tests/' in f"/{name}" for name in file_contents):
+            facts['test_command'] = 'pytest'
+    return facts, consumed
+
+
+def format_project_facts(facts):
+    """Compact Markdown block of the extracted facts"""
+    labels = (
+        ('name', 'Name'), ('version', 'Version'), ('description', 'Description'), ('license', 'License (SPDX)'),
+        ('copyright', 'Copyright'), ('python', 'Python version'), ('node', 'Node version'),
+        ('build_backend', 'Build backend'), ('python_deps', 'Python dependencies'),
+        ('python_dev_deps', 'Python dev dependencies'), ('extras', 'Optional extras'),
+        ('node_deps', 'Node dependencies'), ('node_dev_deps', 'Node dev dependencies'),
+        ('scripts', 'Package scripts'), ('entry_points', 'Entry points'), ('test_command', 'Test command'),
+    )
+    lines = []
+    for key, label in labels:
+        value = facts.get(key)
+        if not value:
+            continue
+        if isinstance(value, dict):
+            value = ', '.join(f"`{k}` → `{v}`" for k, v in value.items())
+        elif isinstance(value, list):
+            value = ', '.join(f"`{item}`" for item in value)
+        lines.append(f"- {label}: {value}")
+
+    docker = facts.get('docker')
+    if docker:
+        parts = [f"base {', '.join(docker['base_images'])}" if docker['base_images'] else '',
+                 f"exposes {', '.join(docker['exposed_ports'])}" if docker['exposed_ports'] else '',
+                 f"env {', '.join(docker['env'])}" if docker['env'] else '',
+                 f"runs `{docker['command']}`" if docker['command'] else '']
+        lines.append(f"- Docker: {'; '.join(part for part in parts if part)}")
+    return '\n'.join(lines)
@@ -0,0 +1,118 @@
+"""Chat-based refinement of a generated README
+
+The model sees the full README once. Later turns carry only the user's
+instruction, plus a unified diff when the README was edited outside the
+chat. Replies contain just the changed sections, which are spliced back
+into the document. Once the history grows past a token budget, older turns
+are folded into a short summary and the chat is re-anchored on the current
+README, so per-turn cost stays flat over long editing sessions.
+"""
+import difflib
+import re
+
+from context_packer import estimate_tokens
+from sections import OVERVIEW, join_sections, normalize_section, split_sections
+
+DEFAULT_HISTORY_TOKENS = 8_000
+KEEP_RECENT_MESSAGES = 2
+EXTERNAL_EDIT = "I edited the README outside this chat:\n```diff\n{diff}```\n\n"
+EXTERNAL_EDIT_PATTERN = re.compile(r"^I edited the README outside this chat:\n```diff\n.*?\n```\n\n", re.DOTALL)
+
+REFINE_INSTRUCTIONS = """You are helping the user refine a README.md. Apply each request to the README below.
+
+Reply with ONLY the sections you changed, each as complete Markdown starting with its exact existing `## ` heading (or with the `# ` title for the introduction). Do not repeat unchanged sections and do not wrap the reply in a code block. To add a section, start it with a new `## ` heading. If the request needs no change to the README, answer briefly in plain text without any heading.
+{summary}
+**Current README:**
+{readme}"""
+
+SUMMARY_PROMPT = """Summarize this README editing conversation in at most 10 bullet points. Keep every decision, preference and constraint the user stated, so later edits stay consistent. Do not restate the README itself.
+
+"""
+
+
+def readme_diff(old, new):
+    """Unified diff between two README versions"""
+    return "".join(difflib.unified_diff(old.splitlines(keepends=True), new.splitlines(keepends=True),
+                                        "README.md (before)", "README.md (now)", n=2))
+
+
+def apply_section_edits(readme, reply):
+    """Splice the sections in reply into readme; returns (readme, changed headings)"""
+    sections = split_sections(readme)
+    positions = {heading.lower(): index for index, (heading, _) in enumerate(sections)}
+    changed = []
+    for heading, text in split_sections(normalize_section(OVERVIEW, reply)):
+        if heading == OVERVIEW:
+            # Text before the first ## heading only counts when it is a new title block
+            if not text.startswith("# "):
+                continue
+            index = positions.get(OVERVIEW.lower())
+        else:
+            index = positions.get(heading.lower())
+        if index is None:
+            sections.append((heading, text))
+        else:
+            sections[index] = (sections[index][0], text)
+        changed.append(heading)
+    if not changed:
+        return readme, changed
+    return join_sections(sections), changed
+
+
+class RefinementChat:
+    """Multi-turn refinement state: the anchored README, recent turns and a summary of older ones"""
+
+    def __init__(self, history_token_budget=DEFAULT_HISTORY_TOKENS):
+        self.history_token_budget = history_token_budget
+        self.anchor = None
+        self.readme = None
+        self.history = []
+        self.summary = ""
+
+    def _anchor(self, readme):
+        self.anchor = readme
+        self.readme = readme
+        self.history = []
+
+    def _contents(self, message):
+        summary = f"\n**Earlier requests (summary):**\n{self.summary}\n" if self.summary else ""
+        preamble = REFINE_INSTRUCTIONS.format(summary=summary, readme=self.anchor)
+        return ([{"role": "user", "parts": [preamble]}, {"role": "model", "parts": ["Understood."]}]
+                + self.history + [{"role": "user", "parts": [message]}])
+
+    def history_tokens(self):
+        return sum(estimate_tokens(part) for turn in self.history for part in turn["parts"])
+
+    def send(self, model, instruction, readme):
+        """Apply instruction to readme; returns (new readme, reply text, changed headings)"""
+        message = instruction
+        if self.anchor is None:
+            self._anchor(readme)
+        elif readme != self.readme:
+            diff = readme_diff(self.readme, readme)
+            if len(diff) > len(readme) // 2:
+                # Rewritten wholesale (e.g. regenerated): cheaper to re-anchor than to send the diff
+                self._anchor(readme)
+            else:
+                message = EXTERNAL_EDIT.format(diff=diff) + instruction
+
+        reply = model.generate_content(self._contents(message)).text
+        updated, changed = apply_section_edits(readme, reply)
+        self.history += [{"role": "user", "parts": [message]}, {"role": "model", "parts": [reply]}]
+        self.readme = updated
+        if self.history_tokens() > self.history_token_budget:
+            self.compact(model)
+        return updated, reply, changed
+
+    def compact(self, model):
+        """Fold older turns into the summary and re-anchor on the current README"""
+        older, recent = self.history[:-KEEP_RECENT_MESSAGES], self.history[-KEEP_RECENT_MESSAGES:]
+        if older:
+            transcript = "\n\n".join(f"{turn['role']}: {turn['parts'][0]}" for turn in older)
+            if self.summary:
+                transcript = f"Earlier summary:\n{self.summary}\n\n{transcript}"
+            self.summary = model.generate_content(SUMMARY_PROMPT + transcript).text.strip()
+        self._anchor(self.readme)
+        # The kept turns stay as context; their edits and diffs are already part of the new anchor
+        self.history = [{"role": turn["role"], "parts": [EXTERNAL_EDIT_PATTERN.sub("", turn["parts"][0])]}
+                        for turn in recent]
@@ -0,0 +1,209 @@
+"""Local retrieval over uploaded files
+
+Files are chunked by function/class for code and by heading for Markdown,
+then indexed with BM25. When README_EMBEDDING_MODEL names a
+sentence-transformers model and the package is installed, dense similarity
+is blended into the ranking. Each README section or follow-up request then
+receives only its top-k chunks, so prompt size stays flat as projects grow.
+"""
+import ast
+import math
+import os
+import re
+from collections import Counter
+
+from context_packer import estimate_tokens
+
+DEFAULT_TOP_K = 12
+DEFAULT_RETRIEVAL_TOKENS = 12_000
+MAX_CHUNK_LINES = 120
+BM25_K1 = 1.5
+BM25_B = 0.75
+DENSE_WEIGHT = 0.5
+
+MARKDOWN_EXTENSIONS = {'md', 'markdown', 'rst', 'txt'}
+CODE_BLOCK_START = re.compile(
+    r"^(?:export\s+)?(?:async\s+)?(?:function\b|class\b|def\b|(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?\(|"
+    r"(?:pub\s+)?fn\b|func\b|(?:public|private|protected)\s)"
+)
+IDENTIFIER = re.compile(r"[A-Za-z][A-Za-z0-9]*|\d+")
+CAMEL_CASE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text):
+    """Lowercase terms with snake_case and camelCase identifiers split into words"""
+    terms = []
+    for identifier in IDENTIFIER.findall(text):
+        parts = CAMEL_CASE.findall(identifier)
+        terms += [part.lower() for part in parts if len(part) > 1]
+        if len(parts) > 1:
+            terms.append(identifier.lower())
+    return terms
+
+
+def _chunk(filename, lines, start, end, kind):
+    return {"file": filename, "start": start + 1, "end": end, "kind": kind, "text": "\n".join(lines[start:end])}
+
+
+def _split_long(chunk):
+    """Split a chunk longer than MAX_CHUNK_LINES into consecutive windows"""
+    lines = chunk["text"].splitlines()
+    if len(lines) <= MAX_CHUNK_LINES:
+        return [chunk]
+    return [
+        {**chunk, "start": chunk["start"] + offset, "end": min(chunk["start"] + offset + MAX_CHUNK_LINES - 1, chunk["end"]),
+         "text": "\n".join(lines[offset:offset + MAX_CHUNK_LINES])}
+        for offset in range(0, len(lines), MAX_CHUNK_LINES)
+    ]
+
+
+def chunk_python(filename, content):
+    """One chunk per top-level function/class; the rest of the module forms a header chunk"""
+    lines = content.splitlines()
+    tree = ast.parse(content)
+    chunks, covered = [], set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+            chunks.append(_chunk(filename, lines, start, node.end_lineno, "class" if isinstance(node, ast.ClassDef) else "function"))
+            covered.update(range(start, node.end_lineno))
+    header = [line for number, line in enumerate(lines) if number not in covered]
+    if any(line.strip() for line in header):
+        chunks.insert(0, {"file": filename, "start": 1, "end": len(lines), "kind": "module",
+                          "text": "\n".join(header).strip()})
+    return chunks
+
+
+def chunk_markdown(filename, content):
+    """One chunk per heading section"""
+    lines = content.splitlines()
+    starts = [number for number, line in enumerate(lines) if line.startswith('#')]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [_chunk(filename, lines, start, end, "section") for start, end in zip(starts, starts[1:] + [len(lines)])]
+
+
+def chunk_code(filename, content):
+    """Split at lines that look like top-level definitions (JS/TS, Go, Rust, Java, ...)"""
+    lines = content.splitlines()
+    starts = [number for number, line in enumerate(lines) if CODE_BLOCK_START.match(line)]
+    if not starts:
+        return chunk_generic(filename, content)
+    if starts[0] != 0:
+        starts.insert(0, 0)
+    return [_chunk(filename, lines, start, end, "block") for start, end in zip(starts, starts[1:] + [len(lines)])]
+
+
+def chunk_generic(filename, content):
+    """Windows of up to MAX_CHUNK_LINES lines, cut at blank lines where possible"""
+    lines = content.splitlines()
+    chunks, start = [], 0
+    while start < len(lines):
+        end = min(start + MAX_CHUNK_LINES, len(lines))
+        if end < len(lines):
+            blank = next((n for n in range(end - 1, start + MAX_CHUNK_LINES // 2, -1) if not lines[n].strip()), None)
+            end = blank + 1 if blank is not None else end
+        chunks.append(_chunk(filename, lines, start, end, "lines"))
+        start = end
+    return chunks
+
+
+def chunk_file(filename, content):
+    """Chunks of one file, each a dict with file, start, end, kind and text"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    try:
+        if extension == 'py':
+            chunks = chunk_python(filename, content)
+        elif extension in MARKDOWN_EXTENSIONS:
+            chunks = chunk_markdown(filename, content)
+        else:
+            chunks = chunk_code(filename, content)
+    except (SyntaxError, ValueError, RecursionError):
+        chunks = chunk_generic(filename, content)
+    return [piece for chunk in chunks if chunk["text"].strip() for piece in _split_long(chunk)]
+
+
+def _load_encoder(model_name):
+    """sentence-transformers model, or None when the package is missing
+
+    Imported here rather than at module level: it loads torch, which would
+    slow every start of the app and the CLI even with no model configured.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    return SentenceTransformer(model_name)
+
+
+class RetrievalIndex:
+    """BM25 index over file chunks, optionally blended with dense embeddings"""
+
+    def __init__(self, file_contents, embedding_model=None):
+        self.chunks = [chunk for filename, content in file_contents.items() for chunk in chunk_file(filename, content)]
+        self.postings = {}
+        self.lengths = []
+        for chunk_id, chunk in enumerate(self.chunks):
+            # File paths are searchable too: "tests/test_cli.py" should match "test"
+            terms = tokenize(chunk["text"]) + tokenize(chunk["file"])
+            self.lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                self.postings.setdefault(term, []).append((chunk_id, count))
+        self.average_length = sum(self.lengths) / max(1, len(self.lengths))
+
+        self.encoder = None
+        self.embeddings = None
+        model_name = embedding_model or os.getenv("README_EMBEDDING_MODEL")
+        if model_name and self.chunks:
+            self.encoder = _load_encoder(model_name)
+        if self.encoder is not None:
+            self.embeddings = self.encoder.encode([chunk["text"] for chunk in self.chunks], normalize_embeddings=True)
+
+    def bm25_scores(self, query):
+        scores = {}
+        total = len(self.chunks)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term, ())
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, count in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[chunk_id] / self.average_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * count * (BM25_K1 + 1) / (count + norm)
+        return scores
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        """Top-k (score, chunk) pairs for query, best first"""
+        scores = self.bm25_scores(query)
+        if self.embeddings is not None:
+            best = max(scores.values(), default=0.0) or 1.0
+            similarities = self.embeddings @ self.encoder.encode([query], normalize_embeddings=True)[0]
+            scores = {
+                chunk_id: (1 - DENSE_WEIGHT) * scores.get(chunk_id, 0.0) / best + DENSE_WEIGHT * float(similarity)
+                for chunk_id, similarity in enumerate(similarities)
+            }
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(score, self.chunks[chunk_id]) for chunk_id, score in ranked if score > 0]
+
+    def retrieve_files(self, query, k=DEFAULT_TOP_K, token_budget=DEFAULT_RETRIEVAL_TOKENS):
+        """Top chunks as {"file (lines a-b)": text} in file order, within token_budget"""
+        selected, used = [], 0
+        for _, chunk in self.search(query, k):
+            tokens = estimate_tokens(chunk["text"])
+            if used + tokens > token_budget:
+                continue
+            selected.append(chunk)
+            used += tokens
+        selected.sort(key=lambda chunk: (chunk["file"], chunk["start"]))
+        return {
+            f"{chunk['file']} (module header)" if chunk["kind"] == "module"
+            else f"{chunk['file']} (lines {chunk['start']}-{chunk['end']})": chunk["text"]
+            for chunk in selected
+        }
+
+    def stats(self):
+        return {
+            "chunks": len(self.chunks),
+            "terms": len(self.postings),
+            "dense": self.embeddings is not None,
+        }
@@ -0,0 +1,212 @@
+"""Size-capped streaming reads that keep the head, the tail and sampled middle lines"""
+import random
+from collections import deque
+
+from text_sniff import BINARY_EXTENSIONS, SNIFF_BYTES, decode_text, detect_encoding, looks_binary
+
+DEFAULT_MAX_FILE_BYTES = 512 * 1024
+DEFAULT_MAX_TOTAL_BYTES = 16 * 1024 * 1024
+MIN_FILE_BYTES = 4 * 1024
+CHUNK_BYTES = 64 * 1024
+# Middle lines longer than this are counted but never sampled, which bounds the reservoir's memory
+SAMPLE_LINE_BYTES = 320
+
+HEAD_SHARE = 0.5
+TAIL_SHARE = 0.3
+
+
+def allocate_byte_budgets(sizes, max_file_bytes=DEFAULT_MAX_FILE_BYTES,
+                          max_total_bytes=DEFAULT_MAX_TOTAL_BYTES, min_file_bytes=MIN_FILE_BYTES, archives=None):
+    """Per-file read caps whose sum stays within max_total_bytes
+
+    Files are served in order. A file gets a budget only while the rest of
+    the total still covers it, or at least its min_file_bytes floor; once
+    the total is spent, later files get 0 and are skipped. Uploads flagged
+    in archives expand to an unknown size, so they split what the plain
+    files leave evenly, and their budget caps the text of all members.
+    """
+    archives = archives or [False] * len(sizes)
+    budgets = []
+    remaining = max_total_bytes
+    for size, archive in zip(sizes, archives):
+        if archive:
+            budgets.append(None)
+            continue
+        budget = min(max_file_bytes, remaining)
+        if budget < min(size, min_file_bytes):
+            budget = 0
+        budgets.append(budget)
+        remaining -= min(size, budget)
+    if None in budgets:
+        share = remaining // budgets.count(None)
+        if share < min_file_bytes:
+            share = 0
+        budgets = [share if budget is None else budget for budget in budgets]
+    return budgets
+
+
+def skipped_report(size):
+    """Sampling report for a file left out because the total byte budget was spent"""
+    return {"kept_bytes": 0, "dropped_bytes": size, "dropped_lines": None, "sampled_lines": 0}
+
+
+def read_sampled(fileobj, max_bytes, encoding='utf-8', decode=None, first_chunk=b''):
+    """Stream fileobj and return (text, report) holding at most about max_bytes
+
+    Files within the cap are returned whole and report is None. Larger files
+    keep their first and last lines plus lines sampled uniformly from the
+    middle (reservoir sampling with a fixed seed, so output is
+    deterministic), joined with markers describing what was dropped.
+    first_chunk holds bytes already consumed from fileobj (e.g. a sniffed head).
+    """
+    decode = decode or (lambda data: data.decode(encoding, errors='replace'))
+    data = first_chunk
+    if len(data) <= max_bytes:
+        data += fileobj.read(max_bytes + 1 - len(data))
+    if len(data) <= max_bytes:
+        return decode(data), None
+
+    # UTF-16/32 cannot be split on b"\n"; keep a plain aligned head instead
+    if encoding.startswith(('utf-16', 'utf-32')):
+        kept = data[:max_bytes - max_bytes % 4]
+        dropped = len(data) - len(kept) + _drain(fileobj)
+        report = {"kept_bytes": len(kept), "dropped_bytes": dropped, "dropped_lines": None, "sampled_lines": 0}
+        return decode(kept) + f"\n\n... [{dropped:,} bytes truncated] ...\n", report
+
+    head_budget = int(max_bytes * HEAD_SHARE)
+    tail_budget = int(max_bytes * TAIL_SHARE)
+    middle_budget = max_bytes - head_budget - tail_budget
+    # Longer "lines" (minified files, CR-only line endings) are cut into pieces, so no buffer outgrows the cap
+    line_cap = max(1, min(tail_budget, middle_budget))
+    separator = b'\r' if b'\n' not in data and b'\r' in data else b'\n'
+    utf8 = encoding.lower().replace('_', '-').startswith('utf-8')
+
+    # Cut the head on a line boundary and stream everything after it
+    cut = data.rfind(separator, 0, head_budget) + 1
+    if cut < head_budget // 2:
+        cut = _char_boundary(data, head_budget, utf8)
+    head, carry = data[:cut], data[cut:]
+
+    tail = deque()
+    tail_bytes = 0
+    reservoir = []
+    reservoir_size = max(1, middle_budget // 80)
+    sampler = random.Random(0)
+    middle_lines = 0
+    middle_bytes = 0
+    candidates = 0
+
+    def push(line):
+        nonlocal tail_bytes, middle_lines, middle_bytes, candidates
+        while len(line) > line_cap:
+            cut = _char_boundary(line, line_cap, utf8)
+            push(line[:cut])
+            line = line[cut:]
+        tail.append(line)
+        tail_bytes += len(line)
+        while tail_bytes > tail_budget and len(tail) > 1:
+            evicted = tail.popleft()
+            tail_bytes -= len(evicted)
+            # Lines leaving the tail window belong to the middle section
+            if len(evicted) <= SAMPLE_LINE_BYTES:
+                if candidates < reservoir_size:
+                    reservoir.append((middle_lines, evicted))
+                else:
+                    slot = sampler.randint(0, candidates)
+                    if slot < reservoir_size:
+                        reservoir[slot] = (middle_lines, evicted)
+                candidates += 1
+            middle_lines += 1
+            middle_bytes += len(evicted)
+
+    while True:
+        lines = carry.split(separator)
+        carry = lines.pop()
+        for line in lines:
+            push(line + separator)
+        # Without a separator in sight, flush all but the last partial piece
+        if len(carry) > line_cap:
+            cut = _char_boundary(carry, len(carry) - len(carry) % line_cap, utf8)
+            push(carry[:cut])
+            carry = carry[cut:]
+        chunk = fileobj.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        carry += chunk
+    if carry:
+        push(carry)
+
+    # Keep sampled lines in file order, within the middle budget
+    sampled, sampled_bytes = [], 0
+    for _, line in sorted(reservoir):
+        if sampled_bytes + len(line) > middle_budget:
+            break
+        sampled.append(line)
+        sampled_bytes += len(line)
+
+    dropped_lines = middle_lines - len(sampled)
+    dropped_bytes = middle_bytes - sampled_bytes
+    report = {
+        "kept_bytes": len(head) + sampled_bytes + tail_bytes,
+        "dropped_bytes": dropped_bytes,
+        "dropped_lines": dropped_lines,
+        "sampled_lines": len(sampled),
+    }
+    text = (
+        decode(head)
+        + f"\n... [{middle_lines:,} middle lines ({middle_bytes:,} bytes) reduced to {len(sampled):,} sampled lines] ...\n"
+        + decode(b''.join(sampled))
+        + f"\n... [end of sample; {dropped_lines:,} lines dropped] ...\n"
+        + decode(b''.join(tail))
+    )
+    return text, report
+
+
+def read_file_sampled(uploaded_file, max_bytes=DEFAULT_MAX_FILE_BYTES):
+    """Read an upload as text, capped at max_bytes; returns (content, sampling report)
+
+    Oversized files keep their head, tail and sampled middle lines. The
+    report describes what was dropped, or is None when nothing was.
+    """
+    if max_bytes <= 0:
+        return f"[Skipped: {uploaded_file.name} - upload byte budget spent]", skipped_report(uploaded_file.size)
+    try:
+        file_extension = uploaded_file.name.split('.')[-1].lower()
+        
+        # Well-known binary formats are rejected without reading anything
+        if '.' in uploaded_file.name and file_extension in BINARY_EXTENSIONS:
+            return f"[Binary file: {uploaded_file.name} - Size: {uploaded_file.size} bytes]", None
+        
+        # Only a small sample is read before deciding
+        head = uploaded_file.read(SNIFF_BYTES)
+        if looks_binary(head):
+            return f"[Binary file: {uploaded_file.name} - Size: {uploaded_file.size} bytes]", None
+        
+        # Stream the rest as text in the detected encoding, within the byte cap
+        encoding = detect_encoding(head)
+        return read_sampled(uploaded_file, max_bytes, encoding,
+                            decode=lambda data: decode_text(data, encoding), first_chunk=head)
+            
+    except Exception as e:
+        return f"[Error reading file {uploaded_file.name}: {str(e)}]", None
+
+
+def _char_boundary(data, cut, utf8):
+    """Move cut back off UTF-8 continuation bytes, so a hard cut does not split a character"""
+    if utf8:
+        start = cut
+        while cut > 0 and start - cut < 3 and cut < len(data) and data[cut] & 0xC0 == 0x80:
+            cut -= 1
+        if cut == 0:
+            return start
+    return cut
+
+
+def _drain(fileobj):
+    """Consume the rest of fileobj in chunks and return how many bytes it had"""
+    total = 0
+    while True:
+        chunk = fileobj.read(CHUNK_BYTES)
+        if not chunk:
+            return total
+        total += len(chunk)
@@ -0,0 +1,184 @@
+"""Process-wide generation scheduler shared by all sessions
+
+Limits how many generations run at once, serves sessions round-robin so
+one user's burst cannot starve the others, and lets identical in-flight
+requests share a single model call. Tickets report their queue position
+and an ETA from a moving average of recent job durations.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+DEFAULT_MAX_CONCURRENT = 2
+DEFAULT_JOB_SECONDS = 20.0
+DURATION_SMOOTHING = 0.3
+
+
+class Ticket:
+    """Handle for a scheduled job; wraps a Future"""
+
+    def __init__(self, session_id, key, func):
+        self.session_id = session_id
+        self.key = key
+        self.func = func
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.shared = False
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+
+class GenerationScheduler:
+    """Bounded worker pool with a fair per-session queue and in-flight deduplication"""
+
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT):
+        self.max_concurrent = max_concurrent
+        self._queues = OrderedDict()
+        self._in_flight = {}
+        self._running = 0
+        self._workers = 0
+        self._average_seconds = DEFAULT_JOB_SECONDS
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_concurrent=int(os.getenv("GENERATION_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT)))
+
+    def submit(self, session_id, key, func):
+        """Queue func() for session_id; a request with the same key already queued or running is shared"""
+        with self._condition:
+            if key is not None and key in self._in_flight:
+                ticket = self._in_flight[key]
+                ticket.shared = True
+                return ticket
+            ticket = Ticket(session_id, key, func)
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            if key is not None:
+                self._in_flight[key] = ticket
+            if self._workers < self.max_concurrent:
+                self._workers += 1
+                threading.Thread(target=self._work, name="generation-worker", daemon=True).start()
+            self._condition.notify()
+            return ticket
+
+    @contextmanager
+    def slot(self, session_id, on_wait=None, poll_seconds=0.5):
+        """Hold one concurrency slot while the caller runs work in its own thread (e.g. a stream)
+
+        on_wait(ticket) is called while the caller is still queued.
+        """
+        started = threading.Event()
+        released = threading.Event()
+
+        def hold():
+            started.set()
+            released.wait()
+
+        ticket = self.submit(session_id, None, hold)
+        try:
+            while not started.wait(poll_seconds):
+                if on_wait is not None:
+                    on_wait(ticket)
+            yield ticket
+        finally:
+            released.set()
+            # Leaving before the slot was granted must not leave the job queued
+            self.cancel(ticket)
+
+    def cancel(self, ticket):
+        """Drop a ticket that has not started yet"""
+        with self._condition:
+            queue = self._queues.get(ticket.session_id)
+            if queue and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._queues[ticket.session_id]
+                if ticket.key is not None:
+                    self._in_flight.pop(ticket.key, None)
+                ticket.future.cancel()
+
+    def _next_ticket(self):
+        """Head of the first session queue in rotation order; that session moves to the back"""
+        session_id, queue = next(iter(self._queues.items()))
+        ticket = queue.popleft()
+        del self._queues[session_id]
+        if queue:
+            self._queues[session_id] = queue
+        return ticket
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queues:
+                    self._condition.wait()
+                ticket = self._next_ticket()
+                self._running += 1
+            ticket.started_at = time.monotonic()
+            try:
+                if ticket.future.set_running_or_notify_cancel():
+                    ticket.future.set_result(ticket.func())
+            except BaseException as e:
+                ticket.future.set_exception(e)
+            finally:
+                duration = time.monotonic() - ticket.started_at
+                with self._condition:
+                    self._running -= 1
+                    if ticket.key is not None and self._in_flight.get(ticket.key) is ticket:
+                        del self._in_flight[ticket.key]
+                    self._average_seconds += DURATION_SMOOTHING * (duration - self._average_seconds)
+
+    def position(self, ticket):
+        """Number of queued jobs that will start before ticket (0 = next); None once it started"""
+        with self._condition:
+            queue = self._queues.get(ticket.session_id)
+            if not queue or ticket not in queue:
+                return None
+            index = queue.index(ticket)
+            ahead = index
+            passed_own_session = False
+            for session_id, other in self._queues.items():
+                if session_id == ticket.session_id:
+                    passed_own_session = True
+                    continue
+                # Round-robin: sessions ahead in rotation get one more turn in the ticket's round
+                ahead += min(len(other), index if passed_own_session else index + 1)
+            return ahead
+
+    def eta_seconds(self, ticket):
+        """Rough seconds until ticket finishes"""
+        if ticket.done():
+            return 0.0
+        if ticket.started_at is not None:
+            return max(0.0, self._average_seconds - (time.monotonic() - ticket.started_at))
+        position = self.position(ticket) or 0
+        return (position // self.max_concurrent + 1) * self._average_seconds
+
+    def stats(self):
+        with self._condition:
+            return {
+                "running": self._running,
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "sessions_waiting": len(self._queues),
+                "average_job_seconds": round(self._average_seconds, 2),
+            }
+
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler, created on first use"""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = GenerationScheduler.from_env()
+        return _shared_scheduler
@@ -0,0 +1,309 @@
+"""Section-parallel README generation and single-section regeneration
+
+The section list is planned locally from the uploaded files, every section
+is written concurrently from only the files relevant to it, and the
+document is assembled in plan order with a table of contents built from
+the actual headings. An existing README can be split back into sections so
+one of them is rewritten from its own context plus an outline of the rest.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from context_packer import (PRIORITY_CONFIG, PRIORITY_DOC, PRIORITY_ENTRY_POINT, PRIORITY_MANIFEST, PRIORITY_SOURCE,
+                            PRIORITY_TEST, file_priority, pack_files)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_SECTION_TOKEN_BUDGET = 60_000
+# Label of the title/introduction block; deliberately unlike a real "## Overview" heading
+OVERVIEW = "Title & introduction"
+TOC_HEADING = "Table of Contents"
+EXAMPLE_PATH = re.compile(r"(^|/)(examples?|demos?|samples?)(/|\.|_)")
+
+# (title, instructions, file priorities that feed the section)
+SECTIONS = (
+    (OVERVIEW, "Start with the project title as a single `# ` heading, optionally followed by status/version/build "
+               "badges found in the files, then summarize the project's purpose, the problem it solves, its intended "
+               "users and its high-level architecture.",
+     {PRIORITY_MANIFEST, PRIORITY_ENTRY_POINT, PRIORITY_DOC}),
+    ("Installation", "Detail prerequisites (languages, frameworks, tools) and give step-by-step setup commands "
+                     "derived from the manifests and environment/config files.",
+     {PRIORITY_MANIFEST, PRIORITY_CONFIG, PRIORITY_ENTRY_POINT}),
+    ("Usage", "Show common usage patterns and code snippets, and explain command-line flags, options or API "
+              "endpoints found in the files.",
+     {PRIORITY_ENTRY_POINT, PRIORITY_SOURCE, PRIORITY_DOC}),
+    ("Configuration", "Describe configuration files (e.g. `.env`, `config.yaml`) and environment variables with "
+                      "their options and defaults.",
+     {PRIORITY_CONFIG, PRIORITY_ENTRY_POINT}),
+    ("Features", "List and briefly explain the main features or modules, drawing on code comments and the "
+                 "directory structure.",
+     {PRIORITY_ENTRY_POINT, PRIORITY_SOURCE, PRIORITY_DOC}),
+    ("Examples", "Provide sample input/output taken from example, demo or sample files.",
+     {PRIORITY_DOC, PRIORITY_ENTRY_POINT, PRIORITY_SOURCE}),
+    ("API Reference", "Document exposed functions, classes or endpoints with their parameters and return values.",
+     {PRIORITY_SOURCE, PRIORITY_ENTRY_POINT}),
+    ("Contributing", "Give contribution guidelines, referencing any CONTRIBUTING file or coding standards.",
+     {PRIORITY_DOC, PRIORITY_CONFIG}),
+    ("Testing", "Explain how to run the tests, with commands and the testing frameworks used.",
+     {PRIORITY_TEST, PRIORITY_CONFIG, PRIORITY_MANIFEST}),
+    ("License", "State the project's license.", {PRIORITY_MANIFEST}),
+    ("Acknowledgements", "Mention authors, notable third-party libraries and inspirations.", {PRIORITY_MANIFEST}),
+    ("Support", "Describe how to reach the maintainers or where to report issues.", {PRIORITY_MANIFEST, PRIORITY_DOC}),
+)
+
+# Retrieval queries used instead of the priority classes when an index is available
+SECTION_QUERIES = {
+    OVERVIEW: "project purpose overview description features architecture main app entry point",
+    "Installation": "install setup requirements dependencies pip npm docker build prerequisites python node version",
+    "Usage": "usage run command line cli argparse arguments options flags main entry point example",
+    "Configuration": "config configuration settings environment variables env getenv default options yaml toml",
+    "Features": "features functions classes modules main functionality",
+    "Examples": "example demo sample input output",
+    "API Reference": "api class def function method parameters returns endpoint route",
+    "Contributing": "contributing contribute guidelines style lint format pull request",
+    "Testing": "test tests pytest unittest assert fixture coverage ci",
+    "License": "license copyright",
+    "Acknowledgements": "author authors credits thanks acknowledgements dependencies",
+    "Support": "support contact issues bug report email maintainer",
+}
+
+SECTION_PROMPT = """You are writing ONE section of a README.md for a software project. Other sections are being written separately: {others}. Do not repeat their content.
+
+Write only the "{title}" section. {instructions}
+
+Formatting rules:
+- Output ONLY Markdown, not wrapped in a code block.
+- {heading_rule}
+- Use ### for subsections and fenced code blocks with a language for code.
+- Do not add a table of contents. Do not invent details that are not supported by the files.
+
+**User Project Description:**
+{raw_prompt}{facts_section}{files_section}
+"""
+
+
+def _has(file_contents, *priorities):
+    return any(file_priority(name) in priorities for name in file_contents)
+
+
+def plan_sections(file_contents, facts_block=""):
+    """Deterministic section list for this project, in document order"""
+    skip = set()
+    if not _has(file_contents, PRIORITY_CONFIG) and "env" not in facts_block.lower():
+        skip.add("Configuration")
+    if not any(EXAMPLE_PATH.search(name.lower()) for name in file_contents):
+        skip.add("Examples")
+    if not _has(file_contents, PRIORITY_SOURCE):
+        skip.add("API Reference")
+    if not _has(file_contents, PRIORITY_TEST) and "Test command" not in facts_block:
+        skip.add("Testing")
+    return [title for title, _, _ in SECTIONS if title not in skip]
+
+
+def section_files(title, file_contents, token_budget=DEFAULT_SECTION_TOKEN_BUDGET):
+    """Files relevant to one section, packed into token_budget"""
+    priorities = next(priorities for name, _, priorities in SECTIONS if name == title)
+    relevant = {name: content for name, content in file_contents.items() if file_priority(name) in priorities}
+    if title == "Examples":
+        relevant.update({name: content for name, content in file_contents.items()
+                         if EXAMPLE_PATH.search(name.lower())})
+    return pack_files(relevant, token_budget)["files"]
+
+
+def build_section_prompt(title, plan, raw_prompt, file_contents, facts_block=""):
+    """Focused prompt for one section"""
+    instructions = next(text for name, text, _ in SECTIONS if name == title)
+    if title == OVERVIEW:
+        heading_rule = "Start with the project title as a `# ` heading; do not add any `## ` headings."
+    else:
+        heading_rule = f"Start with the heading `## {title}`; use no other `#` or `##` headings."
+    facts_section, files_section = _context_sections(facts_block, file_contents, "Relevant Project Files")
+    return SECTION_PROMPT.format(
+        others=", ".join(name for name in plan if name != title) or "none",
+        title=title, instructions=instructions, heading_rule=heading_rule,
+        raw_prompt=raw_prompt, facts_section=facts_section, files_section=files_section,
+    )
+
+
+REGENERATE_PROMPT = """You are revising ONE section of an existing README.md. The rest of the README stays as it is; its outline is:
+{outline}
+
+Rewrite the section below. {instructions}
+
+Formatting rules:
+- Output ONLY the rewritten section in Markdown, not wrapped in a code block.
+- {heading_rule}
+- Keep the heading text unless asked to change it, and do not repeat content that belongs to other sections.
+- Do not invent details that are not supported by the files.
+
+**Current section:**
+{current}
+
+**User Project Description:**
+{raw_prompt}{facts_section}{files_section}
+"""
+FALLBACK_PRIORITIES = {PRIORITY_MANIFEST, PRIORITY_ENTRY_POINT, PRIORITY_SOURCE}
+
+
+def _context_sections(facts_block, file_contents, files_label):
+    facts_section = f"\n\n**Project Facts (parsed from manifests, authoritative):**\n{facts_block}" if facts_block else ""
+    files_section = ""
+    if file_contents:
+        files_section = f"\n\n**{files_label}:**\n" + "".join(
+            f"\n--- {filename} ---\n{content}\n" for filename, content in file_contents.items())
+    return facts_section, files_section
+
+
+def normalize_section(title, text):
+    """Strip code-fence wrappers and make sure the section starts with its own heading"""
+    text = text.strip()
+    fence = re.match(r"^```(?:markdown|md)?\s*\n(.*)\n```$", text, re.DOTALL)
+    if fence:
+        text = fence.group(1).strip()
+    if title == OVERVIEW:
+        return text
+    # Demote stray top-level headings (not shell comments in code blocks) so the document keeps a single # title
+    lines, in_code = [], False
+    for line in text.splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            in_code = not in_code
+        lines.append(f"#{line}" if not in_code and line.startswith("# ") else line)
+    text = "\n".join(lines)
+    if not text.startswith("## "):
+        text = f"## {title}\n\n{text}"
+    return text
+
+
+def heading_anchor(heading):
+    """GitHub-style anchor for a heading"""
+    anchor = re.sub(r"[^\w\- ]", "", heading.strip().lower())
+    return anchor.replace(" ", "-")
+
+
+def build_toc(section_texts):
+    """Table of contents linking the ## heading of each section"""
+    toc = [f"## {TOC_HEADING}", ""]
+    for text in section_texts:
+        heading = text.splitlines()[0][3:].strip()
+        toc.append(f"- [{heading}](#{heading_anchor(heading)})")
+    return "\n".join(toc)
+
+
+def assemble_sections(sections):
+    """Join [(title, markdown)] in order with a table of contents after the overview"""
+    overview = next((text for title, text in sections if title == OVERVIEW), "")
+    body = [text for title, text in sections if title != OVERVIEW]
+    parts = ([overview] if overview else []) + [build_toc(body)] + body
+    return "\n\n".join(parts) + "\n"
+
+
+def section_context(title, file_contents, token_budget=DEFAULT_SECTION_TOKEN_BUDGET, index=None, query=""):
+    """Files for one section: top retrieved chunks when index (a retrieval.RetrievalIndex) is given"""
+    if index is not None:
+        return index.retrieve_files(f"{SECTION_QUERIES.get(title, title)} {query}")
+    return section_files(title, file_contents, token_budget)
+
+
+def generate_sections(model, raw_prompt, file_contents, facts_block="", max_workers=DEFAULT_MAX_WORKERS,
+                      section_token_budget=DEFAULT_SECTION_TOKEN_BUDGET, on_section_done=None, index=None):
+    """Write every planned section concurrently and assemble the README
+
+    Returns (readme, sections) where sections is [(title, markdown)] in plan
+    order. on_section_done(done, total) is called as sections finish.
+    """
+    plan = plan_sections(file_contents, facts_block)
+    prompts = [
+        build_section_prompt(title, plan, raw_prompt,
+                             section_context(title, file_contents, section_token_budget, index),
+                             facts_block)
+        for title in plan
+    ]
+    texts = [None] * len(plan)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(model.generate_content, prompt): position for position, prompt in enumerate(prompts)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            position = futures[future]
+            texts[position] = normalize_section(plan[position], future.result().text)
+            if on_section_done is not None:
+                on_section_done(done, len(plan))
+    sections = list(zip(plan, texts))
+    return assemble_sections(sections), sections
+
+
+def split_sections(markdown):
+    """Split a README into [(heading, markdown)] at ## headings outside code blocks
+
+    The text before the first ## heading (title and description) is the
+    OVERVIEW section. Joining the parts with blank lines rebuilds the README.
+    """
+    sections, current, heading, in_code = [], [], OVERVIEW, False
+    for line in markdown.strip().splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            in_code = not in_code
+        if not in_code and line.startswith("## "):
+            if current:
+                sections.append((heading, "\n".join(current).strip()))
+            heading, current = line[3:].strip(), []
+        current.append(line)
+    if current:
+        sections.append((heading, "\n".join(current).strip()))
+    return sections
+
+
+def outline_sections(sections, current_index):
+    """One line per section: heading and its first sentence, marking the one being rewritten"""
+    lines = []
+    for index, (heading, text) in enumerate(sections):
+        body = " ".join(line for line in text.splitlines()[1:] if line.strip() and not line.startswith("#"))
+        summary = re.split(r"(?<=[.!?])\s", body, maxsplit=1)[0][:160]
+        marker = "  <-- the section you are rewriting" if index == current_index else ""
+        lines.append(f"- {heading}: {summary}{marker}")
+    return "\n".join(lines)
+
+
+def matching_section_title(heading):
+    """Planned section title a free-form heading corresponds to, or None"""
+    # Compare word stems so "Install" matches "Installation" and "Tests" matches "Testing"
+    stems = {word[:4] for word in re.findall(r"\w+", heading.lower())}
+    for title, _, _ in SECTIONS:
+        if {word[:4] for word in re.findall(r"\w+", title.lower())} <= stems:
+            return title
+    return None
+
+
+def regenerate_section(model, markdown, index, raw_prompt, file_contents, facts_block="", instructions="",
+                       section_token_budget=DEFAULT_SECTION_TOKEN_BUDGET, retrieval_index=None):
+    """Rewrite sections[index] of markdown from its own context; returns the spliced README"""
+    sections = split_sections(markdown)
+    heading, current = sections[index]
+    title = heading if heading == OVERVIEW else matching_section_title(heading)
+    if retrieval_index is not None:
+        files = retrieval_index.retrieve_files(f"{SECTION_QUERIES.get(title, heading)} {instructions} {current[:1000]}")
+    elif title is not None:
+        files = section_files(title, file_contents, section_token_budget)
+    else:
+        files = pack_files({name: content for name, content in file_contents.items()
+                            if file_priority(name) in FALLBACK_PRIORITIES}, section_token_budget)["files"]
+
+    if heading == OVERVIEW:
+        heading_rule = "Start with the project title as a `# ` heading; do not add any `## ` headings."
+    else:
+        heading_rule = f"Start with the heading `## {heading}`; use no other `#` or `##` headings."
+    facts_section, files_section = _context_sections(facts_block, files, "Relevant Project Files")
+    prompt = REGENERATE_PROMPT.format(
+        outline=outline_sections(sections, index),
+        instructions=instructions.strip() or "Make it more accurate, complete and useful.",
+        heading_rule=heading_rule, current=current,
+        raw_prompt=raw_prompt, facts_section=facts_section, files_section=files_section,
+    )
+    sections[index] = (heading, normalize_section(heading, model.generate_content(prompt).text))
+    return join_sections(sections)
+
+
+def join_sections(sections):
+    """Rebuild a README from [(heading, markdown)], refreshing an existing table of contents"""
+    sections = list(sections)
+    toc_index = next((i for i, (name, _) in enumerate(sections) if name == TOC_HEADING), None)
+    if toc_index is not None:
+        sections[toc_index] = (TOC_HEADING, build_toc(
+            [text for name, text in sections if name not in (OVERVIEW, TOC_HEADING)]))
+    return "\n\n".join(text for _, text in sections) + "\n"
@@ -0,0 +1,231 @@
+"""Shrink source files to the parts a README needs
+
+Python files are reduced with ast to docstrings, signatures, argparse/click
+definitions and the __main__ block. JS/TS and shell scripts are reduced
+heuristically. Anything that cannot be reduced is returned unchanged.
+"""
+import ast
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from context_packer import estimate_tokens
+
+MAX_CACHED_SKELETONS = 4096
+
+ARGPARSE_CALLS = {'ArgumentParser', 'add_argument', 'add_parser', 'add_subparsers', 'add_argument_group',
+                  'add_mutually_exclusive_group', 'set_defaults'}
+JS_EXTENSIONS = {'js', 'jsx', 'mjs', 'cjs', 'ts', 'tsx'}
+SHELL_EXTENSIONS = {'sh', 'bash', 'zsh'}
+
+JS_KEEP = re.compile(
+    r"^\s*(?:import\s|export\s|module\.exports|exports\.|(?:async\s+)?function[\s*]|class\s|"
+    r"(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?(?:\([^)]*\)|\w+)\s*=>|"
+    r"(?:(?:public|private|protected|static|async|get|set)\s+)*\w+\s*\([^)]*\)\s*(?::[^{]*)?\{\s*$|"
+    r"interface\s|type\s+\w+\s*=|enum\s)"
+)
+JS_CLI_OR_ROUTE = re.compile(
+    r"\.(?:option|requiredOption|command|argument|usage|version|describe|positional)\s*\(|"
+    r"\b(?:app|router|server)\.(?:get|post|put|patch|delete|use|listen|route)\s*\("
+)
+JS_CONTROL = re.compile(r"^\s*(?:if|for|while|switch|catch|return)\b")
+SHELL_KEEP = re.compile(
+    r"^\s*(?:#|(?:function\s+)?[\w-]+\s*\(\)\s*\{?|function\s+[\w-]+|getopts|while\s+getopts|"
+    r"-{1,2}[\w-]+(?:\|-{1,2}[\w-]+)*\)|export\s+\w+=|usage\b|set\s+-)"
+)
+# The line breaks ast counts (not form feeds or other separators str.splitlines() knows)
+LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$")
+
+_skeletons = OrderedDict()
+_lock = threading.Lock()
+
+
+class SourceLines:
+    """Source split into lines once, for slicing out node segments like ast.get_source_segment"""
+
+    def __init__(self, source):
+        self.lines = LINE.findall(source)
+
+    def _column(self, line, offset):
+        # ast column offsets count UTF-8 bytes
+        return offset if line.isascii() else len(line.encode('utf-8')[:offset].decode('utf-8', 'replace'))
+
+    def segment(self, node):
+        if getattr(node, 'end_lineno', None) is None or node.lineno > len(self.lines):
+            return None
+        first, last = node.lineno - 1, node.end_lineno - 1
+        start = self._column(self.lines[first], node.col_offset)
+        end = self._column(self.lines[last], node.end_col_offset)
+        if first == last:
+            return self.lines[first][start:end]
+        return self.lines[first][start:] + ''.join(self.lines[first + 1:last]) + self.lines[last][:end]
+
+
+def _signature(node):
+    """Render a def line such as 'async def f(a, b=1) -> int:'"""
+    prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ''
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}:"
+
+
+def _docstring_lines(node, indent):
+    docstring = ast.get_docstring(node, clean=True)
+    if not docstring:
+        return []
+    lines = docstring.splitlines()
+    if len(lines) == 1:
+        return [f'{indent}"""{lines[0]}"""']
+    return [f'{indent}"""{lines[0]}'] + [f"{indent}{line}" if line else '' for line in lines[1:]] + [f'{indent}"""']
+
+
+def _cli_calls(source, node, indent):
+    """Statements inside a function body that build an argparse parser, as source lines"""
+    lines = []
+    for child in ast.walk(node):
+        if isinstance(child, (ast.Assign, ast.Expr)) and isinstance(child.value, ast.Call):
+            func = child.value.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, 'id', None)
+            if name in ARGPARSE_CALLS:
+                segment = source.segment(child)
+                if segment:
+                    lines.append(f"{indent}{' '.join(segment.split())}")
+    return lines
+
+
+def _function_lines(source, node, indent):
+    lines = [f"{indent}@{ast.unparse(decorator)}" for decorator in node.decorator_list]
+    lines.append(f"{indent}{_signature(node)}")
+    lines += _docstring_lines(node, indent + '    ')
+    lines += _cli_calls(source, node, indent + '    ')
+    lines.append(f"{indent}    ...")
+    return lines
+
+
+def _is_main_guard(node):
+    return (isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+            and isinstance(node.test.left, ast.Name) and node.test.left.id == '__name__')
+
+
+def python_skeleton(source):
+    """Module docstring, imports, constants, class/function signatures and the __main__ block"""
+    tree = ast.parse(source)
+    lines = _docstring_lines(tree, '')
+    source = SourceLines(source)
+
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(source.segment(node))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            # Keep module constants such as DEFAULT_PORT = 8080, but not huge literals
+            if all(isinstance(t, ast.Name) and t.id.isupper() for t in targets):
+                segment = source.segment(node)
+                if segment and len(segment) <= 200:
+                    lines.append(segment)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            lines.append('')
+            lines += _function_lines(source, node, '')
+        elif isinstance(node, ast.ClassDef):
+            lines.append('')
+            lines += [f"@{ast.unparse(decorator)}" for decorator in node.decorator_list]
+            bases = ', '.join(ast.unparse(base) for base in node.bases + node.keywords)
+            lines.append(f"class {node.name}({bases}):" if bases else f"class {node.name}:")
+            lines += _docstring_lines(node, '    ')
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    lines += _function_lines(source, child, '    ')
+                elif isinstance(child, (ast.Assign, ast.AnnAssign)):
+                    segment = source.segment(child)
+                    if segment and len(segment) <= 200:
+                        lines.append(f"    {segment}")
+        elif _is_main_guard(node):
+            lines.append('')
+            lines.append(source.segment(node))
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+            # Top-level calls such as setup(...) or app.run(...) describe usage
+            segment = source.segment(node)
+            if segment and len(segment) <= 2000:
+                lines.append(segment)
+
+    return '\n'.join(line for line in lines if line is not None) + '\n'
+
+
+def js_skeleton(source):
+    """Imports/exports, declarations, CLI option definitions, routes and JSDoc blocks"""
+    kept = []
+    in_doc = False
+    for line in source.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('/**'):
+            in_doc = True
+        if in_doc:
+            kept.append(line)
+            if '*/' in stripped:
+                in_doc = False
+            continue
+        if (JS_KEEP.match(line) and not JS_CONTROL.match(line)) or JS_CLI_OR_ROUTE.search(line):
+            kept.append(line.rstrip())
+    return '\n'.join(kept) + '\n'
+
+
+def shell_skeleton(source):
+    """Shebang, comments, function headers, option parsing and exported variables"""
+    return '\n'.join(line.rstrip() for line in source.splitlines() if SHELL_KEEP.match(line)) + '\n'
+
+
+def skeletonize(filename, content):
+    """Skeleton of a source file, or content itself when it cannot be reduced
+
+    Results are cached by content hash. Only skeletons are kept, never the
+    full text, so the cache stays small across sessions.
+    """
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    digest = hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    key = (digest, extension)
+    with _lock:
+        if key in _skeletons:
+            _skeletons.move_to_end(key)
+            skeleton = _skeletons[key]
+            return content if skeleton is None else skeleton
+    skeleton = _reduce(extension, content)
+    with _lock:
+        _skeletons[key] = None if skeleton is content else skeleton
+        while len(_skeletons) > MAX_CACHED_SKELETONS:
+            _skeletons.popitem(last=False)
+    return skeleton
+
+
+def _reduce(extension, content):
+    try:
+        if extension == 'py':
+            skeleton = python_skeleton(content)
+        elif extension in JS_EXTENSIONS:
+            skeleton = js_skeleton(content)
+        elif extension in SHELL_EXTENSIONS or content.startswith(('#!/bin/sh', '#!/bin/bash', '#!/usr/bin/env bash')):
+            skeleton = shell_skeleton(content)
+        else:
+            return content
+    except (SyntaxError, ValueError, RecursionError):
+        return content
+
+    if not skeleton.strip():
+        return content
+    skeleton = f"# [skeleton: signatures, docstrings and CLI definitions only]\n{skeleton}"
+    # The header counts too: a file barely longer than its skeleton is sent as is
+    return skeleton if len(skeleton) < len(content) else content
+
+
+def skeletonize_files(file_contents):
+    """Apply skeletonize to every file; returns (contents, per-file token stats)"""
+    reduced = {}
+    stats = []
+    for filename, content in file_contents.items():
+        reduced[filename] = skeletonize(filename, content)
+        if reduced[filename] is not content:
+            stats.append({
+                "file": filename,
+                "tokens": estimate_tokens(content),
+                "skeleton_tokens": estimate_tokens(reduced[filename]),
+            })
+    return reduced, stats
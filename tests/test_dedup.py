@@ -0,0 +1,52 @@
+import pickle
+import random
+import time
+
+from dedup import deduplicate_files, estimate_similarity, file_signatures, minhash_signature
+
+
+def _document(seed, words=800):
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randrange(3000)}" for _ in range(words))
+
+
+def test_near_duplicates_collapse_and_distinct_files_stay():
+    original = _document(0)
+    edited = original.split()
+    for position in range(0, 700, 70):
+        edited[position] = "changed"
+    files = {"a.py": original, "vendor/a.py": " ".join(edited), "b.py": _document(1)}
+    reduced, report = deduplicate_files(files)
+    assert report["duplicates"] == [{"file": "a.py", "duplicates": ["vendor/a.py"]}]
+    assert set(reduced) == {"a.py", "b.py"}
+
+
+def test_similarity_estimate_tracks_overlap():
+    assert estimate_similarity(minhash_signature(_document(0)), minhash_signature(_document(1))) < 0.2
+    assert minhash_signature("too short to compare") is None
+
+
+def test_precomputed_signatures_are_reused():
+    files = {f"f{i}.py": _document(i) for i in range(4)}
+    files["copy/f0.py"] = files["f0.py"] + " tail"
+    signatures = pickle.loads(pickle.dumps(file_signatures(files)))
+    assert deduplicate_files(files, signatures=signatures) == deduplicate_files(files)
+    # Signatures that were handed in are used as-is
+    signatures["f1.py"] = signatures["f2.py"]
+    duplicates = deduplicate_files(files, signatures=signatures)[1]["duplicates"]
+    assert {"file": "f1.py", "duplicates": ["f2.py"]} in duplicates
+
+
+def _best_time(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def test_signing_is_linear():
+    # Signing hashes each shingle once, so 4x the words should take about 4x as long
+    small, large = _document(2, words=20_000), _document(2, words=80_000)
+    assert _best_time(lambda: minhash_signature(large)) < _best_time(lambda: minhash_signature(small)) * 8
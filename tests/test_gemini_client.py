@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+exceptions = pytest.importorskip("google.api_core.exceptions")
+
+import gemini_client
+from gemini_client import GeminiClient, TokenBucket
+
+
+class FakeModel:
+    """Raises the queued errors in turn, then answers"""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(text=f"answer to {prompt}")
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(gemini_client.time, "sleep", slept.append)
+    monkeypatch.setattr(gemini_client.random, "uniform", lambda low, high: high)
+    return slept
+
+
+def make_client(model, max_retries=3):
+    return GeminiClient(model=model, requests_per_minute=1_000, tokens_per_minute=1_000_000,
+                        max_retries=max_retries, base_delay=1.0, max_delay=3.0)
+
+
+def test_quota_errors_are_retried_with_capped_backoff(sleeps):
+    model = FakeModel([exceptions.ResourceExhausted("quota")] * 3)
+    client = make_client(model)
+    assert client.generate_content("hi").text == "answer to hi"
+    assert model.calls == 4
+    assert client.stats()["retries"] == 3 and client.stats()["failures"] == 0
+    assert [delay for delay in sleeps if delay] == [1.0, 2.0, 3.0]
+
+
+def test_retries_give_up_after_max_retries(sleeps):
+    model = FakeModel([exceptions.ResourceExhausted("quota")] * 10)
+    client = make_client(model, max_retries=2)
+    with pytest.raises(exceptions.ResourceExhausted):
+        client.generate_content("hi")
+    assert model.calls == 3
+    assert client.stats() == {"calls": 3, "retries": 2, "failures": 1, "throttled_seconds": 0.0}
+
+
+def test_non_retryable_errors_are_raised_immediately(sleeps):
+    model = FakeModel([exceptions.InvalidArgument("bad prompt")])
+    client = make_client(model)
+    with pytest.raises(exceptions.InvalidArgument):
+        client.generate_content("hi")
+    assert model.calls == 1
+    assert client.stats()["retries"] == 0 and client.stats()["failures"] == 1
+    assert not any(sleeps)
+
+
+def test_token_bucket_delays_requests_beyond_the_rate(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(gemini_client.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(2) == pytest.approx(3.0)
+    now[0] += 3.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    # Oversized requests wait for a full refill, not forever
+    now[0] += 120.0
+    assert bucket.reserve(1_000) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
@@ -0,0 +1,69 @@
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from context_packer import estimate_tokens
+from map_reduce import build_reduce_prompt, chunk_files, map_files, map_reduce_readme
+
+
+class FakeModel:
+    """Summarizes a prompt as the file names it contains; earlier files answer last"""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self.lock:
+            self.prompts.append(prompt)
+        names = re.findall(r"^--- (.+) ---$", prompt, re.MULTILINE)
+        time.sleep(max((self.delays.get(name, 0) for name in names), default=0))
+        return SimpleNamespace(text="summary of " + ", ".join(names))
+
+
+def test_chunk_files_groups_by_directory_and_splits_large_files():
+    files = {
+        "src/a.py": "a = 1\n" * 10,
+        "src/b.py": "b = 2\n" * 10,
+        "docs/guide.md": "# Guide\n" * 10,
+        "data/big.csv": "x,y\n" * 1_000,
+    }
+    chunks = chunk_files(files, max_chunk_tokens=200)
+    grouped = {label: set(contents) for label, contents in chunks}
+    assert {"src/a.py", "src/b.py"} in grouped.values()
+    assert {"docs/guide.md"} in grouped.values()
+    parts = [contents for label, contents in chunks if label.startswith("data/big.csv (part ")]
+    assert len(parts) > 1
+    assert "".join(part["data/big.csv"] for part in parts) == files["data/big.csv"]
+    assert all(estimate_tokens("".join(contents.values())) <= 200 for _, contents in chunks)
+
+
+def test_map_files_keeps_chunk_order_whatever_finishes_first():
+    chunks = [(f"chunk {index}", {f"file{index}.py": "pass\n"}) for index in range(4)]
+    model = FakeModel(delays={"file0.py": 0.2, "file1.py": 0.1})
+    finished = []
+    summaries = map_files(model, chunks, max_workers=4, on_chunk_done=lambda done, total: finished.append((done, total)))
+    assert list(summaries) == ["chunk 0", "chunk 1", "chunk 2", "chunk 3"]
+    assert summaries["chunk 0"] == "summary of file0.py"
+    assert finished == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+def test_reduce_prompt_contains_every_summary_and_the_facts():
+    summaries = {"src/ (1)": "summary one", "docs/ (2)": "summary two"}
+    prompt = build_reduce_prompt("SYSTEM", "A tool", summaries, facts_block="| License | MIT |")
+    assert "summary one" in prompt and "summary two" in prompt
+    assert "| License | MIT |" in prompt
+    assert prompt.startswith("SYSTEM")
+
+
+def test_map_reduce_readme_runs_against_a_fake_model():
+    model = FakeModel()
+    files = {"src/app.py": "print('hi')\n", "README.txt": "notes\n"}
+    readme = map_reduce_readme(model, "SYSTEM", "A tool", files, max_workers=2, facts_block="FACTS")
+    # The fake "summarizes" the reduce prompt as the chunk labels it received
+    assert readme == "summary of ./ (1), src/ (2)"
+    reduce_prompt = model.prompts[-1]
+    assert "summary of src/app.py" in reduce_prompt and "summary of README.txt" in reduce_prompt
+    assert "FACTS" in reduce_prompt
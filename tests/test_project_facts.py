@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from project_facts import detect_license, extract_project_facts
+
+COMMON_LICENSES = "/usr/share/common-licenses"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_license(name):
+    path = os.path.join(COMMON_LICENSES, name)
+    if not os.path.exists(path):
+        pytest.skip(f"{path} is not available")
+    with open(path, encoding="utf-8") as handle:
+        return handle.read()
+
+
+@pytest.mark.parametrize("name, spdx", [
+    ("Apache-2.0", "Apache-2.0"),
+    ("BSD", "BSD-3-Clause"),
+    ("GPL-2", "GPL-2.0"),
+    ("GPL-3", "GPL-3.0"),
+    ("LGPL-2.1", "LGPL-2.1"),
+    ("LGPL-3", "LGPL-3.0"),
+    ("MPL-2.0", "MPL-2.0"),
+    ("CC0-1.0", "CC0-1.0"),
+])
+def test_detects_real_license_texts(name, spdx):
+    assert detect_license(read_license(name)) == spdx
+
+
+def test_unknown_license_is_not_consumed():
+    text = read_license("GFDL-1.3")
+    assert detect_license(text) is None
+    facts, consumed = extract_project_facts({"LICENSE": text})
+    assert "license" not in facts
+    assert consumed == []
+
+
+def test_detects_repository_license():
+    with open(os.path.join(ROOT, "LICENSE"), encoding="utf-8") as handle:
+        assert detect_license(handle.read()) == "MIT"
+
+
+def test_spdx_header_wins():
+    assert detect_license("SPDX-License-Identifier: AGPL-3.0-only\n\nGNU GENERAL PUBLIC LICENSE\nVersion 3\n") == "AGPL-3.0-only"
+
+
+def test_affero_title():
+    text = "                    GNU AFFERO GENERAL PUBLIC LICENSE\n                       Version 3, 19 November 2007\n"
+    assert detect_license(text) == "AGPL-3.0"
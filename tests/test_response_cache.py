@@ -0,0 +1,56 @@
+import itertools
+
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.time() that advances one second per call, so access order is never a tie"""
+    ticks = itertools.count(1_000_000)
+    monkeypatch.setattr(response_cache.time, "time", lambda: float(next(ticks)))
+
+
+def test_cache_key_covers_every_input():
+    key = make_cache_key("model", "system", "prompt", {"a.py": "x", "b.py": "y"})
+    assert key == make_cache_key("model", "system", "prompt", {"b.py": "y", "a.py": "x"})
+    assert key != make_cache_key("model", "system", "prompt", {"a.py": "x", "b.py": "z"})
+    assert key != make_cache_key("other", "system", "prompt", {"a.py": "x", "b.py": "y"})
+    # Length prefixes keep field boundaries apart
+    assert make_cache_key("m", "ab", "c", {}) != make_cache_key("m", "a", "bc", {})
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    cache.set("a", "first")
+    cache.set("b", "second")
+    assert cache.get("a") == "first"
+    cache.set("c", "third")
+    assert cache.get("b") is None
+    assert cache.get("a") == "first" and cache.get("c") == "third"
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2, "bytes": len("first") + len("third")}
+
+
+def test_size_limit_evicts_oldest_entries(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 6
+
+
+def test_zero_ttl_expires_entries(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), ttl_seconds=0)
+    cache.set("a", "readme")
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_dir_expands_user_and_variables(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("CACHE_NAME", "readmes")
+    monkeypatch.setenv("README_CACHE_DIR", "~/$CACHE_NAME")
+    cache = ResponseCache.from_env()
+    assert cache.path == str(tmp_path / "readmes" / "responses.sqlite3")
@@ -0,0 +1,93 @@
+import io
+import zipfile
+
+from archive_ingest import read_archive
+from content_store import decompress_text
+from parallel_ingest import decode_upload
+from sampled_read import allocate_byte_budgets, read_file_sampled, read_sampled
+
+CAP = 512 * 1024
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def assert_bounded(text, report, size):
+    assert len(text.encode("utf-8")) <= CAP * 1.05
+    assert report["kept_bytes"] <= CAP
+    assert report["kept_bytes"] + report["dropped_bytes"] == size
+
+
+def test_single_line_file_is_capped():
+    data = b'{"blob": "' + b"x" * 6_000_000 + b'"}'
+    text, report = read_file_sampled(Upload("data.json", data), CAP)
+    assert_bounded(text, report, len(data))
+    assert text.startswith('{"blob": "xxx')
+    assert text.rstrip().endswith('xxx"}')
+
+
+def test_carriage_return_lines_are_capped_and_sampled():
+    data = b"a,b,c\r" * 1_000_000
+    text, report = read_file_sampled(Upload("data.csv", data), CAP)
+    assert_bounded(text, report, len(data))
+    assert report["sampled_lines"] > 0
+
+
+def test_hard_cuts_do_not_split_utf8_characters():
+    data = "é".encode("utf-8") * 3_000_000
+    text, report = read_sampled(io.BytesIO(data), CAP)
+    assert_bounded(text, report, len(data))
+    assert "�" not in text
+
+
+def test_small_file_is_returned_whole():
+    text, report = read_file_sampled(Upload("small.py", b"print('hi')\n"), CAP)
+    assert text == "print('hi')\n"
+    assert report is None
+
+
+def test_budgets_stay_within_total_for_many_files():
+    sizes = [1_000_000] * 40 + [100] * 10_000
+    budgets = allocate_byte_budgets(sizes, max_file_bytes=CAP, max_total_bytes=16 * 1024 * 1024)
+    assert sum(min(size, budget) for size, budget in zip(sizes, budgets)) <= 16 * 1024 * 1024
+    assert budgets[-1] == 0
+
+
+def test_skipped_upload_reports_dropped_bytes():
+    text, report = read_file_sampled(Upload("late.py", b"x = 1\n" * 100), 0)
+    assert text.startswith("[Skipped:")
+    assert report["dropped_bytes"] == 600
+
+
+def test_archive_total_is_bounded():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for index in range(2_000):
+            archive.writestr(f"repo/file_{index:04}.txt", "some text\n" * 500)
+    buffer.seek(0)
+    contents, report = read_archive(buffer, "repo.zip", max_total_bytes=1_000_000)
+    assert sum(len(content) for content in contents.values()) <= 1_000_000
+    assert report["skipped"] > 0
+
+
+def test_total_is_bounded_across_archive_uploads():
+    uploads = []
+    for number in range(3):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for index in range(1_000):
+                archive.writestr(f"repo{number}/file_{index:04}.txt", f"text {number}\n" * 2_000)
+        uploads.append((f"repo{number}.zip", buffer.getvalue()))
+    uploads.append(("notes.md", b"# notes\n" * 1_000))
+    budgets = allocate_byte_budgets([len(data) for _, data in uploads], max_total_bytes=1_000_000,
+                                    archives=[name.endswith(".zip") for name, _ in uploads])
+    kept = 0
+    for (name, data), budget in zip(uploads, budgets):
+        entry = decode_upload((name, data, budget))
+        kept += sum(len(decompress_text(codec, payload)) for codec, payload, _ in entry["blobs"].values())
+    assert kept <= 1_000_000
+    assert allocate_byte_budgets([100_000, 100_000], max_total_bytes=100_000, archives=[False, True])[1] == 0
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from scheduler import GenerationScheduler
+
+
+def blocked_scheduler():
+    """Single-slot scheduler whose only worker is held until the returned event is set"""
+    scheduler = GenerationScheduler(max_concurrent=1)
+    gate, running = threading.Event(), threading.Event()
+
+    def hold():
+        running.set()
+        gate.wait(5)
+
+    scheduler.submit("gate", None, hold)
+    assert running.wait(5)
+    return scheduler, gate
+
+
+def test_sessions_are_served_round_robin():
+    scheduler, gate = blocked_scheduler()
+    order = []
+    tickets = {}
+    for session_id, name in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"), ("c", "c1")]:
+        tickets[name] = scheduler.submit(session_id, name, lambda name=name: order.append(name) or name)
+    assert {name: scheduler.position(ticket) for name, ticket in tickets.items()} == {
+        "a1": 0, "b1": 1, "c1": 2, "a2": 3, "a3": 4}
+    gate.set()
+    assert tickets["a3"].result(5) == "a3"
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+    assert scheduler.position(tickets["a1"]) is None
+
+
+def test_identical_requests_share_one_call():
+    scheduler, gate = blocked_scheduler()
+    calls = []
+    first = scheduler.submit("a", "same-key", lambda: calls.append(1) or "readme")
+    second = scheduler.submit("b", "same-key", lambda: calls.append(2) or "other")
+    assert second is first and first.shared
+    gate.set()
+    assert second.result(5) == "readme"
+    assert calls == [1]
+    # Once finished, the key runs again
+    assert scheduler.submit("a", "same-key", lambda: "again").result(5) == "again"
+
+
+def test_exceptions_reach_the_ticket():
+    scheduler = GenerationScheduler(max_concurrent=1)
+
+    def fail():
+        raise ValueError("quota")
+
+    with pytest.raises(ValueError, match="quota"):
+        scheduler.submit("a", None, fail).result(5)
+    assert scheduler.submit("a", None, lambda: "still working").result(5) == "still working"
+
+
+def test_slot_holds_capacity_and_cancel_drops_queued_jobs():
+    scheduler = GenerationScheduler(max_concurrent=1)
+    with scheduler.slot("a"):
+        waiting = scheduler.submit("b", "queued", lambda: "ran")
+        dropped = scheduler.submit("c", "dropped", lambda: "never")
+        assert scheduler.position(waiting) == 0
+        scheduler.cancel(dropped)
+        assert dropped.future.cancelled()
+        assert not waiting.done()
+    assert waiting.result(5) == "ran"
+    assert scheduler.stats()["queued"] == 0
+
+
+def test_slot_reports_while_queued():
+    scheduler, gate = blocked_scheduler()
+    waits = []
+
+    def on_wait(ticket):
+        waits.append(scheduler.position(ticket))
+        gate.set()
+
+    with scheduler.slot("a", on_wait=on_wait, poll_seconds=0.01) as ticket:
+        assert ticket.started_at is not None
+    assert waits[0] == 0
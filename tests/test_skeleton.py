@@ -0,0 +1,42 @@
+import ast
+import time
+
+from skeleton import JS_KEEP, SourceLines, python_skeleton, skeletonize
+
+
+def test_source_lines_match_ast_segments():
+    source = "x = 'é' + f(\n  1,\r\n 2)\ny = 1\n\x0cz = 2\n"
+    tree = ast.parse(source)
+    lines = SourceLines(source)
+    for node in ast.walk(tree):
+        if getattr(node, "end_lineno", None):
+            assert lines.segment(node) == ast.get_source_segment(source, node)
+
+
+def test_python_skeleton_keeps_cli_calls():
+    source = "import argparse\n\ndef main():\n    parser = argparse.ArgumentParser()\n    parser.add_argument('--port')\n"
+    skeleton = python_skeleton(source)
+    assert "parser.add_argument('--port')" in skeleton
+    assert "def main():" in skeleton
+
+
+def test_skeleton_never_grows_a_file():
+    source = "import os\nimport sys\n\nsys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))\n"
+    assert skeletonize("conftest.py", source) is source
+
+
+def _best_time(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def test_js_keep_is_linear_on_whitespace():
+    # Quadratic backtracking would make 4x the input take about 16x as long
+    for line in [lambda n: " " * n, lambda n: "run(): " + " " * n, lambda n: "public " * (n // 7)]:
+        small = _best_time(lambda: JS_KEEP.match(line(20_000)))
+        large = _best_time(lambda: JS_KEEP.match(line(80_000)))
+        assert large < small * 10
@@ -0,0 +1,12 @@
+from text_sniff import looks_binary
+
+
+def test_text_starting_like_a_magic_number_is_text():
+    for head in (b"RIFF parser in Python\n", b"MZ notes\n", b"ID3 tags\n", b"GIF8 frames\n", b"%PDF tools\n"):
+        assert not looks_binary(head)
+
+
+def test_binary_headers_are_detected():
+    assert looks_binary(b"\x89PNG\r\n\x1a\n" + bytes(100))
+    assert looks_binary(b"MZ\x90\x00\x03\x00\x00\x00")
+    assert looks_binary(b"RIFF\x24\x08\x00\x00WAVEfmt ")
@@ -0,0 +1,83 @@
+"""Decide text vs. binary and pick an encoding from the first few KB of a file"""
+import codecs
+
+SNIFF_BYTES = 8192
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Only magic numbers containing non-text bytes: printable ones (b'MZ', b'RIFF', ...) can start a
+# text file, and real binaries of those formats are caught by the NUL and control-character checks
+BINARY_SIGNATURES = (
+    b'\x89PNG', b'\xff\xd8\xff', b'PK\x03\x04', b'\x1f\x8b', b'\x7fELF',
+    b'\xfd7zXZ', b'7z\xbc\xaf', b'\xca\xfe\xba\xbe', b'\x00asm', b'SQLite format 3\x00',
+)
+
+# Rejected by name alone, without reading a single byte
+BINARY_EXTENSIONS = {
+    'png', 'jpg', 'jpeg', 'gif', 'bmp', 'ico', 'webp', 'tiff', 'psd', 'pdf', 'zip', 'gz', 'tgz',
+    'bz2', 'xz', '7z', 'rar', 'jar', 'war', 'whl', 'exe', 'dll', 'so', 'dylib', 'o', 'a', 'class',
+    'pyc', 'pyo', 'bin', 'dat', 'db', 'sqlite', 'sqlite3', 'mp3', 'mp4', 'wav', 'ogg', 'flac',
+    'mov', 'avi', 'mkv', 'woff', 'woff2', 'ttf', 'otf', 'eot', 'pkl', 'pickle', 'npy', 'npz',
+    'parquet', 'h5', 'onnx', 'pt', 'ckpt',
+}
+
+
+def bom_encoding(head):
+    """Encoding announced by a byte order mark, or None"""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def looks_binary(head):
+    """Decide from the first bytes of a file whether it is binary"""
+    if bom_encoding(head):
+        return False
+    if head.startswith(BINARY_SIGNATURES) or b'\x00' in head:
+        return True
+    # Mostly control characters means binary even without NUL bytes
+    control = sum(1 for byte in head if byte < 32 and byte not in (9, 10, 12, 13, 27))
+    return bool(head) and control / len(head) > 0.3
+
+
+def detect_encoding(head):
+    """Best guess at the text encoding of a file from its first bytes"""
+    encoding = bom_encoding(head)
+    if encoding:
+        return encoding
+
+    # Incremental decoding tolerates a multi-byte character cut off at the sample edge
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        from charset_normalizer import from_bytes
+        match = from_bytes(head).best()
+        if match is not None:
+            return match.encoding
+    except ImportError:
+        pass
+
+    try:
+        head.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def decode_text(data, encoding):
+    """Decode data, falling back to latin-1 (which never fails) if the guess was wrong"""
+    try:
+        return data.decode(encoding)
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
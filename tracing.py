@@ -0,0 +1,75 @@
+"""Lightweight per-stage latency tracing"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+MAX_SPANS = 2000
+
+
+class Trace:
+    """Records timed spans (wall-clock, bytes, tokens) for pipeline stages"""
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the enclosed block; the yielded dict can be filled with extra attributes"""
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            record = {
+                "stage": name,
+                "started_at": started_at,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                **attrs,
+            }
+            with self._lock:
+                self.spans.append(record)
+
+    def record(self, name, seconds, **attrs):
+        """Add a span measured elsewhere, e.g. in a worker process"""
+        record = {"stage": name, "started_at": time.time() - seconds, "duration_ms": round(seconds * 1000, 3), **attrs}
+        with self._lock:
+            self.spans.append(record)
+
+    def discard(self, *names):
+        """Forget earlier spans of the given stages before they are measured again"""
+        with self._lock:
+            kept = [span for span in self.spans if span["stage"] not in names]
+            self.spans.clear()
+            self.spans.extend(kept)
+
+    def summary(self):
+        """Aggregate spans per stage in first-seen order"""
+        stages = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            stage = stages.setdefault(span["stage"], {
+                "stage": span["stage"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "bytes": 0, "tokens": 0,
+            })
+            stage["calls"] += 1
+            stage["total_ms"] = round(stage["total_ms"] + span["duration_ms"], 3)
+            stage["max_ms"] = max(stage["max_ms"], span["duration_ms"])
+            stage["bytes"] += span.get("bytes", 0)
+            stage["tokens"] += span.get("tokens", 0)
+        return list(stages.values())
+
+    def to_json(self):
+        """Export the summary and raw spans for dashboards"""
+        with self._lock:
+            spans = list(self.spans)
+        return json.dumps({"summary": self.summary(), "spans": spans}, indent=2)
+
+
+def span(trace, name, **attrs):
+    """trace.span(...) when tracing is enabled, otherwise a no-op context"""
+    if trace is None:
+        return nullcontext(attrs)
+    return trace.span(name, **attrs)